@@ -1,6 +1,6 @@
 from flask import Flask, request, jsonify
 from config import config
-from app.extensions import db, jwt, socketio, cors, migrate, limiter
+from app.extensions import db, jwt, socketio, cors, migrate, limiter, token_blocklist, card_auth_cache, user_search_cache, image_store, seller_profile_cache
 import logging
 from logging.handlers import RotatingFileHandler
 import os
@@ -8,6 +8,8 @@ import os
 def create_app(config_name='development'):
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    if not app.config.get('IBAN_HASH_KEY'):
+        raise RuntimeError('IBAN_HASH_KEY must be set (card IBANs are derived from it)')
     
     # Initialize extensions
     db.init_app(app)
@@ -19,6 +21,25 @@ def create_app(config_name='development'):
     # Initialize rate limiter
     limiter.init_app(app)
     
+    # Initialize JWT deny-list (in-memory check, no DB query per request)
+    token_blocklist.init_app(app)
+    
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        return token_blocklist.is_revoked(jwt_payload['jti'])
+    
+    # Initialize card authorisation cache used by /api/cards/<id>/pay
+    card_auth_cache.init_app(app)
+    
+    # Initialize user directory search cache used by /api/users/search
+    user_search_cache.init_app(app)
+    
+    # Initialize marketplace image store served by /api/images
+    image_store.init_app(app)
+    
+    # Initialize seller profile cache used by marketplace listings
+    seller_profile_cache.init_app(app)
+    
     # Configure logging
     if not app.debug and not app.testing:
         if not os.path.exists('logs'):
@@ -96,6 +117,10 @@ def create_app(config_name='development'):
     from app.blueprints.isic import isic_bp
     from app.blueprints.isic_upload import isic_upload_bp
     from app.blueprints.expected_payments import expected_payments_bp
+    from app.blueprints.forecast import forecast_bp
+    from app.blueprints.users import users_bp
+    from app.blueprints.notifications import notifications_bp
+    from app.blueprints.images import images_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(wallet_bp, url_prefix='/api/wallet')
@@ -108,6 +133,10 @@ def create_app(config_name='development'):
     app.register_blueprint(isic_bp, url_prefix='/api/isic')
     app.register_blueprint(isic_upload_bp)
     app.register_blueprint(expected_payments_bp, url_prefix='/api/expected-payments')
+    app.register_blueprint(forecast_bp, url_prefix='/api/forecast')
+    app.register_blueprint(users_bp, url_prefix='/api/users')
+    app.register_blueprint(notifications_bp, url_prefix='/api/notifications')
+    app.register_blueprint(images_bp, url_prefix='/api/images')
     
     @app.route('/api/health')
     def health_check():
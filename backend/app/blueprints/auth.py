@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
-from app.extensions import db, limiter
+from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity, get_jwt, decode_token
+from jwt import ExpiredSignatureError, InvalidTokenError
+from app.extensions import db, limiter, token_blocklist
 from app.models import User, Wallet
 from app.utils.validators import RegisterSchema, LoginSchema, sanitize_html
 from marshmallow import ValidationError
@@ -162,11 +163,30 @@ def update_user_profile():
     }), 200
 
 @auth_bp.route('/logout', methods=['POST'])
-@jwt_required()
+@jwt_required(verify_type=False)
 def logout():
+    """Revoke the presented token and the session's refresh token (body: refresh_token) until they expire"""
     user_id = int(get_jwt_identity())
     user = User.query.get(user_id)
     
+    # Check the refresh token before revoking anything, so a bad request changes nothing
+    refresh_payload = None
+    refresh_token = (request.get_json(silent=True) or {}).get('refresh_token')
+    if refresh_token:
+        try:
+            refresh_payload = decode_token(refresh_token)
+        except ExpiredSignatureError:
+            refresh_payload = None  # Already unusable
+        except InvalidTokenError:
+            return jsonify({'error': 'Invalid refresh token'}), 400
+        if refresh_payload and (refresh_payload.get('type') != 'refresh' or refresh_payload.get('sub') != str(user_id)):
+            return jsonify({'error': 'Invalid refresh token'}), 400
+    
+    jwt_payload = get_jwt()
+    token_blocklist.revoke(jwt_payload['jti'], jwt_payload.get('exp'))
+    if refresh_payload:
+        token_blocklist.revoke(refresh_payload['jti'], refresh_payload.get('exp'))
+    
     if user:
         current_app.logger.info(f"User logged out: {user.email}")
     
@@ -1,7 +1,10 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.extensions import db
+from app.extensions import db, card_auth_cache
 from app.models import VirtualCard, Subscription, Wallet, Transaction
+from app.services import spend_counters
+from app.services.card_auth_cache import auth_state, decline_reason, load_card_auth_state
+from app.services.round_ups import record_round_up
 from datetime import datetime, timedelta
 
 cards_bp = Blueprint('cards', __name__)
@@ -91,14 +94,30 @@ def get_cards():
     total_allocated = sum(float(c.allocated_amount) for c in budget_cards)
     total_spent = sum(float(c.spent_amount) for c in budget_cards)
     
-    # Calculate subscription summary
-    total_monthly_subscription = sum(
-        sum(float(sub.amount) for sub in c.subscriptions.filter_by(is_active=True, billing_cycle='monthly').all())
-        for c in subscription_cards
-    )
+    # Load subscriptions of all subscription cards in one query, grouped in memory
+    subscriptions_by_card = {c.id: [] for c in subscription_cards}
+    if subscription_cards:
+        subscriptions = Subscription.query.filter(
+            Subscription.card_id.in_(list(subscriptions_by_card))
+        ).order_by(Subscription.id).all()
+        for sub in subscriptions:
+            subscriptions_by_card[sub.card_id].append(sub)
+    
+    # Calculate subscription summary (once per card, reused by to_dict)
+    subscription_summaries = {
+        card_id: VirtualCard.summarize_subscriptions(subs)
+        for card_id, subs in subscriptions_by_card.items()
+    }
+    total_monthly_subscription = sum(s['monthly_total'] for s in subscription_summaries.values())
     
     return jsonify({
-        'cards': [card.to_dict() for card in cards],
+        'cards': [
+            card.to_dict(
+                subscriptions=subscriptions_by_card.get(card.id),
+                subscription_summary=subscription_summaries.get(card.id)
+            )
+            for card in cards
+        ],
         'summary': {
             'total_allocated': total_allocated,
             'total_spent': total_spent,
@@ -247,7 +266,8 @@ def create_card():
             card_number=VirtualCard.generate_card_number(),
             cvv=VirtualCard.generate_cvv(),
             expiry_date=(datetime.utcnow() + timedelta(days=1095)).date(),
-            spending_limit=data.get('spending_limit')
+            spending_limit=data.get('spending_limit'),
+            daily_limit=data.get('daily_limit')
         )
     elif card_purpose == 'budget':
         # Create budget card with zero allocation (users must allocate funds separately via /allocate endpoint)
@@ -294,6 +314,32 @@ def create_card():
         'card': card.to_dict(include_sensitive=(card_purpose == 'payment'))
     }), 201
 
+@cards_bp.route('/lookup', methods=['GET'])
+@jwt_required()
+def lookup_card_by_iban():
+    """Resolve an IBAN to the receiving card and its owner (no sensitive card data)"""
+    iban = request.args.get('iban', '')
+    if not iban.strip():
+        return jsonify({'error': 'iban is required'}), 400
+    
+    card = VirtualCard.find_by_iban(iban)
+    if not card or not card.is_active:
+        return jsonify({'error': 'Card not found'}), 404
+    
+    return jsonify({
+        'card_id': card.id,
+        'card_name': card.card_name,
+        'card_purpose': card.card_purpose,
+        'iban': card.iban,
+        'swift': card.get_swift(),
+        'owner': {
+            'id': card.user.id,
+            'username': card.user.username,
+            'first_name': card.user.first_name,
+            'last_name': card.user.last_name
+        }
+    }), 200
+
 @cards_bp.route('/<int:card_id>', methods=['GET'])
 @jwt_required()
 def get_card(card_id):
@@ -384,33 +430,8 @@ def add_subscription(card_id):
         next_billing_date=next_billing_date
     )
     
+    # Upcoming billings are expanded from next_billing_date (app.services.recurrence)
     db.session.add(subscription)
-    db.session.flush()
-    
-    if next_billing_date:
-        next_billing_datetime = datetime.combine(next_billing_date, datetime.min.time())
-        
-        scheduled_transaction = Transaction(
-            user_id=user_id,
-            transaction_type='subscription_payment',
-            transaction_source='budget_card',
-            amount=float(amount),
-            status='scheduled',
-            description=f'{service_name} - {billing_cycle} subscription',
-            transaction_metadata={
-                'source': 'SUBSCRIPTION_PAYMENT',
-                'subscription_id': subscription.id,
-                'card_id': card_id,
-                'billing_cycle': billing_cycle,
-                'scheduled': True,
-                'upcoming': True,
-                'category': data.get('service_category', 'subscription'),
-                'display_color': '#FACC15'
-            },
-            created_at=next_billing_datetime
-        )
-        
-        db.session.add(scheduled_transaction)
     
     db.session.commit()
     
@@ -609,18 +630,18 @@ def process_payment(card_id):
     if amount_decimal <= 0:
         return jsonify({'error': 'Amount must be greater than 0'}), 400
     
+    # Decline frozen / inactive / wrong-purpose cards from cached state, before taking any locks
+    declined = decline_reason(card_auth_cache.get(card_id, load_card_auth_state), user_id)
+    if declined:
+        return jsonify({'error': declined[0]}), declined[1]
+    
     try:
-        # Lock card row
+        # Lock card row and re-check the authoritative state
         card = VirtualCard.query.filter_by(id=card_id, user_id=user_id).with_for_update().first()
-        if not card:
-            return jsonify({'error': 'Card not found'}), 404
-        
-        if card.card_purpose != 'payment':
-            return jsonify({'error': 'This endpoint is only for payment cards'}), 400
-        
-        # Check if card is frozen
-        if card.is_frozen:
-            return jsonify({'error': 'Card is frozen. Unfreeze it to make payments'}), 403
+        declined = decline_reason(auth_state(card), user_id)
+        if declined:
+            card_auth_cache.invalidate(card_id)
+            return jsonify({'error': declined[0]}), declined[1]
         
         # Lock wallet row
         wallet = Wallet.query.filter_by(user_id=user_id).with_for_update().first()
@@ -631,17 +652,20 @@ def process_payment(card_id):
         if wallet.balance < amount_decimal:
             return jsonify({'error': 'Insufficient wallet balance'}), 400
         
-        # Check spending limit if set
-        if card.spending_limit is not None:
-            if card.spent_amount + amount_decimal > card.spending_limit:
-                return jsonify({
-                    'error': f'Payment exceeds spending limit. Available: ${float(card.spending_limit - card.spent_amount):.2f}'
-                }), 400
+        # Check daily / monthly limits against the card's running counters
+        # (serialised by the card row lock above)
+        now = datetime.utcnow()
+        counters = spend_counters.load_counters(card.id)
+        limit_error = spend_counters.check_limits(card, amount_decimal, spend_counters.current_spend(counters, now))
+        if limit_error:
+            return jsonify({'error': limit_error}), 400
         
         # Process payment
         wallet.balance -= amount_decimal
         card.spent_amount = (card.spent_amount or VirtualCard.to_decimal(0)) + amount_decimal
-        card.updated_at = datetime.utcnow()
+        card.updated_at = now
+        spend_counters.record_spend(card.id, amount_decimal, counters, now)
+        record_round_up(wallet, amount_decimal, 'card_payment')
         
         # Create transaction record
         transaction = Transaction(
@@ -657,7 +681,8 @@ def process_payment(card_id):
                 'card_type': card.card_type,
                 'merchant': merchant
             },
-            completed_at=datetime.utcnow()
+            card_id=card.id,
+            completed_at=now
         )
         db.session.add(transaction)
         db.session.commit()
@@ -742,15 +767,6 @@ def delete_subscription(card_id, sub_id):
     if not subscription:
         return jsonify({'error': 'Subscription not found'}), 404
     
-    scheduled_transaction = Transaction.query.filter(
-        Transaction.user_id == user_id,
-        Transaction.status == 'scheduled',
-        Transaction.transaction_metadata['subscription_id'].astext == str(sub_id)
-    ).first()
-    
-    if scheduled_transaction:
-        db.session.delete(scheduled_transaction)
-    
     db.session.delete(subscription)
     db.session.commit()
     
@@ -770,15 +786,6 @@ def pause_subscription(card_id, sub_id):
     if not subscription:
         return jsonify({'error': 'Subscription not found'}), 404
     
-    scheduled_transaction = Transaction.query.filter(
-        Transaction.user_id == user_id,
-        Transaction.status == 'scheduled',
-        Transaction.transaction_metadata['subscription_id'].astext == str(sub_id)
-    ).first()
-    
-    if scheduled_transaction:
-        db.session.delete(scheduled_transaction)
-    
     subscription.is_active = False
     db.session.commit()
     
@@ -803,31 +810,6 @@ def resume_subscription(card_id, sub_id):
     
     subscription.is_active = True
     
-    if subscription.next_billing_date:
-        next_billing_datetime = datetime.combine(subscription.next_billing_date, datetime.min.time())
-        
-        scheduled_transaction = Transaction(
-            user_id=user_id,
-            transaction_type='subscription_payment',
-            transaction_source='budget_card',
-            amount=float(subscription.amount),
-            status='scheduled',
-            description=f'{subscription.service_name} - {subscription.billing_cycle} subscription',
-            transaction_metadata={
-                'source': 'SUBSCRIPTION_PAYMENT',
-                'subscription_id': subscription.id,
-                'card_id': card_id,
-                'billing_cycle': subscription.billing_cycle,
-                'scheduled': True,
-                'upcoming': True,
-                'category': subscription.service_category or 'subscription',
-                'display_color': '#FACC15'
-            },
-            created_at=next_billing_datetime
-        )
-        
-        db.session.add(scheduled_transaction)
-    
     db.session.commit()
     
     return jsonify({
@@ -1,8 +1,9 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models import Transaction
+from app.models import RecurringSeries, Transaction
 from app.extensions import db
-from datetime import datetime, timedelta
+from app.services.recurrence import persist_occurrences, series_for_payment, series_occurrences
+from datetime import datetime
 from dateutil.relativedelta import relativedelta
 
 expected_payments_bp = Blueprint('expected_payments', __name__)
@@ -58,6 +59,8 @@ def create_expected_payment():
     )
     
     db.session.add(transaction)
+    # Recurring payments store their rule once; later occurrences are expanded on read
+    series_for_payment(transaction)
     db.session.commit()
     
     return jsonify({
@@ -113,6 +116,12 @@ def update_expected_payment(payment_id):
     
     transaction.transaction_metadata = metadata
     
+    if series_for_payment(transaction) is None and transaction.series_id:
+        # Switched to one-time: stop expanding the old rule
+        series = db.session.get(RecurringSeries, transaction.series_id)
+        if series:
+            series.is_active = False
+    
     db.session.commit()
     
     return jsonify({
@@ -134,6 +143,11 @@ def delete_expected_payment(payment_id):
     if not transaction:
         return jsonify({'error': 'Expected payment not found'}), 404
     
+    if transaction.series_id:
+        series = db.session.get(RecurringSeries, transaction.series_id)
+        if series:
+            series.is_active = False
+    
     db.session.delete(transaction)
     db.session.commit()
     
@@ -163,71 +177,42 @@ def generate_recurring_payments():
     if frequency == 'one-time':
         return jsonify({'message': 'Payment is one-time, no recurring instances needed'}), 200
     
-    created_payments = []
-    current_date = base_payment.created_at
-    end_date = current_date + relativedelta(months=months_ahead)
-    
-    if frequency == 'monthly':
-        for i in range(1, months_ahead + 1):
-            next_date = current_date + relativedelta(months=i)
-            
-            existing = Transaction.query.filter_by(
-                user_id=user_id,
-                description=base_payment.description,
-                created_at=next_date,
-                status='scheduled'
-            ).first()
-            
-            if existing:
-                continue
-            
-            new_payment = Transaction(
-                user_id=user_id,
-                transaction_type=base_payment.transaction_type,
-                transaction_source=base_payment.transaction_source or 'main_wallet',
-                amount=base_payment.amount,
-                status='scheduled',
-                description=base_payment.description,
-                transaction_metadata=metadata.copy(),
-                created_at=next_date
-            )
-            
-            db.session.add(new_payment)
-            created_payments.append(new_payment.to_dict())
-    
-    elif frequency == 'weekly':
-        week_count = 0
-        next_date = current_date + timedelta(weeks=1)
+    # Occurrences are virtual unless the client asks for real rows (e.g. to edit
+    # single instances); either way the rule is stored once
+    series = series_for_payment(base_payment)
+    if series is None:
+        return jsonify({'error': f'Unsupported frequency: {frequency}'}), 400
+    
+    window_start = base_payment.created_at.date()
+    window_end = window_start + relativedelta(months=months_ahead)
+    
+    if data.get('persist'):
+        try:
+            created = persist_occurrences(series, window_start, window_end)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'error': f'Failed to generate payments: {str(e)}'}), 500
+        
+        payments = Transaction.query.filter(
+            Transaction.user_id == user_id,
+            Transaction.series_id == series.id,
+            Transaction.occurrence_date > window_start,
+            Transaction.occurrence_date <= window_end
+        ).order_by(Transaction.occurrence_date).all()
         
-        while next_date <= end_date:
-            existing = Transaction.query.filter_by(
-                user_id=user_id,
-                description=base_payment.description,
-                created_at=next_date,
-                status='scheduled'
-            ).first()
-            
-            if not existing:
-                new_payment = Transaction(
-                    user_id=user_id,
-                    transaction_type=base_payment.transaction_type,
-                    transaction_source=base_payment.transaction_source or 'main_wallet',
-                    amount=base_payment.amount,
-                    status='scheduled',
-                    description=base_payment.description,
-                    transaction_metadata=metadata.copy(),
-                    created_at=next_date
-                )
-                
-                db.session.add(new_payment)
-                created_payments.append(new_payment.to_dict())
-            
-            week_count += 1
-            next_date = current_date + timedelta(weeks=week_count + 1)
+        return jsonify({
+            'message': f'Generated {created} recurring payments',
+            'series': series.to_dict(),
+            'payments': [p.to_dict() for p in payments]
+        }), 201
     
     db.session.commit()
+    occurrences = series_occurrences(user_id, window_start, window_end)
+    occurrences = [o for o in occurrences if o['series_id'] == series.id]
     
     return jsonify({
-        'message': f'Generated {len(created_payments)} recurring payments',
-        'payments': created_payments
+        'message': f'Generated {len(occurrences)} recurring payments',
+        'series': series.to_dict(),
+        'payments': occurrences
     }), 201
@@ -0,0 +1,24 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.services.forecast import MAX_FORECAST_MONTHS, build_forecast
+
+forecast_bp = Blueprint('forecast', __name__)
+
+@forecast_bp.route('', methods=['GET'])
+@forecast_bp.route('/', methods=['GET'])
+@jwt_required()
+def get_forecast():
+    """
+    Project daily wallet balances and flag days that would go negative.
+    
+    Query Params:
+        months (int, optional): Months to project (1-24, default 3)
+    """
+    user_id = int(get_jwt_identity())
+    
+    try:
+        months = min(max(int(request.args.get('months', 3)), 1), MAX_FORECAST_MONTHS)
+    except ValueError:
+        return jsonify({'error': 'months must be an integer'}), 400
+    
+    return jsonify(build_forecast(user_id, months)), 200
@@ -0,0 +1,36 @@
+from flask import Blueprint, jsonify, send_file
+from app.extensions import image_store
+
+images_bp = Blueprint('images', __name__)
+
+# Stored files never change (the name is the hash of the content)
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+def _send_image(name, thumbnail=False):
+    resolved = image_store.resolve(name, thumbnail=thumbnail)
+    if not resolved:
+        return jsonify({'error': 'Image not found'}), 404
+    
+    path, mimetype = resolved
+    # conditional=True answers Range and If-None-Match requests from disk
+    response = send_file(
+        path,
+        mimetype=mimetype,
+        conditional=True,
+        etag=f"{name[:64]}{'-thumb' if thumbnail else ''}",
+        max_age=IMMUTABLE_MAX_AGE
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+@images_bp.route('/<name>', methods=['GET'])
+def get_image(name):
+    """Stream a marketplace image (public: names are unguessable content hashes)"""
+    return _send_image(name)
+
+@images_bp.route('/<name>/thumbnail', methods=['GET'])
+def get_image_thumbnail(name):
+    """Stream an image's thumbnail, or the image itself if it has none"""
+    return _send_image(name, thumbnail=True)
@@ -2,6 +2,8 @@ from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.extensions import db
 from app.models import Loan, LoanRepayment, User, Wallet, Transaction
+from app.services.debt_netting import SettlementError, plan_settlement, settle_group
+from app.services.loan_instalments import cancel_open_instalments, schedule_instalments
 from app.utils.validators import LoanRequestSchema, sanitize_html
 from marshmallow import ValidationError
 from datetime import datetime
@@ -28,73 +30,45 @@ def lock_wallets_deterministic(user_id_1, user_id_2):
         wallet1 = Wallet.query.filter_by(user_id=user_id_1).with_for_update().first()
         return wallet1, wallet2
 
-@loans_bp.route('/available-users', methods=['GET'])
-@jwt_required()
-def get_available_users():
-    user_id = int(get_jwt_identity())
-    
-    # Get all users except current user
-    users = User.query.filter(User.id != user_id).all()
-    
-    return jsonify({
-        'users': [{
-            'id': user.id,
-            'username': user.username,
-            'email': user.email
-        } for user in users]
-    }), 200
-
 @loans_bp.route('', methods=['GET'])
 @jwt_required()
 def get_loans():
     from sqlalchemy.orm import joinedload
-    from sqlalchemy import func
+    from sqlalchemy import or_
     user_id = int(get_jwt_identity())
     
-    # Pending requests I received (I'm the lender, someone is asking to borrow from me)
-    pending_requests_received = Loan.query.options(
-        joinedload(Loan.borrower)
-    ).filter_by(lender_id=user_id, status='pending').all()
-    
-    # Pending requests I sent (I'm the borrower, I'm asking to borrow)
-    pending_requests_sent = Loan.query.options(
-        joinedload(Loan.lender)
-    ).filter_by(borrower_id=user_id, status='pending').all()
-    
-    # Active loans where I'm the lender (approved, not fully repaid)
-    loans_given = Loan.query.options(
+    # Every loan I'm part of in one query (served by the (lender_id, status)
+    # and (borrower_id, status) indexes); cancelled and declined loans aren't shown
+    loans = Loan.query.options(
+        joinedload(Loan.lender),
         joinedload(Loan.borrower)
     ).filter(
-        Loan.lender_id == user_id,
-        Loan.status.in_(['active', 'repaid']),
-        Loan.status != 'cancelled'
+        or_(Loan.lender_id == user_id, Loan.borrower_id == user_id),
+        Loan.status.in_(['pending', 'active', 'repaid'])
     ).all()
     
-    # Active loans where I'm the borrower (approved, not fully repaid)
-    loans_taken = Loan.query.options(
-        joinedload(Loan.lender)
-    ).filter(
-        Loan.borrower_id == user_id,
-        Loan.status.in_(['active', 'repaid']),
-        Loan.status != 'cancelled'
-    ).all()
-    
-    # Calculate summary statistics (only active loans, exclude pending/cancelled/declined)
-    owed_to_me = db.session.query(
-        func.sum(Loan.amount - Loan.amount_repaid)
-    ).filter(
-        Loan.lender_id == user_id,
-        Loan.is_fully_repaid == False,
-        Loan.status == 'active'
-    ).scalar() or 0
-    
-    i_owe = db.session.query(
-        func.sum(Loan.amount - Loan.amount_repaid)
-    ).filter(
-        Loan.borrower_id == user_id,
-        Loan.is_fully_repaid == False,
-        Loan.status == 'active'
-    ).scalar() or 0
+    pending_requests_received = []  # I'm the lender, someone is asking to borrow from me
+    pending_requests_sent = []      # I'm the borrower, I'm asking to borrow
+    loans_given = []
+    loans_taken = []
+    owed_to_me = Decimal('0')
+    i_owe = Decimal('0')
+    
+    for loan in loans:
+        is_lender = loan.lender_id == user_id
+        if loan.status == 'pending':
+            (pending_requests_received if is_lender else pending_requests_sent).append(loan)
+            continue
+        
+        (loans_given if is_lender else loans_taken).append(loan)
+        
+        # Summary only counts active loans that still have something outstanding
+        if loan.status == 'active' and not loan.is_fully_repaid:
+            outstanding = loan.balance_due()
+            if is_lender:
+                owed_to_me += outstanding
+            else:
+                i_owe += outstanding
     
     net_balance = float(owed_to_me) - float(i_owe)
     
@@ -112,6 +86,41 @@ def get_loans():
         }
     }), 200
 
+@loans_bp.route('/settlement', methods=['GET'])
+@jwt_required()
+def get_settlement_plan():
+    """Preview the netted transfers that would settle the user's own loans"""
+    user_id = int(get_jwt_identity())
+    return jsonify(plan_settlement(user_id)), 200
+
+@loans_bp.route('/settle', methods=['POST'])
+@jwt_required()
+def settle_loans():
+    """Settle the user's loans with each counterparty they owe, one netted transfer each"""
+    user_id = int(get_jwt_identity())
+    
+    try:
+        result = settle_group(user_id)
+        db.session.commit()
+    except SettlementError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Settlement failed: {str(e)}'}), 500
+    
+    current_app.logger.info(
+        f"Loan settlement {result['settlement_id']} by user {user_id}: "
+        f"{result['loans_settled']} loans, {len(result['transfers'])} transfers"
+    )
+    wallet = Wallet.query.filter_by(user_id=user_id).first()
+    
+    return jsonify({
+        'message': f"Settled {result['loans_settled']} loans with {len(result['transfers'])} transfers",
+        'settlement': result,
+        'wallet_balance': float(wallet.balance) if wallet else None
+    }), 200
+
 @loans_bp.route('', methods=['POST'])
 @jwt_required()
 def create_loan_request():
@@ -137,6 +146,10 @@ def create_loan_request():
     if amount_decimal <= 0:
         return jsonify({'error': 'Amount must be greater than 0'}), 400
     
+    # Optional instalment plan, auto-debited once the loan is approved
+    instalment_count = validated_data.get('instalments')
+    instalment_frequency = validated_data.get('instalment_frequency', 'monthly') if instalment_count else None
+    
     lender = User.query.filter_by(username=lender_username).first()
     if not lender:
         return jsonify({'error': 'Lender not found'}), 404
@@ -154,6 +167,8 @@ def create_loan_request():
             description=data.get('description'),
             due_date=datetime.fromisoformat(data['due_date']).date() if data.get('due_date') else None,
             interest_rate=data.get('interest_rate', 0.00),
+            instalment_count=instalment_count,
+            instalment_frequency=instalment_frequency,
             status='pending'
         )
         db.session.add(loan)
@@ -199,8 +214,8 @@ def repay_loan(loan_id):
     if amount <= 0:
         return jsonify({'error': 'Amount must be greater than 0'}), 400
     
-    # Calculate remaining balance
-    remaining = loan.amount - loan.amount_repaid
+    # Calculate remaining balance (principal plus accrued interest)
+    remaining = loan.balance_due()
     if amount > remaining:
         amount = remaining
     
@@ -225,13 +240,14 @@ def repay_loan(loan_id):
         # Credit lender wallet
         lender_wallet.balance += amount
         
-        # Update loan amount repaid
-        loan.amount_repaid += amount
+        # Update loan amount repaid (accrued interest is paid off first)
+        interest_paid, principal_paid = loan.apply_repayment(amount)
         
         # Create repayment record
         repayment = LoanRepayment(
             loan_id=loan_id,
-            amount=amount
+            amount=amount,
+            interest_amount=interest_paid
         )
         db.session.add(repayment)
         db.session.flush()  # Get repayment ID
@@ -248,7 +264,9 @@ def repay_loan(loan_id):
                 'loan_id': loan.id,
                 'repayment_id': repayment.id,
                 'lender_id': loan.lender_id,
-                'remaining_balance': float(loan.amount - loan.amount_repaid)
+                'interest_paid': float(interest_paid),
+                'principal_paid': float(principal_paid),
+                'remaining_balance': loan.amount_remaining
             },
             completed_at=datetime.utcnow()
         )
@@ -266,17 +284,20 @@ def repay_loan(loan_id):
                 'loan_id': loan.id,
                 'repayment_id': repayment.id,
                 'borrower_id': user_id,
-                'remaining_balance': float(loan.amount - loan.amount_repaid)
+                'interest_paid': float(interest_paid),
+                'principal_paid': float(principal_paid),
+                'remaining_balance': loan.amount_remaining
             },
             completed_at=datetime.utcnow()
         )
         db.session.add(lender_transaction)
         
         # Mark loan as fully repaid if complete
-        if loan.amount_repaid >= loan.amount:
+        if loan.balance_due() <= 0:
             loan.is_fully_repaid = True
             loan.repaid_at = datetime.utcnow()
             loan.status = 'repaid'
+            cancel_open_instalments([loan.id])
         
         db.session.commit()
         
@@ -292,6 +313,26 @@ def repay_loan(loan_id):
         db.session.rollback()
         return jsonify({'error': f'Repayment failed: {str(e)}'}), 500
 
+@loans_bp.route('/<int:loan_id>/instalments', methods=['GET'])
+@jwt_required()
+def get_loan_instalments(loan_id):
+    """Instalment schedule of a loan (lender or borrower only)"""
+    user_id = int(get_jwt_identity())
+    
+    loan = Loan.query.get(loan_id)
+    if not loan:
+        return jsonify({'error': 'Loan not found'}), 404
+    
+    if user_id not in (loan.lender_id, loan.borrower_id):
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    return jsonify({
+        'loan_id': loan.id,
+        'instalment_count': loan.instalment_count,
+        'instalment_frequency': loan.instalment_frequency,
+        'instalments': [instalment.to_dict() for instalment in loan.instalments]
+    }), 200
+
 @loans_bp.route('/<int:loan_id>/approve', methods=['POST'])
 @jwt_required()
 def approve_loan_request(loan_id):
@@ -331,8 +372,13 @@ def approve_loan_request(loan_id):
         lender_wallet.balance -= loan.amount
         borrower_wallet.balance += loan.amount
         
-        # Update loan status
+        # Update loan status; interest accrues from today
         loan.status = 'active'
+        loan.interest_accrued_through = datetime.utcnow().date()
+        
+        # Instalments fall due one period apart from today; the last one is the due date
+        if loan.instalment_count:
+            loan.due_date = schedule_instalments(loan, datetime.utcnow().date())
         
         # Create transaction for lender (money out)
         lender_transaction = Transaction(
@@ -463,6 +509,7 @@ def cancel_loan(loan_id):
         loan.status = 'cancelled'
         loan.is_fully_repaid = False
         loan.cancelled_at = datetime.utcnow()
+        cancel_open_instalments([loan.id])
         
         # Create transaction for lender (money in - refund)
         lender_transaction = Transaction(
@@ -1,11 +1,15 @@
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.extensions import db
+from app.extensions import db, image_store
 from app.models import MarketplaceListing, MarketplaceOrder, Wallet, Transaction, User
+from app.services.marketplace_search import DEFAULT_LIMIT, facet_counts, search_listings
+from app.services.order_history import order_history
+from app.services.round_ups import record_round_up
+from app.services.seller_profiles import seller_profiles
 from app.utils.validators import MarketplaceListingSchema, sanitize_html, validate_base64_image
 from marshmallow import ValidationError
 from datetime import datetime
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 
 marketplace_bp = Blueprint('marketplace', __name__)
 
@@ -31,27 +35,43 @@ def lock_wallets_deterministic(user_id_1, user_id_2):
 @marketplace_bp.route('/listings', methods=['GET'])
 @jwt_required()
 def get_listings():
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
-    category = request.args.get('category')
-    university = request.args.get('university')
+    """Search open listings (text, facets, price range) with keyset pagination and facet counts"""
+    limit = request.args.get('limit', request.args.get('per_page', DEFAULT_LIMIT, type=int), type=int)
+    conditions = [
+        condition.strip()
+        for value in request.args.getlist('condition')
+        for condition in value.split(',') if condition.strip()
+    ]
     
-    query = MarketplaceListing.query.filter_by(is_available=True, is_sold=False)
-    
-    if category:
-        query = query.filter_by(category=category)
-    if university:
-        query = query.filter_by(university=university)
+    try:
+        min_price = Decimal(request.args['min_price']) if request.args.get('min_price') else None
+        max_price = Decimal(request.args['max_price']) if request.args.get('max_price') else None
+    except InvalidOperation:
+        return jsonify({'error': 'Invalid price filter'}), 400
+    if any(price is not None and not price.is_finite() for price in (min_price, max_price)):
+        return jsonify({'error': 'Invalid price filter'}), 400
     
-    query = query.order_by(MarketplaceListing.created_at.desc())
+    try:
+        listings, next_cursor = search_listings(
+            query=request.args.get('q'),
+            category=request.args.get('category'),
+            university=request.args.get('university'),
+            conditions=conditions,
+            min_price=min_price,
+            max_price=max_price,
+            cursor=request.args.get('cursor'),
+            limit=limit
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    # One batched lookup for every seller on the page
+    sellers = seller_profiles(listing.seller_id for listing in listings)
     
     return jsonify({
-        'listings': [listing.to_dict(include_seller=True) for listing in pagination.items],
-        'total': pagination.total,
-        'page': page,
-        'pages': pagination.pages
+        'listings': [listing.to_dict(include_seller=True, sellers=sellers) for listing in listings],
+        'next_cursor': next_cursor,
+        'facets': facet_counts()
     }), 200
 
 @marketplace_bp.route('/listings', methods=['POST'])
@@ -88,6 +108,12 @@ def create_listing():
                     return jsonify({'error': f'Invalid image {idx + 1}: {error_msg}'}), 400
                 validated_images.append(img)
     
+    # Store the images as files; the listing keeps only their names
+    try:
+        image_names = list(dict.fromkeys(image_store.put_data_uri(img) for img in validated_images))
+    except ValueError as e:
+        return jsonify({'error': f'Invalid image: {str(e)}'}), 400
+    
     listing = MarketplaceListing(
         seller_id=user_id,
         title=title,
@@ -98,7 +124,7 @@ def create_listing():
         faculty=faculty,
         course=course,
         condition=condition,
-        images=validated_images  # Now validated!
+        images=image_names
     )
     
     db.session.add(listing)
@@ -121,6 +147,24 @@ def get_listing(listing_id):
     
     return jsonify({'listing': listing.to_dict(include_seller=True)}), 200
 
+@marketplace_bp.route('/orders', methods=['GET'])
+@jwt_required()
+def get_orders():
+    """The user's purchases (role=buyer, default) or sales (role=seller), newest first"""
+    user_id = int(get_jwt_identity())
+    
+    try:
+        orders, next_cursor = order_history(
+            user_id,
+            role=request.args.get('role', 'buyer'),
+            cursor=request.args.get('cursor'),
+            limit=request.args.get('limit', DEFAULT_LIMIT, type=int)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({'orders': orders, 'next_cursor': next_cursor}), 200
+
 @marketplace_bp.route('/orders', methods=['POST'])
 @jwt_required()
 def create_order():
@@ -160,11 +204,13 @@ def create_order():
         
         # Deduct from buyer wallet
         buyer_wallet.balance -= price_decimal
+        record_round_up(buyer_wallet, price_decimal, 'purchase')
         
         # Create order with 'paid' status
         order = MarketplaceOrder(
             listing_id=listing_id,
             buyer_id=user_id,
+            seller_id=listing.seller_id,
             amount=listing.price,
             status='paid',
             escrow_released=True  # Immediate escrow release (single-phase)
@@ -0,0 +1,49 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.extensions import db
+from app.models import Notification
+from datetime import datetime
+
+notifications_bp = Blueprint('notifications', __name__)
+
+@notifications_bp.route('', methods=['GET'])
+@notifications_bp.route('/', methods=['GET'])
+@jwt_required()
+def get_notifications():
+    """
+    Newest notifications first.
+    
+    Query Params:
+        unread (bool, optional): Only unread notifications
+        limit (int, optional): Max notifications (1-100, default 50)
+    """
+    user_id = int(get_jwt_identity())
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 100)
+    
+    query = Notification.query.filter_by(user_id=user_id)
+    if request.args.get('unread', '').lower() in ('true', '1'):
+        query = query.filter(Notification.is_read == False)
+    notifications = query.order_by(Notification.created_at.desc(), Notification.id.desc()).limit(limit).all()
+    
+    unread_count = Notification.query.filter_by(user_id=user_id, is_read=False).count()
+    
+    return jsonify({
+        'notifications': [n.to_dict() for n in notifications],
+        'unread_count': unread_count
+    }), 200
+
+@notifications_bp.route('/<int:notification_id>/read', methods=['POST'])
+@jwt_required()
+def mark_read(notification_id):
+    user_id = int(get_jwt_identity())
+    notification = Notification.query.filter_by(id=notification_id, user_id=user_id).first()
+    
+    if not notification:
+        return jsonify({'error': 'Notification not found'}), 404
+    
+    if not notification.is_read:
+        notification.is_read = True
+        notification.read_at = datetime.utcnow()
+        db.session.commit()
+    
+    return jsonify({'notification': notification.to_dict()}), 200
@@ -2,7 +2,8 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.extensions import db
 from app.models import SavingsPocket, Goal, User, Wallet, Transaction
-from decimal import Decimal
+from app.services.round_ups import DEFAULT_UNIT, UNITS, pending_round_ups
+from decimal import Decimal, InvalidOperation
 from datetime import datetime
 
 savings_bp = Blueprint('savings', __name__)
@@ -208,6 +209,64 @@ def update_auto_save_config(pocket_id):
         'pocket': pocket.to_dict()
     }), 200
 
+@savings_bp.route('/pockets/<int:pocket_id>/round-ups', methods=['PUT'])
+@jwt_required()
+def update_round_ups(pocket_id):
+    """Turn round-ups into this pocket on or off"""
+    user_id = int(get_jwt_identity())
+    pocket = SavingsPocket.query.filter_by(id=pocket_id, user_id=user_id).first()
+    
+    if not pocket:
+        return jsonify({'error': 'Savings pocket not found'}), 404
+    
+    data = request.get_json() or {}
+    
+    try:
+        unit = Decimal(str(data.get('unit', DEFAULT_UNIT))).quantize(Decimal('0.01'))
+    except (InvalidOperation, ValueError):
+        return jsonify({'error': 'Invalid round-up unit'}), 400
+    if unit not in UNITS:
+        return jsonify({'error': f'Round-up unit must be one of {", ".join(str(u) for u in UNITS)}'}), 400
+    
+    wallet = Wallet.query.filter_by(user_id=user_id).with_for_update().first()
+    if not wallet:
+        return jsonify({'error': 'Wallet not found'}), 404
+    
+    if data.get('enabled', True):
+        # One pocket collects the round-ups; choosing this one replaces any other
+        wallet.round_up_pocket_id = pocket.id
+        wallet.round_up_unit = unit
+    elif wallet.round_up_pocket_id == pocket.id:
+        wallet.round_up_pocket_id = None
+    
+    db.session.commit()
+    
+    return jsonify({
+        'message': 'Round-up settings updated successfully',
+        'round_ups': _round_up_status(wallet)
+    }), 200
+
+@savings_bp.route('/round-ups', methods=['GET'])
+@jwt_required()
+def get_round_ups():
+    """Round-up settings and the live total of round-ups not yet settled"""
+    user_id = int(get_jwt_identity())
+    wallet = Wallet.query.filter_by(user_id=user_id).first()
+    
+    if not wallet:
+        return jsonify({'error': 'Wallet not found'}), 404
+    
+    return jsonify({'round_ups': _round_up_status(wallet)}), 200
+
+def _round_up_status(wallet):
+    status = {
+        'enabled': wallet.round_up_pocket_id is not None,
+        'pocket_id': wallet.round_up_pocket_id,
+        'unit': float(wallet.round_up_unit or DEFAULT_UNIT)
+    }
+    status.update(pending_round_ups(wallet.user_id))
+    return status
+
 @savings_bp.route('/goals', methods=['GET'])
 @jwt_required()
 def get_goals():
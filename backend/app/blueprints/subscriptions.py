@@ -29,13 +29,17 @@ Current Implementation Status:
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime, timedelta
+from sqlalchemy import and_, case, func
 from app.extensions import db
 from app.models.subscription_card import SubscriptionCard
 from app.models.wallet import Wallet
 from app.models.transaction import Transaction
+from app.services.subscription_billing import add_months, advance_billing_date
 
 subscriptions_bp = Blueprint('subscriptions', __name__)
 
+MAX_PROJECTION_MONTHS = 24
+
 # Predefined Subscription Catalog
 SUBSCRIPTION_CATALOG = [
     {
@@ -381,8 +385,10 @@ def process_monthly_payment(subscription_id):
     if subscription.status != 'active':
         return jsonify({'error': 'Subscription is not active'}), 400
     
-    # Get user's wallet
-    wallet = Wallet.query.filter_by(user_id=current_user_id).first()
+    # Get user's wallet (locked so concurrent charges can't overdraw it)
+    wallet = Wallet.query.filter_by(user_id=current_user_id).with_for_update().first()
+    if not wallet:
+        return jsonify({'error': 'Wallet not found'}), 404
     
     # Check sufficient balance
     if wallet.balance < subscription.monthly_cost:
@@ -391,10 +397,15 @@ def process_monthly_payment(subscription_id):
     # Deduct payment
     wallet.balance -= subscription.monthly_cost
     
-    # Update subscription
+    # Update subscription (same calendar arithmetic as the batch biller)
+    anchor_day = subscription.billing_anchor_day or subscription.next_billing_date.day
     subscription.total_paid += subscription.monthly_cost
     subscription.last_billing_date = datetime.utcnow().date()
-    subscription.next_billing_date = (datetime.utcnow() + timedelta(days=30)).date()
+    subscription.billing_anchor_day = anchor_day
+    subscription.next_billing_date = advance_billing_date(subscription.next_billing_date, 'monthly', anchor_day)
+    subscription.billing_failures = 0
+    subscription.billing_retry_at = None
+    subscription.billing_last_error = None
     
     # Create transaction record
     transaction = Transaction(
@@ -421,6 +432,12 @@ def get_statistics():
     """
     Get subscription statistics for the user.
     
+    Aggregated in SQL (served by the (user_id, status, next_billing_date)
+    index); no subscription rows are loaded into Python.
+    
+    Query Params:
+        months (int, optional): Months of projected spend to return (1-24, default 3)
+    
     Returns:
         JSON: Subscription spending statistics
         
@@ -428,18 +445,42 @@ def get_statistics():
     """
     current_user_id = int(get_jwt_identity())
     
-    subscriptions = SubscriptionCard.query.filter_by(user_id=current_user_id).all()
-    
-    active_subscriptions = [s for s in subscriptions if s.status == 'active']
-    paused_subscriptions = [s for s in subscriptions if s.status == 'paused']
-    
-    total_monthly_cost = sum(s.monthly_cost for s in active_subscriptions)
-    total_paid = sum(s.total_paid for s in subscriptions)
+    try:
+        months = min(max(int(request.args.get('months', 3)), 1), MAX_PROJECTION_MONTHS)
+    except ValueError:
+        return jsonify({'error': 'months must be an integer'}), 400
+    
+    # Active subscriptions bill monthly from their next billing date onwards, so
+    # the spend in projected month k is the cost of every active subscription
+    # whose next billing date falls on or before the end of month k.
+    today = datetime.utcnow().date()
+    month_ends = [add_months(today.replace(day=1), k + 1, 1) - timedelta(days=1) for k in range(months)]
+    is_active = SubscriptionCard.status == 'active'
+    
+    totals = db.session.query(
+        func.count(SubscriptionCard.id).label('total'),
+        func.count(case((is_active, 1))).label('active'),
+        func.count(case((SubscriptionCard.status == 'paused', 1))).label('paused'),
+        func.coalesce(func.sum(case((is_active, SubscriptionCard.monthly_cost), else_=0)), 0).label('monthly_cost'),
+        func.coalesce(func.sum(SubscriptionCard.total_paid), 0).label('total_paid'),
+        *[
+            func.coalesce(func.sum(case(
+                (and_(is_active, SubscriptionCard.next_billing_date <= month_end), SubscriptionCard.monthly_cost),
+                else_=0
+            )), 0).label(f'month_{k}')
+            for k, month_end in enumerate(month_ends)
+        ]
+    ).filter(SubscriptionCard.user_id == current_user_id).one()
     
     # Find next billing subscription
     next_billing = None
-    if active_subscriptions:
-        next_sub = min(active_subscriptions, key=lambda s: s.next_billing_date)
+    next_sub = db.session.query(
+        SubscriptionCard.service_name, SubscriptionCard.monthly_cost, SubscriptionCard.next_billing_date
+    ).filter(
+        SubscriptionCard.user_id == current_user_id,
+        is_active
+    ).order_by(SubscriptionCard.next_billing_date, SubscriptionCard.id).first()
+    if next_sub:
         next_billing = {
             'service_name': next_sub.service_name,
             'amount': float(next_sub.monthly_cost),
@@ -447,18 +488,26 @@ def get_statistics():
         }
     
     # Category breakdown
-    category_spending = {}
-    for sub in active_subscriptions:
-        if sub.category not in category_spending:
-            category_spending[sub.category] = 0
-        category_spending[sub.category] += float(sub.monthly_cost)
+    category_rows = db.session.query(
+        SubscriptionCard.category, func.sum(SubscriptionCard.monthly_cost)
+    ).filter(
+        SubscriptionCard.user_id == current_user_id,
+        is_active
+    ).group_by(SubscriptionCard.category).all()
+    category_spending = {category: round(float(amount), 2) for category, amount in category_rows}
+    
+    projected_spend = [
+        {'month': month_end.strftime('%Y-%m'), 'amount': round(float(getattr(totals, f'month_{k}')), 2)}
+        for k, month_end in enumerate(month_ends)
+    ]
     
     return jsonify({
-        'total_subscriptions': len(subscriptions),
-        'active_subscriptions': len(active_subscriptions),
-        'paused_subscriptions': len(paused_subscriptions),
-        'total_monthly_cost': float(total_monthly_cost),
-        'total_paid': float(total_paid),
+        'total_subscriptions': totals.total,
+        'active_subscriptions': totals.active,
+        'paused_subscriptions': totals.paused,
+        'total_monthly_cost': round(float(totals.monthly_cost), 2),
+        'total_paid': round(float(totals.total_paid), 2),
         'next_billing': next_billing,
-        'category_spending': category_spending
+        'category_spending': category_spending,
+        'projected_spend': projected_spend
     })
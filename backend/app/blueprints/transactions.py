@@ -1,7 +1,8 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models import Transaction
-from datetime import datetime, timedelta
+from app.services.recurrence import MAX_WINDOW_DAYS, upcoming_occurrences
+from datetime import date, datetime, timedelta
 from dateutil.relativedelta import relativedelta
 from sqlalchemy import or_
 
@@ -77,6 +78,32 @@ def get_transactions():
         'per_page': per_page
     }), 200
 
+@transactions_bp.route('/upcoming', methods=['GET'])
+@jwt_required()
+def get_upcoming_transactions():
+    """Scheduled payments and recurring occurrences expanded for a date window"""
+    user_id = int(get_jwt_identity())
+    
+    try:
+        start = date.fromisoformat(request.args['start']) if request.args.get('start') else datetime.utcnow().date()
+        end = date.fromisoformat(request.args['end']) if request.args.get('end') else start + timedelta(days=90)
+    except ValueError:
+        return jsonify({'error': 'Invalid date format, expected YYYY-MM-DD'}), 400
+    
+    if end < start:
+        return jsonify({'error': 'end must not be before start'}), 400
+    if (end - start).days > MAX_WINDOW_DAYS:
+        return jsonify({'error': f'Window cannot exceed {MAX_WINDOW_DAYS} days'}), 400
+    
+    occurrences = upcoming_occurrences(user_id, start, end)
+    
+    return jsonify({
+        'transactions': occurrences,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'total': len(occurrences)
+    }), 200
+
 @transactions_bp.route('/<int:transaction_id>', methods=['GET'])
 @jwt_required()
 def get_transaction(transaction_id):
@@ -0,0 +1,36 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.services.user_directory import DEFAULT_LIMIT, search_users
+
+users_bp = Blueprint('users', __name__)
+
+@users_bp.route('/search', methods=['GET'])
+@jwt_required()
+def search():
+    """
+    Find users by username or name prefix (recipient pickers).
+    
+    Query Params:
+        q (str): Start of a username or "first last" name (case-insensitive)
+        limit (int, optional): Page size (1-50, default 20)
+        cursor (str, optional): next_cursor from the previous page
+    """
+    user_id = int(get_jwt_identity())
+    
+    try:
+        limit = int(request.args.get('limit', DEFAULT_LIMIT))
+        users, next_cursor = search_users(
+            request.args.get('q', ''), limit, request.args.get('cursor'), exclude_user_id=user_id
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'users': [{
+            'id': user.id,
+            'username': user.username,
+            'first_name': user.first_name,
+            'last_name': user.last_name
+        } for user in users],
+        'next_cursor': next_cursor
+    }), 200
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.extensions import db
 from app.models import User, Wallet, Transaction
+from app.services.round_ups import record_round_up
 from app.utils.validators import TransferSchema, TopUpSchema, sanitize_html
 from marshmallow import ValidationError
 from datetime import datetime, timedelta
@@ -143,6 +144,7 @@ def transfer_money():
         
         sender_wallet.balance -= amount
         receiver_wallet.balance += amount
+        record_round_up(sender_wallet, amount, 'transfer')
         
         sender_transaction = Transaction(
             user_id=sender_id,
@@ -4,7 +4,12 @@ from flask_socketio import SocketIO
 from flask_cors import CORS
 from flask_migrate import Migrate
 from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
+from app.services.rate_limit import user_or_remote_address  # also registers the sqlite:// storage
+from app.services.token_blocklist import TokenBlocklist
+from app.services.card_auth_cache import CardAuthCache
+from app.services.user_directory import UserSearchCache
+from app.services.image_store import ImageStore
+from app.services.seller_profiles import SellerProfileCache
 
 db = SQLAlchemy()
 jwt = JWTManager()
@@ -12,9 +17,24 @@ socketio = SocketIO(cors_allowed_origins='*')
 cors = CORS()
 migrate = Migrate()
 
+# JWT deny-list - checked by jwt.token_in_blocklist_loader in create_app()
+token_blocklist = TokenBlocklist()
+
+# Card authorisation state for the payment path - invalidated by VirtualCard updates
+card_auth_cache = CardAuthCache()
+
+# Hot prefix pages of the user directory search - cleared on username/name changes
+user_search_cache = UserSearchCache()
+
+# Content-addressed marketplace image files - served by /api/images
+image_store = ImageStore()
+
+# Public seller profiles shown on marketplace listings - invalidated by User updates
+seller_profile_cache = SellerProfileCache()
+
 # Rate limiter - initialized with app in create_app()
+# Storage and strategy come from RATELIMIT_STORAGE_URI / RATELIMIT_STRATEGY in config.py
 limiter = Limiter(
-    key_func=get_remote_address,
-    default_limits=["1000 per day", "100 per hour"],
-    storage_uri="memory://"  # Will be configured to Redis in production
+    key_func=user_or_remote_address,
+    default_limits=["1000 per day", "100 per hour"]
 )
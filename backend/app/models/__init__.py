@@ -1,13 +1,18 @@
 from app.models.user import User
 from app.models.wallet import Wallet
 from app.models.transaction import Transaction
+from app.models.recurring_series import RecurringSeries
 from app.models.virtual_card import VirtualCard
+from app.models.card_number_sequence import CardNumberSequence
+from app.models.card_spend_counter import CardSpendCounter
 from app.models.subscription import Subscription
 from app.models.subscription_card import SubscriptionCard
 from app.models.savings_pocket import SavingsPocket
+from app.models.round_up_entry import RoundUpEntry
 from app.models.goal import Goal
-from app.models.marketplace import MarketplaceListing, MarketplaceOrder
-from app.models.loan import Loan, LoanRepayment
+from app.models.marketplace import MarketplaceFacetCount, MarketplaceListing, MarketplaceOrder
+from app.models.loan import Loan, LoanInstalment, LoanRepayment
+from app.models.notification import Notification
 from app.models.isic_profile import ISICProfile
 from app.models.merchant import Merchant
 from app.models.discount_application import DiscountApplication
@@ -17,15 +22,22 @@ __all__ = [
     'User',
     'Wallet',
     'Transaction',
+    'RecurringSeries',
     'VirtualCard',
+    'CardNumberSequence',
+    'CardSpendCounter',
     'Subscription',
     'SubscriptionCard',
     'SavingsPocket',
+    'RoundUpEntry',
     'Goal',
     'MarketplaceListing',
     'MarketplaceOrder',
+    'MarketplaceFacetCount',
     'Loan',
     'LoanRepayment',
+    'LoanInstalment',
+    'Notification',
     'ISICProfile',
     'Merchant',
     'DiscountApplication',
@@ -0,0 +1,16 @@
+from datetime import datetime
+from app.extensions import db
+
+class CardNumberSequence(db.Model):
+    """
+    Counter rows used by the card number allocator (app.services.card_numbers).
+    
+    Each allocator reserves a block of serials by advancing next_value in its own
+    short transaction, then turns the serials into card numbers in memory.
+    """
+    __tablename__ = 'card_number_sequences'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    next_value = db.Column(db.BigInteger, nullable=False, default=0)
+    
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
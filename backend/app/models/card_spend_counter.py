@@ -0,0 +1,27 @@
+from datetime import datetime
+from decimal import Decimal
+from app.extensions import db
+
+class CardSpendCounter(db.Model):
+    """
+    Running spend total of a card for its current daily or monthly window.
+    
+    One row per (card, period). When window_start is older than the current
+    window the amount belongs to a past window and counts as zero; the next
+    payment rolls the row forward. Maintained by app.services.spend_counters in
+    the same commit as the payment it records.
+    """
+    __tablename__ = 'card_spend_counters'
+    
+    card_id = db.Column(db.Integer, db.ForeignKey('virtual_cards.id', ondelete='CASCADE'), primary_key=True)
+    period = db.Column(db.String(10), primary_key=True)  # 'daily' or 'monthly'
+    window_start = db.Column(db.Date, nullable=False)
+    amount = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def current_amount(self, window_start):
+        """Spend in the window starting at window_start (0 if the row is stale)"""
+        if self.window_start != window_start:
+            return Decimal('0.00')
+        return Decimal(str(self.amount)).quantize(Decimal('0.01'))
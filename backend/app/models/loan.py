@@ -1,24 +1,33 @@
 from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal
 from app.extensions import db
 
+CENT = Decimal('0.01')
+
 class Loan(db.Model):
     __tablename__ = 'loans'
     
     id = db.Column(db.Integer, primary_key=True)
-    lender_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
-    borrower_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    lender_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    borrower_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
     amount = db.Column(db.Numeric(10, 2), nullable=False)
     currency = db.Column(db.String(3), default='USD')
     
     amount_repaid = db.Column(db.Numeric(10, 2), default=0.00)
     
-    status = db.Column(db.String(20), default='pending', index=True)
+    status = db.Column(db.String(20), default='pending')
     
     description = db.Column(db.String(255))
     due_date = db.Column(db.Date)
     
-    interest_rate = db.Column(db.Numeric(5, 2), default=0.00)
+    interest_rate = db.Column(db.Numeric(5, 2), default=0.00)  # annual %, simple interest accrued daily
+    
+    # Maintained by the daily accrual job (app.services.loan_interest); repayments
+    # pay accrued interest first, so amount_repaid - interest_repaid is principal
+    accrued_interest = db.Column(db.Numeric(12, 4), default=0)
+    interest_repaid = db.Column(db.Numeric(12, 4), default=0)
+    interest_accrued_through = db.Column(db.Date)
     
     is_fully_repaid = db.Column(db.Boolean, default=False)
     
@@ -26,21 +35,58 @@ class Loan(db.Model):
     repaid_at = db.Column(db.DateTime)
     cancelled_at = db.Column(db.DateTime)
     
+    # Set by the overdue-loan scanner (app.services.overdue_loans)
+    overdue_at = db.Column(db.DateTime)
+    last_reminder_at = db.Column(db.DateTime)
+    
+    # Optional instalment plan, scheduled on approval (app.services.loan_instalments)
+    instalment_count = db.Column(db.SmallInteger)
+    instalment_frequency = db.Column(db.String(10))  # weekly, monthly
+    
     lender = db.relationship('User', foreign_keys=[lender_id], backref='loans_given')
     borrower = db.relationship('User', foreign_keys=[borrower_id], backref='loans_taken')
     repayments = db.relationship('LoanRepayment', backref='loan', lazy='dynamic', cascade='all, delete-orphan')
+    instalments = db.relationship('LoanInstalment', backref='loan', lazy='dynamic', cascade='all, delete-orphan',
+                                  order_by='LoanInstalment.sequence')
+    
+    __table_args__ = (
+        # The loans dashboard reads both sides of a user's loans by status in one
+        # OR query; these also serve plain lender_id / borrower_id lookups
+        db.Index('ix_loans_lender_status', 'lender_id', 'status'),
+        db.Index('ix_loans_borrower_status', 'borrower_id', 'status'),
+        # Only open loans can fall overdue; the scanner walks this small index by due date
+        db.Index('ix_loans_open_due_date', 'due_date',
+                 postgresql_where=db.and_(status == 'active', is_fully_repaid == False),
+                 sqlite_where=db.and_(status == 'active', is_fully_repaid == False)),
+    )
+    
+    @property
+    def interest_outstanding(self):
+        return Decimal(self.accrued_interest or 0) - Decimal(self.interest_repaid or 0)
+    
+    def balance_due(self):
+        """Principal plus accrued interest still owed, in cents"""
+        owed = Decimal(self.amount) + Decimal(self.accrued_interest or 0) - Decimal(self.amount_repaid or 0)
+        return max(owed, Decimal('0')).quantize(CENT, rounding=ROUND_HALF_UP)
+    
+    def apply_repayment(self, amount):
+        """Record a repayment, interest first; returns (interest_part, principal_part)"""
+        interest_due = max(self.interest_outstanding, Decimal('0')).quantize(CENT, rounding=ROUND_HALF_UP)
+        interest_part = min(amount, interest_due)
+        self.interest_repaid = Decimal(self.interest_repaid or 0) + interest_part
+        self.amount_repaid = Decimal(self.amount_repaid or 0) + amount
+        return interest_part, amount - interest_part
     
     @property
     def amount_remaining(self):
-        return float(self.amount) - float(self.amount_repaid)
+        return float(self.balance_due())
     
     @property
     def is_overdue(self):
-        if self.is_fully_repaid or self.status == 'repaid':
+        # Flagged in bulk by the scanner rather than worked out per request
+        if self.is_fully_repaid or self.status != 'active':
             return False
-        if self.due_date and datetime.now().date() > self.due_date:
-            return True
-        return False
+        return self.overdue_at is not None
     
     @property
     def days_overdue(self):
@@ -64,6 +110,10 @@ class Loan(db.Model):
             'deadline': self.due_date.isoformat() if self.due_date else None,
             'due_date': self.due_date.isoformat() if self.due_date else None,
             'interest_rate': float(self.interest_rate),
+            'accrued_interest': round(float(self.accrued_interest or 0), 2),
+            'interest_outstanding': float(max(self.interest_outstanding, Decimal('0')).quantize(CENT, rounding=ROUND_HALF_UP)),
+            'instalment_count': self.instalment_count,
+            'instalment_frequency': self.instalment_frequency,
             'is_fully_repaid': self.is_fully_repaid,
             'is_overdue': self.is_overdue,
             'days_overdue': self.days_overdue,
@@ -79,6 +129,7 @@ class LoanRepayment(db.Model):
     loan_id = db.Column(db.Integer, db.ForeignKey('loans.id'), nullable=False, index=True)
     
     amount = db.Column(db.Numeric(10, 2), nullable=False)
+    interest_amount = db.Column(db.Numeric(10, 2), default=0)  # part of amount that paid accrued interest
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
@@ -87,5 +138,44 @@ class LoanRepayment(db.Model):
             'id': self.id,
             'loan_id': self.loan_id,
             'amount': float(self.amount),
+            'interest_amount': float(self.interest_amount or 0),
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
+
+class LoanInstalment(db.Model):
+    """One scheduled payment of a loan's instalment plan, auto-debited on its due date"""
+    __tablename__ = 'loan_instalments'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    loan_id = db.Column(db.Integer, db.ForeignKey('loans.id'), nullable=False)
+    sequence = db.Column(db.SmallInteger, nullable=False)  # 1-based; the last one also clears any interest
+    
+    due_date = db.Column(db.Date, nullable=False)
+    amount = db.Column(db.Numeric(10, 2), nullable=False)
+    amount_paid = db.Column(db.Numeric(10, 2), default=0)
+    
+    status = db.Column(db.String(10), default='scheduled')  # scheduled, paid, cancelled
+    attempts = db.Column(db.SmallInteger, default=0)
+    last_attempt_on = db.Column(db.Date)
+    paid_at = db.Column(db.DateTime)
+    
+    __table_args__ = (
+        db.UniqueConstraint('loan_id', 'sequence', name='uq_loan_instalments_loan_sequence'),
+        # The auto-debit runner walks only instalments still to be collected, by due date
+        db.Index('ix_loan_instalments_scheduled_due', 'due_date', 'id',
+                 postgresql_where=(status == 'scheduled'), sqlite_where=(status == 'scheduled')),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'loan_id': self.loan_id,
+            'sequence': self.sequence,
+            'due_date': self.due_date.isoformat() if self.due_date else None,
+            'amount': float(self.amount),
+            'amount_paid': float(self.amount_paid or 0),
+            'status': self.status,
+            'attempts': self.attempts or 0,
+            'last_attempt_on': self.last_attempt_on.isoformat() if self.last_attempt_on else None,
+            'paid_at': self.paid_at.isoformat() if self.paid_at else None
+        }
@@ -1,5 +1,26 @@
 from datetime import datetime
+from sqlalchemy import DDL, event, inspect
 from app.extensions import db
+from app.services.image_store import image_urls, is_image_name
+from app.services.marketplace_search import FACETS, apply_facet_deltas, facet_keys
+from app.services.seller_profiles import seller_profiles
+
+
+def search_document(title, description, course):
+    """Text searched by the marketplace search (the PostgreSQL FTS index is on this expression)"""
+    # Literals rather than bound parameters, so queries repeat the index expression exactly
+    empty, space = db.literal_column("''"), db.literal_column("' '")
+    return db.func.to_tsvector(
+        db.literal_column("'simple'"),
+        db.func.coalesce(title, empty).op('||')(space).op('||')(db.func.coalesce(description, empty))
+        .op('||')(space).op('||')(db.func.coalesce(course, empty))
+    )
+
+# Predicate of the open-listing partial indexes, as each dialect compiles
+# is_available == True AND is_sold == False (so the planner can match it)
+OPEN_LISTINGS_PG = db.text('is_available = true AND is_sold = false')
+OPEN_LISTINGS_SQLITE = db.text('is_available = 1 AND is_sold = 0')
+
 
 class MarketplaceListing(db.Model):
     __tablename__ = 'marketplace_listings'
@@ -9,28 +30,43 @@ class MarketplaceListing(db.Model):
     
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
-    category = db.Column(db.String(50), index=True)
+    category = db.column_property(db.Column(db.String(50), index=True), active_history=True)
     
     price = db.Column(db.Numeric(10, 2), nullable=False)
     currency = db.Column(db.String(3), default='USD')
     
-    university = db.Column(db.String(100), index=True)
+    university = db.column_property(db.Column(db.String(100), index=True), active_history=True)
     faculty = db.Column(db.String(100))
     course = db.Column(db.String(100))
     
-    condition = db.Column(db.String(20))
+    condition = db.column_property(db.Column(db.String(20)), active_history=True)
     
-    is_available = db.Column(db.Boolean, default=True, index=True)
-    is_sold = db.Column(db.Boolean, default=False, index=True)
+    # Facet fields load their old value when changed, so the facet counters
+    # know which counts a listing leaves (see the listeners below)
+    is_available = db.column_property(db.Column(db.Boolean, default=True), active_history=True)
+    is_sold = db.column_property(db.Column(db.Boolean, default=False), active_history=True)
     
-    images = db.Column(db.JSON)
+    images = db.Column(db.JSON)  # file names in the image store, not the image data
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     orders = db.relationship('MarketplaceOrder', backref='listing', lazy='dynamic')
     
-    def to_dict(self, include_seller=False):
+    # The browse/search page only ever reads open listings, newest first; these
+    # serve it with and without the exact-match facet filters (keyset on created_at, id)
+    __table_args__ = (
+        db.Index('ix_marketplace_listings_open_created', 'created_at', 'id',
+                 postgresql_where=OPEN_LISTINGS_PG, sqlite_where=OPEN_LISTINGS_SQLITE),
+        db.Index('ix_marketplace_listings_open_category', 'category', 'created_at', 'id',
+                 postgresql_where=OPEN_LISTINGS_PG, sqlite_where=OPEN_LISTINGS_SQLITE),
+        db.Index('ix_marketplace_listings_open_university', 'university', 'created_at', 'id',
+                 postgresql_where=OPEN_LISTINGS_PG, sqlite_where=OPEN_LISTINGS_SQLITE),
+        db.Index('ix_marketplace_listings_fts', search_document(title, description, course),
+                 postgresql_using='gin').ddl_if(dialect='postgresql'),
+    )
+    
+    def to_dict(self, include_seller=False, sellers=None):
         data = {
             'id': self.id,
             'seller_id': self.seller_id,
@@ -45,30 +81,100 @@ class MarketplaceListing(db.Model):
             'condition': self.condition,
             'is_available': self.is_available,
             'is_sold': self.is_sold,
-            'images': self.images,
+            'images': [image_urls(name) for name in self.images or [] if is_image_name(name)],
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
         
-        if include_seller and self.seller:
-            data['seller'] = {
-                'id': self.seller.id,
-                'username': self.seller.username,
-                'first_name': self.seller.first_name,
-                'last_name': self.seller.last_name,
-                'university': self.seller.university,
-                'faculty': self.seller.faculty,
-                'email': self.seller.email,
-                'created_at': self.seller.created_at.isoformat() if self.seller.created_at else None
-            }
+        # sellers: seller_profiles() already fetched for a whole page of listings
+        if include_seller:
+            seller = (sellers if sellers is not None else seller_profiles([self.seller_id])).get(self.seller_id)
+            if seller is not None:
+                data['seller'] = seller._asdict()
         
         return data
 
+# SQLite has no tsvector; an FTS5 table over the same columns, kept in step by triggers
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS marketplace_listings_fts USING fts5("
+    "title, description, course, content='marketplace_listings', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS marketplace_listings_fts_ai AFTER INSERT ON marketplace_listings BEGIN "
+    "INSERT INTO marketplace_listings_fts(rowid, title, description, course) "
+    "VALUES (new.id, new.title, new.description, new.course); END",
+    "CREATE TRIGGER IF NOT EXISTS marketplace_listings_fts_ad AFTER DELETE ON marketplace_listings BEGIN "
+    "INSERT INTO marketplace_listings_fts(marketplace_listings_fts, rowid, title, description, course) "
+    "VALUES ('delete', old.id, old.title, old.description, old.course); END",
+    "CREATE TRIGGER IF NOT EXISTS marketplace_listings_fts_au AFTER UPDATE OF title, description, course "
+    "ON marketplace_listings BEGIN "
+    "INSERT INTO marketplace_listings_fts(marketplace_listings_fts, rowid, title, description, course) "
+    "VALUES ('delete', old.id, old.title, old.description, old.course); "
+    "INSERT INTO marketplace_listings_fts(rowid, title, description, course) "
+    "VALUES (new.id, new.title, new.description, new.course); END",
+]
+
+for statement in SQLITE_FTS_DDL:
+    event.listen(MarketplaceListing.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+event.listen(MarketplaceListing.__table__, 'before_drop',
+             DDL('DROP TABLE IF EXISTS marketplace_listings_fts').execute_if(dialect='sqlite'))
+
+
+def _facet_values(target, previous=False):
+    """The listing's facet fields, as they are now or as they were before this flush"""
+    state = inspect(target)
+    values = {}
+    for field in ('is_available', 'is_sold') + FACETS:
+        value = getattr(target, field)
+        if previous:
+            history = state.attrs[field].history
+            if history.deleted:
+                value = history.deleted[0]
+        values[field] = value
+    return values
+
+
+@event.listens_for(MarketplaceListing, 'after_insert')
+def count_new_listing(mapper, connection, target):
+    apply_facet_deltas(connection, facet_keys(_facet_values(target)), 1)
+
+
+@event.listens_for(MarketplaceListing, 'after_update')
+def recount_listing(mapper, connection, target):
+    """Move the listing between facet counts when it sells, is withdrawn or is re-filed"""
+    before = facet_keys(_facet_values(target, previous=True))
+    after = facet_keys(_facet_values(target))
+    if before != after:
+        apply_facet_deltas(connection, before - after, -1)
+        apply_facet_deltas(connection, after - before, 1)
+
+
+@event.listens_for(MarketplaceListing, 'after_delete')
+def uncount_listing(mapper, connection, target):
+    apply_facet_deltas(connection, facet_keys(_facet_values(target, previous=True)), -1)
+
+
+class MarketplaceFacetCount(db.Model):
+    """
+    Number of open listings per facet value (category, university, condition).
+    
+    Maintained by the MarketplaceListing listeners in the flush that changes a
+    listing, so the search page reads facet counts without counting listings.
+    Bulk UPDATEs bypass the listeners; rebuild with
+    app.services.marketplace_search.rebuild_facet_counts().
+    """
+    __tablename__ = 'marketplace_facet_counts'
+    
+    facet = db.Column(db.String(20), primary_key=True)
+    value = db.Column(db.String(100), primary_key=True)
+    listing_count = db.Column(db.Integer, nullable=False, default=0)
+
 class MarketplaceOrder(db.Model):
     __tablename__ = 'marketplace_orders'
     
     id = db.Column(db.Integer, primary_key=True)
     listing_id = db.Column(db.Integer, db.ForeignKey('marketplace_listings.id'), nullable=False, index=True)
     buyer_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    # Copied from the listing so a seller's orders are one index range (see the index below)
+    seller_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
     amount = db.Column(db.Numeric(10, 2), nullable=False)
     status = db.Column(db.String(20), default='pending', index=True)
@@ -78,13 +184,19 @@ class MarketplaceOrder(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     completed_at = db.Column(db.DateTime)
     
-    buyer = db.relationship('User', backref='marketplace_purchases')
+    buyer = db.relationship('User', foreign_keys=[buyer_id], backref='marketplace_purchases')
+    
+    __table_args__ = (
+        # Seller order history, newest first (buyers use ix_marketplace_orders_buyer_id)
+        db.Index('ix_marketplace_orders_seller_id', 'seller_id', 'id'),
+    )
     
     def to_dict(self):
         return {
             'id': self.id,
             'listing_id': self.listing_id,
             'buyer_id': self.buyer_id,
+            'seller_id': self.seller_id,
             'amount': float(self.amount),
             'status': self.status,
             'escrow_released': self.escrow_released,
@@ -0,0 +1,41 @@
+from datetime import datetime
+from app.extensions import db
+
+class Notification(db.Model):
+    """
+    In-app notification queued for a user (e.g. overdue loan reminders).
+    
+    Batch jobs insert these in bulk; the client reads them through
+    /api/notifications and marks them read.
+    """
+    __tablename__ = 'notifications'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    
+    notification_type = db.Column(db.String(30), nullable=False)  # 'loan_overdue', 'loan_overdue_lender'
+    title = db.Column(db.String(120), nullable=False)
+    message = db.Column(db.String(255), nullable=False)
+    notification_metadata = db.Column(db.JSON)
+    
+    is_read = db.Column(db.Boolean, default=False)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    read_at = db.Column(db.DateTime)
+    
+    __table_args__ = (
+        # Listing reads a user's newest notifications first
+        db.Index('ix_notifications_user_created', 'user_id', 'created_at'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'type': self.notification_type,
+            'title': self.title,
+            'message': self.message,
+            'metadata': self.notification_metadata,
+            'is_read': bool(self.is_read),
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'read_at': self.read_at.isoformat() if self.read_at else None
+        }
@@ -0,0 +1,54 @@
+from datetime import datetime
+from app.extensions import db
+
+class RecurringSeries(db.Model):
+    """
+    Recurrence rule for a repeating expected payment (RRULE-style).
+    
+    Stored once per series and expanded on demand by app.services.recurrence;
+    only occurrences that exist as real Transaction rows (series_id +
+    occurrence_date) are persisted.
+    """
+    __tablename__ = 'recurring_series'
+    
+    FREQUENCIES = ('weekly', 'monthly', 'yearly')
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    
+    title = db.Column(db.String(255), nullable=False)
+    amount = db.Column(db.Numeric(10, 2), nullable=False)
+    currency = db.Column(db.String(3), default='USD')
+    transaction_type = db.Column(db.String(50), default='payment')
+    transaction_source = db.Column(db.String(20), default='main_wallet')
+    category = db.Column(db.String(50), default='other')
+    notes = db.Column(db.Text)
+    
+    # Rule: every `interval` weeks/months/years from start_date, until until_date (inclusive)
+    frequency = db.Column(db.String(20), nullable=False)
+    interval = db.Column(db.Integer, nullable=False, default=1)
+    start_date = db.Column(db.Date, nullable=False)
+    until_date = db.Column(db.Date, nullable=True)
+    
+    is_active = db.Column(db.Boolean, default=True, index=True)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'title': self.title,
+            'amount': float(self.amount),
+            'currency': self.currency,
+            'transaction_type': self.transaction_type,
+            'category': self.category,
+            'notes': self.notes,
+            'frequency': self.frequency,
+            'interval': self.interval,
+            'start_date': self.start_date.isoformat() if self.start_date else None,
+            'until_date': self.until_date.isoformat() if self.until_date else None,
+            'is_active': self.is_active,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
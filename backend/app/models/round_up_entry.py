@@ -0,0 +1,37 @@
+from datetime import datetime
+from app.extensions import db
+
+class RoundUpEntry(db.Model):
+    """
+    Pending round-up of one payment, waiting to be settled into a savings pocket.
+    
+    Payments only append a row here (in the payment's own commit); the pocket,
+    wallet and Transaction ledger are updated later in batches by
+    app.services.round_ups.settle_round_ups, which deletes the rows it settles.
+    The sum of a user's rows is their "pending round-ups" figure.
+    """
+    __tablename__ = 'round_up_entries'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    pocket_id = db.Column(db.Integer, db.ForeignKey('savings_pockets.id', ondelete='CASCADE'), nullable=False)
+    
+    source = db.Column(db.String(30), nullable=False)  # 'card_payment', 'purchase' or 'transfer'
+    payment_amount = db.Column(db.Numeric(10, 2), nullable=False)
+    amount = db.Column(db.Numeric(10, 2), nullable=False)
+    
+    # Set while a settlement transaction is processing the row
+    settlement_token = db.Column(db.String(32), index=True)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'pocket_id': self.pocket_id,
+            'source': self.source,
+            'payment_amount': float(self.payment_amount),
+            'amount': float(self.amount),
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
@@ -14,7 +14,7 @@ class SavingsPocket(db.Model):
     auto_save_enabled = db.Column(db.Boolean, default=False)
     auto_save_percentage = db.Column(db.Numeric(5, 2), default=20.00)
     auto_save_frequency = db.Column(db.String(20))
-    next_auto_save_date = db.Column(db.Date)
+    next_auto_save_date = db.Column(db.Date, index=True)  # Sweep picks pockets due on or before today
     
     pin_protected = db.Column(db.Boolean, default=True)
     
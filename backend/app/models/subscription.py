@@ -14,8 +14,16 @@ class Subscription(db.Model):
     currency = db.Column(db.String(3), default='USD')
     billing_cycle = db.Column(db.String(20), default='monthly')
     
-    next_billing_date = db.Column(db.Date)
+    next_billing_date = db.Column(db.Date, index=True)
     last_payment_date = db.Column(db.Date)
+    billing_anchor_day = db.Column(db.SmallInteger)
+    
+    # Batch biller state (app.services.subscription_billing)
+    billing_failures = db.Column(db.Integer, nullable=False, default=0)
+    billing_retry_at = db.Column(db.DateTime)
+    billing_last_error = db.Column(db.String(255))
+    billing_claim_token = db.Column(db.String(32), index=True)
+    billing_claimed_at = db.Column(db.DateTime)
     
     is_active = db.Column(db.Boolean, default=True)
     auto_renew = db.Column(db.Boolean, default=True)
@@ -34,6 +42,9 @@ class Subscription(db.Model):
             'billing_cycle': self.billing_cycle,
             'next_billing_date': self.next_billing_date.isoformat() if self.next_billing_date else None,
             'last_payment_date': self.last_payment_date.isoformat() if self.last_payment_date else None,
+            'billing_failures': self.billing_failures or 0,
+            'billing_retry_at': self.billing_retry_at.isoformat() if self.billing_retry_at else None,
+            'billing_last_error': self.billing_last_error,
             'is_active': self.is_active,
             'auto_renew': self.auto_renew,
             'created_at': self.created_at.isoformat() if self.created_at else None
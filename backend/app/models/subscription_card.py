@@ -34,6 +34,7 @@ class SubscriptionCard(db.Model):
         status: Subscription status - "active", "paused", "pending"
         monthly_cost: Monthly subscription amount
         next_billing_date: Date of next automatic payment
+        billing_failures: Consecutive failed charges (reset on success)
         total_paid: Cumulative amount paid for this subscription
         created_at: Timestamp when subscription was created
         updated_at: Timestamp of last update
@@ -44,6 +45,10 @@ class SubscriptionCard(db.Model):
         - "pending": Awaiting activation or payment
     """
     __tablename__ = 'subscription_cards'
+    __table_args__ = (
+        # Per-user listings and statistics filter by status and order by billing date
+        db.Index('ix_subscription_cards_user_status_billing', 'user_id', 'status', 'next_billing_date'),
+    )
     
     # Primary Key
     id = db.Column(db.Integer, primary_key=True)
@@ -67,8 +72,16 @@ class SubscriptionCard(db.Model):
     total_paid = db.Column(db.Numeric(10, 2), default=0.00)
     
     # Billing Information
-    next_billing_date = db.Column(db.Date, nullable=False)
+    next_billing_date = db.Column(db.Date, nullable=False, index=True)
     last_billing_date = db.Column(db.Date)
+    billing_anchor_day = db.Column(db.SmallInteger)  # Day of month billing sticks to (set on first charge)
+    
+    # Batch biller state (app.services.subscription_billing)
+    billing_failures = db.Column(db.Integer, nullable=False, default=0)  # Consecutive failed charges
+    billing_retry_at = db.Column(db.DateTime)  # Not retried before this time after a failure
+    billing_last_error = db.Column(db.String(255))
+    billing_claim_token = db.Column(db.String(32), index=True)  # Claim held by a biller run (SQLite)
+    billing_claimed_at = db.Column(db.DateTime)
     
     # Metadata for custom subscriptions
     is_custom = db.Column(db.Boolean, default=False)  # True if user-defined service
@@ -99,6 +112,9 @@ class SubscriptionCard(db.Model):
             'total_paid': float(self.total_paid),
             'next_billing_date': self.next_billing_date.isoformat() if self.next_billing_date else None,
             'last_billing_date': self.last_billing_date.isoformat() if self.last_billing_date else None,
+            'billing_failures': self.billing_failures or 0,
+            'billing_retry_at': self.billing_retry_at.isoformat() if self.billing_retry_at else None,
+            'billing_last_error': self.billing_last_error,
             'is_custom': self.is_custom,
             'icon_url': self.icon_url,
             'description': self.description,
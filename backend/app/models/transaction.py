@@ -4,6 +4,9 @@ from app.extensions import db
 class Transaction(db.Model):
     __tablename__ = 'transactions'
     
+    # Money coming in from outside the user's own accounts
+    INCOME_TYPES = ('income', 'topup', 'transfer_received', 'refund', 'sale')
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     
@@ -22,9 +25,18 @@ class Transaction(db.Model):
     
     card_id = db.Column(db.Integer, db.ForeignKey('virtual_cards.id'), nullable=True, index=True)
     
+    # Persisted occurrence of a recurring series (see app.services.recurrence)
+    series_id = db.Column(db.Integer, db.ForeignKey('recurring_series.id'), nullable=True, index=True)
+    occurrence_date = db.Column(db.Date, nullable=True)
+    
     created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     completed_at = db.Column(db.DateTime)
     
+    __table_args__ = (
+        # One row per occurrence of a series, however many requests race to persist it
+        db.UniqueConstraint('user_id', 'series_id', 'occurrence_date', name='uq_transactions_series_occurrence'),
+    )
+    
     sender = db.relationship('User', foreign_keys=[sender_id], backref='sent_transactions')
     receiver = db.relationship('User', foreign_keys=[receiver_id], backref='received_transactions')
     
@@ -41,6 +53,8 @@ class Transaction(db.Model):
             'receiver_id': self.receiver_id,
             'description': self.description,
             'metadata': self.transaction_metadata,
+            'series_id': self.series_id,
+            'occurrence_date': self.occurrence_date.isoformat() if self.occurrence_date else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'completed_at': self.completed_at.isoformat() if self.completed_at else None
         }
@@ -1,5 +1,7 @@
 from datetime import datetime
-from app.extensions import db
+from sqlalchemy import event
+from app.extensions import db, user_search_cache, seller_profile_cache
+from app.services.user_directory import fold, full_name_key
 from werkzeug.security import generate_password_hash, check_password_hash
 
 class User(db.Model):
@@ -13,6 +15,10 @@ class User(db.Model):
     
     first_name = db.Column(db.String(50))
     last_name = db.Column(db.String(50))
+    
+    # Case-folded copies for the directory search (see app.services.user_directory)
+    username_search = db.Column(db.String(80))
+    name_search = db.Column(db.String(101))
     date_of_birth = db.Column(db.Date)
     
     is_verified = db.Column(db.Boolean, default=False)
@@ -34,6 +40,12 @@ class User(db.Model):
     goals = db.relationship('Goal', backref='user', lazy='dynamic', cascade='all, delete-orphan')
     marketplace_listings = db.relationship('MarketplaceListing', backref='seller', lazy='dynamic', cascade='all, delete-orphan')
     
+    __table_args__ = (
+        # Prefix LIKE searches need pattern ops on PostgreSQL (non-C collations)
+        db.Index('ix_users_username_search', 'username_search', postgresql_ops={'username_search': 'text_pattern_ops'}),
+        db.Index('ix_users_name_search', 'name_search', postgresql_ops={'name_search': 'text_pattern_ops'}),
+    )
+    
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
     
@@ -61,3 +73,26 @@ class User(db.Model):
             'faculty': self.faculty,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
+
+
+@event.listens_for(User, 'before_insert')
+@event.listens_for(User, 'before_update')
+def sync_search_keys(mapper, connection, target):
+    """Keep the folded search columns in step with username and name"""
+    username_search = fold(target.username)
+    name_search = full_name_key(target.first_name, target.last_name)
+    if (target.username_search, target.name_search) != (username_search, name_search):
+        target.username_search = username_search
+        target.name_search = name_search
+        user_search_cache.clear()
+
+
+@event.listens_for(User, 'after_delete')
+def drop_from_search_cache(mapper, connection, target):
+    user_search_cache.clear()
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def drop_seller_profile(mapper, connection, target):
+    seller_profile_cache.invalidate(target.id)
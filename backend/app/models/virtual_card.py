@@ -1,6 +1,10 @@
 from datetime import datetime
 from decimal import Decimal
-from app.extensions import db
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.orm.attributes import set_committed_value
+from app.extensions import db, card_auth_cache
+from app.services.iban import iban_for_card
 import random
 import string
 
@@ -16,10 +20,12 @@ class VirtualCard(db.Model):
     # Payment Card Fields
     card_type = db.Column(db.String(20), default='standard')
     card_number = db.Column(db.String(16), unique=True, nullable=True)
+    iban = db.Column(db.String(34), unique=True, index=True, nullable=True)
     card_name = db.Column(db.String(100))
     cvv = db.Column(db.String(3), nullable=True)
     expiry_date = db.Column(db.Date)
-    spending_limit = db.Column(db.Numeric(10, 2))
+    spending_limit = db.Column(db.Numeric(10, 2))  # Per calendar month
+    daily_limit = db.Column(db.Numeric(10, 2), nullable=True)
     is_active = db.Column(db.Boolean, default=True)
     is_frozen = db.Column(db.Boolean, default=False)
     
@@ -48,40 +54,33 @@ class VirtualCard(db.Model):
         return Decimal(str(value)).quantize(Decimal('0.01'))
     
     @staticmethod
-    def generate_card_number(max_retries=10):
-        """Generate unique card number with collision detection"""
-        for _ in range(max_retries):
-            card_number = ''.join([str(random.randint(0, 9)) for _ in range(16)])
-            # Check if this number already exists
-            existing = VirtualCard.query.filter_by(card_number=card_number).first()
-            if not existing:
-                return card_number
-        # Fallback: add timestamp suffix for absolute uniqueness
-        timestamp_suffix = str(int(datetime.utcnow().timestamp()))[-6:]
-        base_number = ''.join([str(random.randint(0, 9)) for _ in range(10)])
-        return base_number + timestamp_suffix
+    def generate_card_number():
+        """Next unique, Luhn-valid card number from the preallocated in-memory pool"""
+        from app.services.card_numbers import card_number_allocator
+        return card_number_allocator.allocate()
     
     @staticmethod
     def generate_cvv():
         return ''.join([str(random.randint(0, 9)) for _ in range(3)])
     
-    @staticmethod
-    def generate_iban():
-        """Generate a fake IBAN for virtual cards (format: GB00UNIP1234567890)"""
-        return 'GB' + ''.join([str(random.randint(0, 9)) for _ in range(2)]) + 'UNIP' + ''.join([str(random.randint(0, 9)) for _ in range(10)])
-    
     @staticmethod
     def generate_swift():
         """Generate a fake SWIFT/BIC code for virtual cards (format: UNIPGB2L)"""
         return 'UNIPGB2L'
     
     def get_iban(self):
-        """Get or generate IBAN for all card types"""
-        # Generate based on card_id for consistency
-        random.seed(self.id)
-        iban = self.generate_iban()
-        random.seed()  # Reset seed
-        return iban
+        """Stored IBAN for all card types (derived from the card id, see app.services.iban)"""
+        if self.iban is None and self.id is not None:
+            return iban_for_card(self.id)
+        return self.iban
+    
+    @classmethod
+    def find_by_iban(cls, iban):
+        """Look up a card by IBAN (indexed, case/space-insensitive)"""
+        normalized = ''.join((iban or '').split()).upper()
+        if not normalized:
+            return None
+        return cls.query.filter_by(iban=normalized).first()
     
     def get_swift(self):
         """Get SWIFT/BIC code for all card types"""
@@ -147,7 +146,36 @@ class VirtualCard(db.Model):
         self.allocated_amount += amount_decimal
         self.updated_at = datetime.utcnow()
     
-    def to_dict(self, include_sensitive=False):
+    @staticmethod
+    def summarize_subscriptions(subscriptions):
+        """
+        Single pass over a card's subscriptions.
+        
+        Returns dict with:
+            monthly_total: active monthly-cycle subscriptions only
+            total_monthly_spend: monthly_total plus active yearly subscriptions / 12
+            next_billing_date: earliest next_billing_date of active subscriptions (or None)
+        """
+        monthly_total = 0.0
+        yearly_total = 0.0
+        next_billing = None
+        for sub in subscriptions:
+            if not sub.is_active:
+                continue
+            if sub.billing_cycle == 'monthly':
+                monthly_total += float(sub.amount)
+            elif sub.billing_cycle == 'yearly':
+                yearly_total += float(sub.amount) / 12
+            if sub.next_billing_date and (next_billing is None or sub.next_billing_date < next_billing):
+                next_billing = sub.next_billing_date
+        
+        return {
+            'monthly_total': monthly_total,
+            'total_monthly_spend': monthly_total + yearly_total,
+            'next_billing_date': next_billing
+        }
+    
+    def to_dict(self, include_sensitive=False, subscriptions=None, subscription_summary=None):
         data = {
             'id': self.id,
             'user_id': self.user_id,
@@ -164,6 +192,7 @@ class VirtualCard(db.Model):
             data['card_number_last4'] = self.card_number[-4:] if self.card_number else None
             data['expiry_date'] = self.expiry_date.isoformat() if self.expiry_date else None
             data['spending_limit'] = float(self.spending_limit) if self.spending_limit else None
+            data['daily_limit'] = float(self.daily_limit) if self.daily_limit else None
             data['is_frozen'] = self.is_frozen
             
             if include_sensitive:
@@ -196,32 +225,63 @@ class VirtualCard(db.Model):
             data['color'] = self.color
             data['icon'] = self.icon
             
-            # Get subscription summary
-            subscriptions_list = self.subscriptions.all()
-            data['subscription_count'] = len(subscriptions_list)
-            data['subscriptions'] = [sub.to_dict() for sub in subscriptions_list]
-            
-            # Calculate total monthly spend
-            total_monthly = sum(
-                float(sub.amount) for sub in subscriptions_list 
-                if sub.is_active and sub.billing_cycle == 'monthly'
-            )
-            total_yearly = sum(
-                float(sub.amount) / 12 for sub in subscriptions_list 
-                if sub.is_active and sub.billing_cycle == 'yearly'
-            )
-            data['total_monthly_spend'] = total_monthly + total_yearly
-            
-            # Next billing date
-            active_subs = [sub for sub in subscriptions_list if sub.is_active and sub.next_billing_date]
-            if active_subs:
-                next_billing = min(sub.next_billing_date for sub in active_subs)
-                data['next_billing_date'] = next_billing.isoformat()
-            else:
-                data['next_billing_date'] = None
+            # Get subscription summary (callers listing many cards pass preloaded values)
+            if subscriptions is None:
+                subscriptions = self.subscriptions.all()
+            summary = subscription_summary or self.summarize_subscriptions(subscriptions)
+            data['subscription_count'] = len(subscriptions)
+            data['subscriptions'] = [sub.to_dict() for sub in subscriptions]
+            data['total_monthly_spend'] = summary['total_monthly_spend']
+            data['next_billing_date'] = summary['next_billing_date'].isoformat() if summary['next_billing_date'] else None
             
             if include_sensitive:
                 data['iban'] = self.get_iban()
                 data['swift'] = self.get_swift()
         
         return data
+
+
+@event.listens_for(VirtualCard, 'after_insert')
+def assign_iban(mapper, connection, target):
+    """Store the card's IBAN in the same flush that assigns its id"""
+    if target.iban is None:
+        iban = iban_for_card(target.id)
+        connection.execute(
+            VirtualCard.__table__.update()
+            .where(VirtualCard.__table__.c.id == target.id)
+            .values(iban=iban)
+        )
+        set_committed_value(target, 'iban', iban)
+
+
+# Columns CardAuthState is built from; spend and timestamp writes leave it valid
+AUTH_STATE_COLUMNS = ('user_id', 'card_purpose', 'is_active', 'is_frozen')
+
+
+@event.listens_for(VirtualCard, 'after_update')
+def invalidate_changed_auth_state(mapper, connection, target):
+    """Drop the cached authorisation state only when one of its columns changed"""
+    attrs = inspect(target).attrs
+    if any(attrs[name].history.has_changes() for name in AUTH_STATE_COLUMNS):
+        invalidate_auth_state(mapper, connection, target)
+
+
+@event.listens_for(VirtualCard, 'after_insert')
+@event.listens_for(VirtualCard, 'after_delete')
+def invalidate_auth_state(mapper, connection, target):
+    """Drop the card's cached authorisation state now and again once the change commits"""
+    card_auth_cache.invalidate(target.id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('card_auth_invalidations', set()).add(target.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def flush_auth_invalidations(session):
+    for card_id in session.info.pop('card_auth_invalidations', ()):
+        card_auth_cache.invalidate(card_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def discard_auth_invalidations(session):
+    session.info.pop('card_auth_invalidations', None)
@@ -12,6 +12,11 @@ class Wallet(db.Model):
     
     is_frozen = db.Column(db.Boolean, default=False)
     
+    # Round-ups: payments are rounded up to round_up_unit and the difference is
+    # saved into this pocket (None = round-ups off); see app.services.round_ups
+    round_up_pocket_id = db.Column(db.Integer, db.ForeignKey('savings_pockets.id', ondelete='SET NULL'), nullable=True)
+    round_up_unit = db.Column(db.Numeric(10, 2), nullable=True)
+    
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -22,5 +27,7 @@ class Wallet(db.Model):
             'balance': float(self.balance),
             'currency': self.currency,
             'is_frozen': self.is_frozen,
+            'round_up_pocket_id': self.round_up_pocket_id,
+            'round_up_unit': float(self.round_up_unit) if self.round_up_unit is not None else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
@@ -0,0 +1,195 @@
+"""
+Auto-save sweep for savings pockets (DarkDays): moves auto_save_percentage %
+of the owner's income over the last period into each due pocket, rounded down
+to the cent and capped at the wallet balance. Missed periods are skipped.
+"""
+from datetime import date, datetime, timedelta
+from decimal import ROUND_DOWN, Decimal
+
+from sqlalchemy import Date, and_, bindparam, func, insert, select, update
+
+from app.extensions import db
+from app.models import SavingsPocket, Transaction, Wallet
+from app.services.subscription_billing import add_months
+from app.services.wallet_locks import lock_wallets
+
+DEFAULT_CHUNK_SIZE = 500
+CENT = Decimal('0.01')
+
+
+def period_start(frequency: str, due: date) -> date:
+    """First day of the auto-save period ending on due."""
+    if frequency == 'weekly':
+        return due - timedelta(days=7)
+    return add_months(due, -1, due.day)
+
+
+def next_save_date(frequency: str, due: date, today: date) -> date:
+    """First scheduled date after today (missed periods are skipped, not replayed)."""
+    next_date = due
+    while next_date <= today:
+        if frequency == 'weekly':
+            next_date += timedelta(days=7)
+        else:
+            next_date = add_months(next_date, 1, due.day)
+    return next_date
+
+
+def _due_filter(today: date):
+    pockets = SavingsPocket.__table__
+    return and_(
+        pockets.c.next_auto_save_date <= today,
+        pockets.c.auto_save_enabled.is_(True)
+    )
+
+
+def _due_pocket_ids(today: date, after_id: int, limit: int):
+    pockets = SavingsPocket.__table__
+    return db.session.execute(
+        select(pockets.c.id)
+        .where(_due_filter(today), pockets.c.id > after_id)
+        .order_by(pockets.c.id)
+        .limit(limit)
+    ).scalars().all()
+
+
+def _period_income(rows, now: datetime) -> dict:
+    """
+    Income per pocket over each pocket's own period.
+
+    One aggregate query sums the owners' income per user and day since the
+    earliest period start in the chunk; each pocket then adds up its days.
+    """
+    starts = {row.id: period_start(row.auto_save_frequency, row.next_auto_save_date) for row in rows}
+    day = func.date(Transaction.created_at)
+    daily = db.session.execute(
+        select(Transaction.user_id, day, func.sum(Transaction.amount))
+        .where(
+            Transaction.user_id.in_({row.user_id for row in rows}),
+            Transaction.status == 'completed',
+            Transaction.transaction_type.in_(Transaction.INCOME_TYPES),
+            Transaction.created_at >= datetime.combine(min(starts.values()), datetime.min.time()),
+            Transaction.created_at < now
+        )
+        .group_by(Transaction.user_id, day)
+    ).all()
+
+    by_user = {}
+    for user_id, income_day, amount in daily:
+        if isinstance(income_day, str):
+            income_day = date.fromisoformat(income_day)
+        by_user.setdefault(user_id, []).append((income_day, Decimal(str(amount or 0))))
+
+    return {
+        row.id: sum((amount for income_day, amount in by_user.get(row.user_id, ()) if income_day >= starts[row.id]),
+                    Decimal('0.00'))
+        for row in rows
+    }
+
+
+def _process_chunk(ids, today: date, now: datetime) -> dict:
+    pockets = SavingsPocket.__table__
+    wallets = Wallet.__table__
+
+    rows = db.session.execute(
+        select(
+            pockets.c.id, pockets.c.user_id, pockets.c.name, pockets.c.auto_save_percentage,
+            pockets.c.auto_save_frequency, pockets.c.next_auto_save_date
+        )
+        .where(pockets.c.id.in_(ids), _due_filter(today))
+        .order_by(pockets.c.user_id, pockets.c.id)
+        .with_for_update()
+    ).all()
+    if not rows:
+        db.session.commit()
+        return {'pockets': 0, 'pockets_funded': 0, 'amount_saved': Decimal('0.00')}
+
+    available = {
+        user_id: Decimal('0.00') if wallet.is_frozen else Decimal(str(wallet.balance or 0))
+        for user_id, wallet in lock_wallets(row.user_id for row in rows).items()
+    }
+    income = _period_income(rows, now)
+
+    credits, debits, ledger = [], {}, []
+    for row in rows:
+        period_income = income[row.id]
+        percentage = Decimal(str(row.auto_save_percentage or 0))
+        amount = (period_income * percentage / 100).quantize(CENT, rounding=ROUND_DOWN)
+        amount = min(amount, available.get(row.user_id, Decimal('0.00')))
+        if amount < CENT:
+            amount = Decimal('0.00')
+
+        credits.append({
+            'pocket_id': row.id,
+            'credit': amount,
+            'next_date': next_save_date(row.auto_save_frequency, row.next_auto_save_date, today)
+        })
+        if not amount:
+            continue
+
+        available[row.user_id] -= amount
+        debits[row.user_id] = debits.get(row.user_id, Decimal('0.00')) + amount
+        ledger.append({
+            'user_id': row.user_id,
+            'transaction_type': 'savings_deposit',
+            'transaction_source': 'dark_days',
+            'amount': amount,
+            'status': 'completed',
+            'description': f'Auto-save to {row.name}',
+            'transaction_metadata': {
+                'pocket_id': row.id,
+                'pocket_name': row.name,
+                'auto_save': True,
+                'percentage': float(row.auto_save_percentage),
+                'period_income': float(period_income),
+                'period_start': period_start(row.auto_save_frequency, row.next_auto_save_date).isoformat()
+            },
+            'created_at': now,
+            'completed_at': now
+        })
+
+    db.session.connection().execute(
+        update(pockets)
+        .where(pockets.c.id == bindparam('pocket_id'))
+        .values(
+            balance=pockets.c.balance + bindparam('credit'),
+            next_auto_save_date=bindparam('next_date', type_=Date),
+            updated_at=now
+        ),
+        credits
+    )
+    if debits:
+        db.session.connection().execute(
+            update(wallets)
+            .where(wallets.c.user_id == bindparam('wallet_user_id'))
+            .values(balance=wallets.c.balance - bindparam('debit'), updated_at=now),
+            [{'wallet_user_id': user_id, 'debit': debit} for user_id, debit in debits.items()]
+        )
+        db.session.execute(insert(Transaction), ledger)
+
+    db.session.commit()
+    return {'pockets': len(rows), 'pockets_funded': len(ledger), 'amount_saved': sum(debits.values(), Decimal('0.00'))}
+
+
+def run_auto_save(now: datetime = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+    """Run every due auto-save; returns run totals."""
+    now = now or datetime.utcnow()
+    today = now.date()
+    summary = {'chunks': 0, 'pockets': 0, 'pockets_funded': 0, 'amount_saved': Decimal('0.00')}
+
+    last_id = 0
+    while True:
+        ids = _due_pocket_ids(today, last_id, chunk_size)
+        if not ids:
+            break
+        try:
+            result = _process_chunk(ids, today, now)
+        except Exception:
+            db.session.rollback()
+            raise
+        summary['chunks'] += 1
+        for key in ('pockets', 'pockets_funded', 'amount_saved'):
+            summary[key] += result[key]
+        last_id = ids[-1]
+
+    return summary
@@ -0,0 +1,161 @@
+"""
+Monthly budget card rollover: unspent allocation carries over, spent_amount
+resets, and auto_allocate cards are funded from the wallet in card id order
+while the balance covers them. last_reset_at makes a second run in a month a no-op.
+"""
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import and_, bindparam, func, insert, or_, select, update
+
+from app.extensions import db
+from app.models import Transaction, VirtualCard, Wallet
+from app.services.wallet_locks import lock_wallets
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def period_start(now: datetime) -> datetime:
+    """First instant of the month containing now."""
+    return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _due_filter(start: datetime):
+    cards = VirtualCard.__table__
+    return and_(
+        cards.c.card_purpose == 'budget',
+        cards.c.is_active.is_(True),
+        func.coalesce(cards.c.last_reset_at, cards.c.created_at) < start
+    )
+
+
+def _due_user_ids(start: datetime, after_user_id: int, limit: int):
+    cards = VirtualCard.__table__
+    return db.session.execute(
+        select(cards.c.user_id)
+        .where(_due_filter(start), cards.c.user_id > after_user_id)
+        .group_by(cards.c.user_id)
+        .order_by(cards.c.user_id)
+        .limit(limit)
+    ).scalars().all()
+
+
+def _funded_cards(start: datetime, user_ids):
+    """Auto-allocating cards of user_ids that their wallets can cover, in one query."""
+    cards = VirtualCard.__table__
+    wallets = Wallet.__table__
+    running_total = func.sum(cards.c.auto_allocate_amount).over(
+        partition_by=cards.c.user_id, order_by=cards.c.id
+    ).label('running_total')
+    candidates = (
+        select(
+            cards.c.id, cards.c.user_id, cards.c.card_name,
+            cards.c.auto_allocate_amount, running_total,
+            wallets.c.balance
+        )
+        .join(wallets, wallets.c.user_id == cards.c.user_id)
+        .where(
+            _due_filter(start),
+            cards.c.user_id.in_(user_ids),
+            cards.c.auto_allocate.is_(True),
+            cards.c.auto_allocate_amount > 0,
+            or_(cards.c.is_frozen.is_(False), cards.c.is_frozen.is_(None)),
+            wallets.c.is_frozen.isnot(True)
+        )
+        .subquery()
+    )
+    return db.session.execute(
+        select(candidates.c.id, candidates.c.user_id, candidates.c.card_name, candidates.c.auto_allocate_amount)
+        .where(candidates.c.running_total <= candidates.c.balance)
+        .order_by(candidates.c.user_id, candidates.c.id)
+    ).all()
+
+
+def _process_chunk(start: datetime, now: datetime, user_ids) -> dict:
+    cards = VirtualCard.__table__
+    wallets = Wallet.__table__
+
+    # Held until commit, so _funded_cards sees balances transfers can't change
+    lock_wallets(user_ids)
+
+    funded = _funded_cards(start, user_ids)
+
+    reset_result = db.session.execute(
+        update(cards)
+        .where(_due_filter(start), cards.c.user_id.in_(user_ids))
+        .values(
+            allocated_amount=func.coalesce(cards.c.allocated_amount, 0) - func.coalesce(cards.c.spent_amount, 0),
+            spent_amount=0,
+            last_reset_at=now,
+            updated_at=now
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    allocated_total = Decimal('0.00')
+    if funded:
+        db.session.connection().execute(
+            update(cards)
+            .where(cards.c.id == bindparam('card_id'))
+            .values(allocated_amount=cards.c.allocated_amount + bindparam('amount')),
+            [{'card_id': row.id, 'amount': row.auto_allocate_amount} for row in funded]
+        )
+
+        debits = {}
+        for row in funded:
+            debits[row.user_id] = debits.get(row.user_id, Decimal('0.00')) + VirtualCard.to_decimal(row.auto_allocate_amount)
+        db.session.connection().execute(
+            update(wallets)
+            .where(wallets.c.user_id == bindparam('wallet_user_id'))
+            .values(balance=wallets.c.balance - bindparam('debit'), updated_at=now),
+            [{'wallet_user_id': uid, 'debit': debit} for uid, debit in debits.items()]
+        )
+
+        period = start.strftime('%Y-%m')
+        db.session.execute(
+            insert(Transaction),
+            [{
+                'user_id': row.user_id,
+                'transaction_type': 'budget_allocation',
+                'transaction_source': 'budget_card',
+                'amount': row.auto_allocate_amount,
+                'status': 'completed',
+                'description': f'Auto-allocated ${VirtualCard.to_decimal(row.auto_allocate_amount):.2f} to {row.card_name}',
+                'transaction_metadata': {
+                    'card_id': row.id, 'card_name': row.card_name,
+                    'auto_allocate': True, 'period': period
+                },
+                'card_id': row.id,
+                'created_at': now,
+                'completed_at': now
+            } for row in funded]
+        )
+        allocated_total = sum(debits.values(), Decimal('0.00'))
+
+    db.session.commit()
+    return {'cards_reset': reset_result.rowcount, 'cards_funded': len(funded), 'amount_allocated': allocated_total}
+
+
+def run_budget_resets(now: datetime = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+    """Reset and auto-fund every due budget card; returns run totals."""
+    now = now or datetime.utcnow()
+    start = period_start(now)
+    summary = {'chunks': 0, 'users': 0, 'cards_reset': 0, 'cards_funded': 0, 'amount_allocated': Decimal('0.00')}
+
+    last_user_id = 0
+    while True:
+        user_ids = _due_user_ids(start, last_user_id, chunk_size)
+        if not user_ids:
+            break
+        try:
+            result = _process_chunk(start, now, user_ids)
+        except Exception:
+            db.session.rollback()
+            raise
+        summary['chunks'] += 1
+        summary['users'] += len(user_ids)
+        for key in ('cards_reset', 'cards_funded', 'amount_allocated'):
+            summary[key] += result[key]
+        last_user_id = user_ids[-1]
+
+    return summary
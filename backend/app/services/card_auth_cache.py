@@ -0,0 +1,69 @@
+"""
+In-process cache of card authorisation state for the payment path.
+
+POST /api/cards/<id>/pay uses it to turn away payments on frozen, inactive,
+wrong-purpose or foreign cards without touching the database, so only
+payments that can be approved go on to take row locks. The cached state is
+only ever used to decline: approvals are re-checked against the locked card
+row, so a stale entry can never let a frozen card pay.
+
+Entries are dropped whenever a VirtualCard is updated or deleted through the
+ORM (freeze, unfreeze, card edits - see the listeners in
+app/models/virtual_card.py) and again once that change commits. Other worker
+processes see the change when their entry expires (CARD_AUTH_CACHE_TTL).
+"""
+from collections import namedtuple
+from typing import Optional
+
+from app.services.ttl_cache import TTLCache
+
+CardAuthState = namedtuple('CardAuthState', ['user_id', 'card_purpose', 'is_active', 'is_frozen'])
+
+
+class CardAuthCache(TTLCache):
+    """
+    TTL + LRU map of card id -> CardAuthState.
+
+    Usage:
+        card_auth_cache.init_app(app)
+        state = card_auth_cache.get(card_id, load_card_auth_state)
+        card_auth_cache.invalidate(card_id)
+
+    Unknown card ids aren't cached, so a card created right after a probe isn't hidden.
+    """
+
+    config_prefix = 'CARD_AUTH_CACHE'
+    extension_name = 'card_auth_cache'
+    default_ttl = 10
+    default_size = 10000
+
+
+def auth_state(card) -> Optional[CardAuthState]:
+    """CardAuthState of a VirtualCard (or a row with the same columns)."""
+    if card is None:
+        return None
+    return CardAuthState(card.user_id, card.card_purpose, card.is_active is not False, bool(card.is_frozen))
+
+
+def load_card_auth_state(card_id: int) -> Optional[CardAuthState]:
+    """Read the authorisation columns of one card (no row lock)."""
+    from app.extensions import db
+    from app.models import VirtualCard
+
+    row = db.session.query(
+        VirtualCard.user_id, VirtualCard.card_purpose, VirtualCard.is_active, VirtualCard.is_frozen
+    ).filter(VirtualCard.id == card_id).first()
+    return auth_state(row)
+
+
+def decline_reason(state: Optional[CardAuthState], user_id: int):
+    """(error, status) when the payment can be declined from state alone, else None."""
+    if state is None or state.user_id != user_id:
+        return 'Card not found', 404
+    if state.card_purpose != 'payment':
+        return 'This endpoint is only for payment cards', 400
+    if not state.is_active:
+        return 'Card is inactive', 403
+    if state.is_frozen:
+        return 'Card is frozen. Unfreeze it to make payments', 403
+    return None
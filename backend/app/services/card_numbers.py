@@ -0,0 +1,116 @@
+"""
+Card number allocation for virtual payment cards.
+
+Card numbers are built from serials handed out by the `card_number_sequences`
+table. An allocator reserves a whole block of serials with one UPDATE in its
+own transaction and serves numbers from memory until the block is used up, so
+creating a card needs no uniqueness probes against `virtual_cards`.
+
+Number layout (16 digits):
+    IIN (6) + account number (9) + Luhn check digit (1)
+
+The account number is a fixed permutation of the serial (multiplication by a
+constant coprime to 10**9), so consecutive cards don't get consecutive numbers
+while distinct serials still map to distinct numbers.
+"""
+import threading
+from collections import deque
+
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models.card_number_sequence import CardNumberSequence
+
+IIN = '451760'
+ACCOUNT_DIGITS = 9
+ACCOUNT_SPACE = 10 ** ACCOUNT_DIGITS
+# Odd and not divisible by 5, hence invertible modulo 10**9
+PERMUTATION_MULTIPLIER = 387420489
+PERMUTATION_OFFSET = 104729
+
+
+def luhn_check_digit(partial_number: str) -> str:
+    """Return the digit that makes partial_number + digit pass the Luhn check."""
+    total = 0
+    # Walking right-to-left over the partial number, the first digit is doubled
+    for index, char in enumerate(reversed(partial_number)):
+        digit = int(char)
+        if index % 2 == 0:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        total += digit
+    return str((10 - total % 10) % 10)
+
+
+def is_luhn_valid(number: str) -> bool:
+    """Check a full card number (including check digit) against the Luhn algorithm."""
+    if not number or not number.isdigit():
+        return False
+    return luhn_check_digit(number[:-1]) == number[-1]
+
+
+def card_number_for_serial(serial: int, iin: str = IIN) -> str:
+    """Map a serial to a 16-digit, Luhn-valid card number."""
+    if not 0 <= serial < ACCOUNT_SPACE:
+        raise ValueError('Card number space exhausted for this IIN')
+    account = (serial * PERMUTATION_MULTIPLIER + PERMUTATION_OFFSET) % ACCOUNT_SPACE
+    partial = f'{iin}{account:0{ACCOUNT_DIGITS}d}'
+    return partial + luhn_check_digit(partial)
+
+
+class CardNumberAllocator:
+    """
+    Thread-safe, per-process pool of card numbers backed by a sequence row.
+    
+    Usage:
+        card_number_allocator.allocate()  # -> '4517601234567897'
+    """
+    
+    def __init__(self, sequence_name='virtual_card_number', block_size=100, iin=IIN):
+        self.sequence_name = sequence_name
+        self.block_size = block_size
+        self.iin = iin
+        self._lock = threading.Lock()
+        self._pool = deque()
+    
+    def allocate(self) -> str:
+        with self._lock:
+            if not self._pool:
+                self._pool.extend(self._reserve_block())
+            serial = self._pool.popleft()
+        return card_number_for_serial(serial, self.iin)
+    
+    def reset(self) -> None:
+        """Drop numbers held in memory (they are simply never issued)."""
+        with self._lock:
+            self._pool.clear()
+    
+    def _reserve_block(self) -> range:
+        """
+        Advance the sequence by block_size in a separate, immediately committed
+        transaction so the reservation survives a rollback of the caller's session.
+        """
+        table = CardNumberSequence.__table__
+        for _ in range(2):
+            with db.engine.begin() as conn:
+                end = conn.execute(
+                    update(table)
+                    .where(table.c.name == self.sequence_name)
+                    .values(next_value=table.c.next_value + self.block_size)
+                    .returning(table.c.next_value)
+                ).scalar()
+                if end is not None:
+                    return range(end - self.block_size, end)
+            
+            try:
+                with db.engine.begin() as conn:
+                    conn.execute(insert(table).values(name=self.sequence_name, next_value=0))
+            except IntegrityError:
+                pass  # Another worker created the row first
+        
+        raise RuntimeError(f'Could not reserve card numbers from sequence {self.sequence_name}')
+
+
+card_number_allocator = CardNumberAllocator()
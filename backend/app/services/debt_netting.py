@@ -0,0 +1,247 @@
+"""
+Debt netting of a user's peer loans.
+
+Settlement only covers active loans the user is lender or borrower on, and
+only ever moves the user's own money. Loans between the user and each
+counterparty are reduced to one net balance per counterparty, interest
+included:
+    - if the user owes that counterparty (or they are even), every loan
+      between the two is closed with one transfer of the net amount from
+      the user
+    - if the counterparty owes the user on balance, their loans are left
+      open: only the counterparty can agree to pay, by settling themselves
+No other user's wallet is debited and no loan between two other people is
+touched. Each party ends up exactly where repaying each loan separately
+would leave them.
+
+Executing a settlement is one transaction:
+    - lock the user's loans and then the wallets involved (ordered by user_id)
+    - recompute the plan from the locked rows
+    - executemany UPDATEs for wallets and loans
+    - bulk INSERTs for LoanRepayment rows and two ledger rows per transfer
+
+Usage:
+    plan = plan_settlement(user_id)
+    result = settle_group(user_id)
+"""
+import heapq
+import uuid
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, List, Tuple
+
+from sqlalchemy import bindparam, func, insert, or_, select, update
+
+from app.extensions import db
+from app.models import Loan, LoanRepayment, Transaction, User, Wallet
+from app.services.loan_instalments import cancel_open_instalments
+from app.services.wallet_locks import lock_wallets
+
+CENT = Decimal('0.01')
+ZERO = Decimal('0.00')
+
+
+class SettlementError(ValueError):
+    """Raised when a group can't be settled."""
+
+
+def min_cash_flow(balances: Dict[int, Decimal]) -> List[Tuple[int, int, Decimal]]:
+    """(debtor, creditor, amount) transfers that clear the net balances (which sum to 0)."""
+    debtors = [(balance, user_id) for user_id, balance in balances.items() if balance < 0]
+    creditors = [(-balance, user_id) for user_id, balance in balances.items() if balance > 0]
+    heapq.heapify(debtors)
+    heapq.heapify(creditors)
+
+    transfers = []
+    while debtors and creditors:
+        debt, debtor = heapq.heappop(debtors)
+        credit, creditor = heapq.heappop(creditors)
+        amount = min(-debt, -credit)
+        transfers.append((debtor, creditor, amount))
+        if -debt > amount:
+            heapq.heappush(debtors, (debt + amount, debtor))
+        if -credit > amount:
+            heapq.heappush(creditors, (credit + amount, creditor))
+    return transfers
+
+
+def _loan_due(row) -> Tuple[Decimal, Decimal]:
+    """(balance due, interest part) of a loan row, in cents."""
+    owed = Decimal(row.amount) + Decimal(row.accrued_interest or 0) - Decimal(row.amount_repaid or 0)
+    due = max(owed, ZERO).quantize(CENT, rounding=ROUND_HALF_UP)
+    interest = Decimal(row.accrued_interest or 0) - Decimal(row.interest_repaid or 0)
+    interest = max(interest, ZERO).quantize(CENT, rounding=ROUND_HALF_UP)
+    return due, min(due, interest)
+
+
+def _party_loans(user_id: int, lock: bool = False):
+    """Active loans the user is lender or borrower on."""
+    loans = Loan.__table__
+    query = select(
+        loans.c.id, loans.c.lender_id, loans.c.borrower_id, loans.c.amount, loans.c.amount_repaid,
+        loans.c.accrued_interest, loans.c.interest_repaid
+    ).where(
+        loans.c.status == 'active',
+        loans.c.is_fully_repaid == False,
+        or_(loans.c.lender_id == user_id, loans.c.borrower_id == user_id)
+    ).order_by(loans.c.id)
+    if lock:
+        query = query.with_for_update()
+    return db.session.execute(query).all()
+
+
+def _plan(user_id: int, loan_rows) -> dict:
+    """Net each counterparty's loans; keep only those the user pays (or nets to zero)."""
+    nets: Dict[int, Decimal] = {}
+    dues = {}
+    for row in loan_rows:
+        due, interest = _loan_due(row)
+        dues[row.id] = (due, interest)
+        if row.borrower_id == user_id:
+            nets[row.lender_id] = nets.get(row.lender_id, ZERO) + due
+        else:
+            nets[row.borrower_id] = nets.get(row.borrower_id, ZERO) - due
+
+    settled = {counterparty for counterparty, net in nets.items() if net >= 0}
+    settled_rows = [
+        row for row in loan_rows
+        if (row.lender_id if row.borrower_id == user_id else row.borrower_id) in settled
+    ]
+    balances = {counterparty: nets[counterparty] for counterparty in settled}
+    if settled:
+        balances[user_id] = -sum(balances.values(), ZERO)
+    return {
+        'loans': settled_rows,
+        'balances': balances,
+        'dues': {row.id: dues[row.id] for row in settled_rows},
+        'transfers': min_cash_flow(balances),
+        'total_owed': sum((dues[row.id][0] for row in settled_rows), ZERO),
+        'left_open': len(loan_rows) - len(settled_rows)
+    }
+
+
+def _usernames(user_ids) -> Dict[int, str]:
+    return dict(db.session.execute(select(User.id, User.username).where(User.id.in_(user_ids))).all())
+
+
+def plan_settlement(user_id: int) -> dict:
+    """Preview of the transfers that would settle the user's loans (read only)."""
+    plan = _plan(user_id, _party_loans(user_id))
+    names = _usernames(plan['balances'].keys())
+    return {
+        'participants': [
+            {'user_id': member, 'username': names.get(member), 'net_balance': float(balance)}
+            for member, balance in sorted(plan['balances'].items())
+        ],
+        'loan_count': len(plan['loans']),
+        'loans_left_open': plan['left_open'],
+        'total_owed': float(plan['total_owed']),
+        'transfers': [
+            {'from_user_id': debtor, 'from_username': names.get(debtor),
+             'to_user_id': creditor, 'to_username': names.get(creditor), 'amount': float(amount)}
+            for debtor, creditor, amount in plan['transfers']
+        ],
+        'total_transferred': float(sum((amount for _, _, amount in plan['transfers']), ZERO))
+    }
+
+
+def settle_group(user_id: int, now: datetime = None) -> dict:
+    """
+    Settle the user's loans with each counterparty they owe on balance.
+
+    Raises SettlementError if there is nothing the user can settle or their
+    wallet is frozen or can't cover the total (nothing is changed then).
+    The caller commits; call rollback on error.
+    """
+    now = now or datetime.utcnow()
+    loans = Loan.__table__
+    wallets = Wallet.__table__
+
+    plan = _plan(user_id, _party_loans(user_id, lock=True))
+    loan_rows = plan['loans']
+    if not loan_rows:
+        raise SettlementError('No active loans you can settle')
+    members = sorted(plan['balances'])
+
+    wallet_rows = lock_wallets(members)
+    if len(wallet_rows) != len(members):
+        raise SettlementError('Wallet not found for a counterparty')
+    names = _usernames(members)
+    # Only the user pays; every other balance is a credit
+    owed, wallet = -plan['balances'][user_id], wallet_rows[user_id]
+    if owed > 0 and (wallet.is_frozen or Decimal(wallet.balance) < owed):
+        raise SettlementError(f'Your wallet can\'t cover the net balance of ${owed:.2f}')
+
+    settlement_id = uuid.uuid4().hex
+    deltas = [{'wallet_user_id': member, 'delta': balance} for member, balance in plan['balances'].items() if balance]
+    if deltas:
+        db.session.connection().execute(
+            update(wallets)
+            .where(wallets.c.user_id == bindparam('wallet_user_id'))
+            .values(balance=wallets.c.balance + bindparam('delta'), updated_at=now),
+            deltas
+        )
+    db.session.connection().execute(
+        update(loans)
+        .where(loans.c.id == bindparam('loan_id'))
+        .values(
+            amount_repaid=func.coalesce(loans.c.amount_repaid, 0) + bindparam('due'),
+            interest_repaid=func.coalesce(loans.c.interest_repaid, 0) + bindparam('interest'),
+            is_fully_repaid=True,
+            status='repaid',
+            repaid_at=now
+        ),
+        [{'loan_id': loan_id, 'due': due, 'interest': interest} for loan_id, (due, interest) in plan['dues'].items()]
+    )
+    cancel_open_instalments([row.id for row in loan_rows])
+    repayments = [
+        {'loan_id': loan_id, 'amount': due, 'interest_amount': interest, 'created_at': now}
+        for loan_id, (due, interest) in plan['dues'].items() if due > 0
+    ]
+    if repayments:
+        db.session.execute(insert(LoanRepayment), repayments)
+
+    loan_ids = [row.id for row in loan_rows]
+    ledger = []
+    for debtor, creditor, amount in plan['transfers']:
+        metadata = {'settlement_id': settlement_id, 'loan_ids': loan_ids, 'netted': True}
+        ledger.append({
+            'user_id': debtor,
+            'transaction_type': 'loan_repayment',
+            'transaction_source': 'main_wallet',
+            'amount': amount,
+            'status': 'completed',
+            'sender_id': debtor,
+            'receiver_id': creditor,
+            'description': f'Loan settlement to {names.get(creditor)}',
+            'transaction_metadata': dict(metadata, counterparty_id=creditor),
+            'created_at': now,
+            'completed_at': now
+        })
+        ledger.append({
+            'user_id': creditor,
+            'transaction_type': 'loan_repayment_received',
+            'transaction_source': 'main_wallet',
+            'amount': amount,
+            'status': 'completed',
+            'sender_id': debtor,
+            'receiver_id': creditor,
+            'description': f'Loan settlement from {names.get(debtor)}',
+            'transaction_metadata': dict(metadata, counterparty_id=debtor),
+            'created_at': now,
+            'completed_at': now
+        })
+    if ledger:
+        db.session.execute(insert(Transaction), ledger)
+
+    return {
+        'settlement_id': settlement_id,
+        'loans_settled': len(loan_rows),
+        'participants': len(members),
+        'total_owed': float(plan['total_owed']),
+        'transfers': [
+            {'from_user_id': debtor, 'from_username': names.get(debtor),
+             'to_user_id': creditor, 'to_username': names.get(creditor), 'amount': float(amount)}
+            for debtor, creditor, amount in plan['transfers']
+        ]
+    }
@@ -0,0 +1,77 @@
+"""
+Deterministic IBANs for virtual cards.
+
+Each card's IBAN is derived from its id with a keyed permutation (a 4-round
+Feistel network whose round function is HMAC-SHA256), so:
+    - the same card always gets the same IBAN,
+    - two cards never share an IBAN (the permutation is a bijection),
+    - IBANs can't be guessed from card ids without the key,
+    - no global RNG state is touched.
+
+Format: GB + ISO 13616 check digits + 'UNIP' + 10-digit account number.
+The value is computed once, stored in virtual_cards.iban and looked up there.
+Cards that existed before IBANs were stored keep the value they were already
+shown (legacy_iban), so IBANs users have shared keep resolving.
+"""
+import hashlib
+import hmac
+import random
+
+COUNTRY_CODE = 'GB'
+BANK_CODE = 'UNIP'
+ACCOUNT_DIGITS = 10
+HALF_SPACE = 10 ** (ACCOUNT_DIGITS // 2)
+FEISTEL_ROUNDS = 4
+
+
+def _round(key: bytes, round_index: int, value: int) -> int:
+    digest = hmac.new(key, f'{round_index}:{value}'.encode(), hashlib.sha256).digest()
+    return int.from_bytes(digest[:8], 'big') % HALF_SPACE
+
+
+def permute_account_number(card_id: int, key: bytes) -> int:
+    """Keyed bijection on [0, 10**10) - balanced Feistel over two 5-digit halves."""
+    if not 0 <= card_id < HALF_SPACE * HALF_SPACE:
+        raise ValueError('Card id out of IBAN account range')
+    left, right = divmod(card_id, HALF_SPACE)
+    for round_index in range(FEISTEL_ROUNDS):
+        left, right = right, (left + _round(key, round_index, right)) % HALF_SPACE
+    return left * HALF_SPACE + right
+
+
+def iban_check_digits(country_code: str, bban: str) -> str:
+    """ISO 13616 mod-97 check digits."""
+    rearranged = bban + country_code + '00'
+    numeric = ''.join(str(int(char, 36)) for char in rearranged)
+    return f'{98 - int(numeric) % 97:02d}'
+
+
+def is_valid_iban(iban: str) -> bool:
+    if not iban or len(iban) < 5 or not iban.isalnum():
+        return False
+    rearranged = iban[4:] + iban[:4]
+    numeric = ''.join(str(int(char, 36)) for char in rearranged.upper())
+    return int(numeric) % 97 == 1
+
+
+def derive_iban(card_id: int, key) -> str:
+    """IBAN for a card id, e.g. 'GB29UNIP0123456789'."""
+    if isinstance(key, str):
+        key = key.encode('utf-8')
+    account = permute_account_number(card_id, key)
+    bban = f'{BANK_CODE}{account:0{ACCOUNT_DIGITS}d}'
+    return f'{COUNTRY_CODE}{iban_check_digits(COUNTRY_CODE, bban)}{bban}'
+
+
+def legacy_iban(card_id: int) -> str:
+    """IBAN the old seeded-RNG generator showed for a card (random check digits, not mod-97 valid)."""
+    rng = random.Random(card_id)
+    check_digits = ''.join(str(rng.randint(0, 9)) for _ in range(2))
+    account = ''.join(str(rng.randint(0, 9)) for _ in range(ACCOUNT_DIGITS))
+    return f'{COUNTRY_CODE}{check_digits}{BANK_CODE}{account}'
+
+
+def iban_for_card(card_id: int) -> str:
+    """IBAN for a card id using the app's IBAN_HASH_KEY."""
+    from flask import current_app
+    return derive_iban(card_id, current_app.config['IBAN_HASH_KEY'])
@@ -0,0 +1,173 @@
+"""
+Content-addressed on-disk store for marketplace images.
+
+Images are stored once per distinct content, under the SHA-256 of their
+bytes: <root>/<first two hex digits>/<sha256>.<ext>. Uploading the same
+picture twice (or to two listings) writes nothing the second time. Files
+never change once written, so they are served with an ETag of the digest
+and a year-long immutable Cache-Control, and send_file answers Range and
+conditional requests straight from disk.
+
+A JPEG thumbnail (THUMBNAIL_SIZE, aspect kept) is generated with Pillow next
+to each image under <root>/thumbs/. For images Pillow can't decode, the
+thumbnail URL serves the original instead.
+
+Listings keep only the file names (MarketplaceListing.images) and return
+URLs built by image_urls().
+
+Usage:
+    image_store.init_app(app)
+    name = image_store.put_data_uri('data:image/png;base64,...')
+    path, mimetype = image_store.resolve(name, thumbnail=True)
+"""
+import base64
+import hashlib
+import io
+import os
+import re
+import tempfile
+from typing import Optional, Tuple
+
+from PIL import Image, UnidentifiedImageError
+
+URL_PREFIX = '/api/images'
+THUMBNAIL_SIZE = (320, 320)
+
+EXTENSIONS = {'image/jpeg': 'jpg', 'image/png': 'png', 'image/gif': 'gif', 'image/webp': 'webp'}
+MIMETYPES = {ext: mimetype for mimetype, ext in EXTENSIONS.items()}
+NAME_PATTERN = re.compile(r'^[0-9a-f]{64}\.(jpg|png|gif|webp)$')
+
+
+def is_image_name(name) -> bool:
+    return isinstance(name, str) and bool(NAME_PATTERN.match(name))
+
+
+def image_urls(name: str) -> dict:
+    return {'url': f'{URL_PREFIX}/{name}', 'thumbnail_url': f'{URL_PREFIX}/{name}/thumbnail'}
+
+
+def sniff_mimetype(data: bytes) -> Optional[str]:
+    """Image type from the file's magic bytes."""
+    if data.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if data.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return 'image/gif'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    return None
+
+
+def decode_data_uri(data_uri: str) -> Tuple[bytes, str]:
+    """
+    (bytes, mimetype) of a data:image/...;base64 URI or bare base64 image.
+
+    The type comes from the content when it is recognisable, else from the
+    URI header. Raises ValueError for anything that isn't a stored type.
+    """
+    declared = None
+    if data_uri.startswith('data:'):
+        try:
+            header, data_uri = data_uri.split(',', 1)
+            declared = header.split(':', 1)[1].split(';', 1)[0]
+        except (IndexError, ValueError) as e:
+            raise ValueError('Invalid image data URI') from e
+    try:
+        data = base64.b64decode(data_uri)
+    except ValueError as e:
+        raise ValueError('Invalid base64 encoding') from e
+
+    mimetype = sniff_mimetype(data) or declared
+    if mimetype not in EXTENSIONS:
+        raise ValueError(f'Unsupported image type: {mimetype or "unknown"}')
+    return data, mimetype
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """Write via a temp file and rename, so readers never see a partial file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            tmp.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def make_thumbnail(data: bytes) -> Optional[bytes]:
+    """JPEG thumbnail of the image, or None for data Pillow can't decode."""
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.thumbnail(THUMBNAIL_SIZE)
+            if image.mode in ('RGBA', 'LA', 'P'):
+                image = image.convert('RGBA')
+                background = Image.new('RGB', image.size, (255, 255, 255))
+                background.paste(image, mask=image.getchannel('A'))
+                image = background
+            out = io.BytesIO()
+            image.convert('RGB').save(out, 'JPEG', quality=80, optimize=True)
+            return out.getvalue()
+    except (UnidentifiedImageError, OSError, ValueError, Image.DecompressionBombError):
+        return None
+
+
+class ImageStore:
+    """
+    Hash-named image files under IMAGE_STORE_PATH (default <instance>/images).
+
+    Usage:
+        image_store.init_app(app)
+        name = image_store.put(data, 'image/png')
+    """
+
+    def __init__(self, app=None):
+        self.root = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        self.root = app.config.get('IMAGE_STORE_PATH') or os.path.join(app.instance_path, 'images')
+        app.extensions['image_store'] = self
+
+    def _path(self, name: str, thumbnail: bool = False) -> str:
+        if thumbnail:
+            return os.path.join(self.root, 'thumbs', name[:2], f'{name[:64]}.jpg')
+        return os.path.join(self.root, name[:2], name)
+
+    def put(self, data: bytes, mimetype: str) -> str:
+        """Store the image (if it isn't stored already); returns its file name."""
+        name = f'{hashlib.sha256(data).hexdigest()}.{EXTENSIONS[mimetype]}'
+        path = self._path(name)
+        if not os.path.exists(path):
+            _write_atomic(path, data)
+        thumb_path = self._path(name, thumbnail=True)
+        if not os.path.exists(thumb_path):
+            thumbnail = make_thumbnail(data)
+            if thumbnail is not None:
+                _write_atomic(thumb_path, thumbnail)
+        return name
+
+    def put_data_uri(self, data_uri: str) -> str:
+        data, mimetype = decode_data_uri(data_uri)
+        return self.put(data, mimetype)
+
+    def read(self, name: str) -> bytes:
+        with open(self._path(name), 'rb') as f:
+            return f.read()
+
+    def resolve(self, name: str, thumbnail: bool = False) -> Optional[Tuple[str, str]]:
+        """(path, mimetype) to serve for a stored image, or None if there's no such image."""
+        if not is_image_name(name):
+            return None
+        if thumbnail:
+            thumb_path = self._path(name, thumbnail=True)
+            if os.path.exists(thumb_path):
+                return thumb_path, 'image/jpeg'
+        path = self._path(name)
+        if not os.path.exists(path):
+            return None
+        return path, MIMETYPES[name.rsplit('.', 1)[1]]
@@ -0,0 +1,287 @@
+"""
+Loan instalment plans and their auto-debit runner. The principal is split
+evenly (leftover cents on the last instalment, which also collects accrued
+interest); partly collected instalments stay scheduled and retry next day.
+"""
+from datetime import date, datetime, timedelta
+from decimal import ROUND_DOWN, ROUND_HALF_UP, Decimal
+from typing import List
+
+from sqlalchemy import Date, DateTime, and_, bindparam, func, insert, or_, select, tuple_, update
+
+from app.extensions import db
+from app.models import Loan, LoanInstalment, LoanRepayment, Notification, Transaction, User, Wallet
+from app.services.subscription_billing import add_months
+from app.services.wallet_locks import lock_wallets
+
+DEFAULT_CHUNK_SIZE = 500
+MAX_INSTALMENTS = 24
+FREQUENCIES = ('weekly', 'monthly')
+CENT = Decimal('0.01')
+ZERO = Decimal('0.00')
+
+
+def split_amount(amount: Decimal, count: int) -> List[Decimal]:
+    """amount split into count equal payments in cents; the remainder goes on the last one."""
+    amount = Decimal(amount)
+    share = (amount / count).quantize(CENT, rounding=ROUND_DOWN)
+    return [share] * (count - 1) + [amount - share * (count - 1)]
+
+
+def instalment_dates(start: date, frequency: str, count: int) -> List[date]:
+    """Due dates one period apart, the first one period after start."""
+    if frequency == 'weekly':
+        return [start + timedelta(weeks=n) for n in range(1, count + 1)]
+    return [add_months(start, n, start.day) for n in range(1, count + 1)]
+
+
+def schedule_instalments(loan: Loan, start: date) -> date:
+    """Insert the loan's instalment rows from its plan; returns the last due date."""
+    dates = instalment_dates(start, loan.instalment_frequency, loan.instalment_count)
+    db.session.execute(insert(LoanInstalment), [
+        {'loan_id': loan.id, 'sequence': n, 'due_date': due_date, 'amount': amount,
+         'amount_paid': ZERO, 'status': 'scheduled', 'attempts': 0}
+        for n, (due_date, amount) in enumerate(
+            zip(dates, split_amount(loan.amount, loan.instalment_count)), start=1
+        )
+    ])
+    return dates[-1]
+
+
+def cancel_open_instalments(loan_ids) -> None:
+    """Cancel what's left of the schedules of loans that have been repaid."""
+    if not loan_ids:
+        return
+    instalments = LoanInstalment.__table__
+    db.session.execute(
+        update(instalments)
+        .where(instalments.c.loan_id.in_(loan_ids), instalments.c.status == 'scheduled')
+        .values(status='cancelled')
+    )
+
+
+def _due_filter(today: date):
+    """Scheduled instalments that are due and haven't been tried today."""
+    instalments = LoanInstalment.__table__
+    return and_(
+        instalments.c.status == 'scheduled',  # same predicate as the partial index
+        instalments.c.due_date <= today,
+        or_(instalments.c.last_attempt_on.is_(None), instalments.c.last_attempt_on < today)
+    )
+
+
+def _due_instalments(today: date, after, limit: int):
+    """Next chunk of (due_date, id) keys after the `after` key."""
+    instalments = LoanInstalment.__table__
+    query = select(instalments.c.due_date, instalments.c.id).where(_due_filter(today))
+    if after is not None:
+        query = query.where(tuple_(instalments.c.due_date, instalments.c.id) > tuple_(*after))
+    return db.session.execute(
+        query.order_by(instalments.c.due_date, instalments.c.id).limit(limit)
+    ).all()
+
+
+def _process_chunk(ids, today: date, now: datetime) -> dict:
+    instalments = LoanInstalment.__table__
+    loans = Loan.__table__
+    wallets = Wallet.__table__
+
+    rows = db.session.execute(
+        select(
+            instalments.c.id, instalments.c.loan_id, instalments.c.sequence, instalments.c.due_date,
+            instalments.c.amount, instalments.c.amount_paid, instalments.c.attempts,
+            loans.c.lender_id, loans.c.borrower_id, loans.c.status.label('loan_status'), loans.c.is_fully_repaid,
+            loans.c.amount.label('loan_amount'), loans.c.amount_repaid, loans.c.accrued_interest,
+            loans.c.interest_repaid, loans.c.instalment_count
+        )
+        .join(loans, loans.c.id == instalments.c.loan_id)
+        .where(instalments.c.id.in_(ids), _due_filter(today))
+        .order_by(instalments.c.loan_id, instalments.c.sequence)
+        .with_for_update()
+    ).all()
+    if not rows:
+        db.session.commit()
+        return {'instalments': 0, 'paid': 0, 'failed': 0, 'amount_collected': ZERO}
+
+    parties = {row.borrower_id for row in rows} | {row.lender_id for row in rows}
+    wallet_rows = lock_wallets(parties)
+    available = {
+        user_id: ZERO if row.is_frozen else Decimal(row.balance or 0)
+        for user_id, row in wallet_rows.items()
+    }
+    usernames = dict(db.session.execute(select(User.id, User.username).where(User.id.in_(parties))).all())
+
+    # Running balance of each loan, so several instalments of one loan in a
+    # chunk (a catch-up after failed days) see each other's payments
+    owing = {}
+    for row in rows:
+        if row.loan_id not in owing:
+            due = Decimal(row.loan_amount) + Decimal(row.accrued_interest or 0) - Decimal(row.amount_repaid or 0)
+            interest = Decimal(row.accrued_interest or 0) - Decimal(row.interest_repaid or 0)
+            owing[row.loan_id] = {
+                'due': max(due, ZERO).quantize(CENT, rounding=ROUND_HALF_UP),
+                'interest': max(interest, ZERO).quantize(CENT, rounding=ROUND_HALF_UP),
+                'paid': ZERO,
+                'interest_paid': ZERO
+            }
+
+    updates, deltas, repayments, ledger, notifications = [], {}, [], [], []
+    paid = failed = 0
+    for row in rows:
+        loan = owing[row.loan_id]
+        if row.loan_status != 'active' or row.is_fully_repaid or loan['due'] <= 0:
+            updates.append({'instalment_id': row.id, 'collected': ZERO, 'new_status': 'cancelled',
+                            'tried': row.attempts or 0, 'attempt_on': today, 'paid_on': None})
+            continue
+
+        if row.sequence >= (row.instalment_count or row.sequence):
+            owed = loan['due']
+        else:
+            owed = min(Decimal(row.amount) - Decimal(row.amount_paid or 0), loan['due'])
+        amount = min(owed, available.get(row.borrower_id, ZERO)) if row.lender_id in wallet_rows else ZERO
+        is_paid = amount >= owed
+        updates.append({
+            'instalment_id': row.id,
+            'collected': amount,
+            'new_status': 'paid' if is_paid else 'scheduled',
+            'tried': (row.attempts or 0) + 1,
+            'attempt_on': today,
+            'paid_on': now if is_paid else None
+        })
+
+        if not is_paid:
+            failed += 1
+            if not row.attempts:
+                notifications.append({
+                    'user_id': row.borrower_id,
+                    'notification_type': 'loan_instalment_failed',
+                    'title': 'Instalment payment failed',
+                    'message': f'We couldn\'t collect ${owed:.2f} for your loan from @{usernames.get(row.lender_id)}. '
+                               f'We\'ll try again tomorrow.',
+                    'notification_metadata': {'loan_id': row.loan_id, 'instalment_id': row.id,
+                                              'sequence': row.sequence, 'amount_due': float(owed)},
+                    'is_read': False,
+                    'created_at': now
+                })
+        else:
+            paid += 1
+        if not amount:
+            continue
+
+        interest_part = min(amount, loan['interest'])
+        loan['interest'] -= interest_part
+        loan['due'] -= amount
+        loan['paid'] += amount
+        loan['interest_paid'] += interest_part
+        available[row.borrower_id] -= amount
+        deltas[row.borrower_id] = deltas.get(row.borrower_id, ZERO) - amount
+        deltas[row.lender_id] = deltas.get(row.lender_id, ZERO) + amount
+
+        repayments.append({'loan_id': row.loan_id, 'amount': amount, 'interest_amount': interest_part, 'created_at': now})
+        metadata = {
+            'loan_id': row.loan_id,
+            'instalment_id': row.id,
+            'sequence': row.sequence,
+            'auto_debit': True,
+            'interest_paid': float(interest_part),
+            'principal_paid': float(amount - interest_part),
+            'remaining_balance': float(loan['due'])
+        }
+        ledger.append({
+            'user_id': row.borrower_id,
+            'transaction_type': 'loan_repayment',
+            'transaction_source': 'main_wallet',
+            'amount': amount,
+            'status': 'completed',
+            'description': f'Loan instalment {row.sequence} to {usernames.get(row.lender_id)}',
+            'transaction_metadata': dict(metadata, lender_id=row.lender_id),
+            'created_at': now,
+            'completed_at': now
+        })
+        ledger.append({
+            'user_id': row.lender_id,
+            'transaction_type': 'loan_repayment_received',
+            'transaction_source': 'main_wallet',
+            'amount': amount,
+            'status': 'completed',
+            'description': f'Loan instalment {row.sequence} from {usernames.get(row.borrower_id)}',
+            'transaction_metadata': dict(metadata, borrower_id=row.borrower_id),
+            'created_at': now,
+            'completed_at': now
+        })
+
+    db.session.connection().execute(
+        update(instalments)
+        .where(instalments.c.id == bindparam('instalment_id'))
+        .values(
+            amount_paid=func.coalesce(instalments.c.amount_paid, 0) + bindparam('collected'),
+            status=bindparam('new_status'),
+            attempts=bindparam('tried'),
+            last_attempt_on=bindparam('attempt_on', type_=Date),
+            paid_at=func.coalesce(instalments.c.paid_at, bindparam('paid_on', type_=DateTime))
+        ),
+        updates
+    )
+    collected = {loan_id: loan for loan_id, loan in owing.items() if loan['paid']}
+    if collected:
+        db.session.connection().execute(
+            update(wallets)
+            .where(wallets.c.user_id == bindparam('wallet_user_id'))
+            .values(balance=wallets.c.balance + bindparam('delta'), updated_at=now),
+            [{'wallet_user_id': user_id, 'delta': delta} for user_id, delta in sorted(deltas.items())]
+        )
+        db.session.connection().execute(
+            update(loans)
+            .where(loans.c.id == bindparam('loan_id'))
+            .values(
+                amount_repaid=func.coalesce(loans.c.amount_repaid, 0) + bindparam('paid'),
+                interest_repaid=func.coalesce(loans.c.interest_repaid, 0) + bindparam('interest_paid')
+            ),
+            [{'loan_id': loan_id, 'paid': loan['paid'], 'interest_paid': loan['interest_paid']}
+             for loan_id, loan in collected.items()]
+        )
+        db.session.execute(insert(LoanRepayment), repayments)
+        db.session.execute(insert(Transaction), ledger)
+
+    repaid_ids = [loan_id for loan_id, loan in collected.items() if loan['due'] <= 0]
+    if repaid_ids:
+        db.session.execute(
+            update(loans)
+            .where(loans.c.id.in_(repaid_ids))
+            .values(is_fully_repaid=True, status='repaid', repaid_at=now)
+        )
+        cancel_open_instalments(repaid_ids)
+    if notifications:
+        db.session.execute(insert(Notification), notifications)
+
+    db.session.commit()
+    return {
+        'instalments': len(rows),
+        'paid': paid,
+        'failed': failed,
+        'amount_collected': sum((loan['paid'] for loan in collected.values()), ZERO)
+    }
+
+
+def run_auto_debits(now: datetime = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+    """Collect every due loan instalment; returns run totals."""
+    now = now or datetime.utcnow()
+    today = now.date()
+    summary = {'chunks': 0, 'instalments': 0, 'paid': 0, 'failed': 0, 'amount_collected': ZERO}
+
+    after = None
+    while True:
+        keys = _due_instalments(today, after, chunk_size)
+        if not keys:
+            break
+        try:
+            result = _process_chunk([key.id for key in keys], today, now)
+        except Exception:
+            db.session.rollback()
+            raise
+        summary['chunks'] += 1
+        for key in ('instalments', 'paid', 'failed', 'amount_collected'):
+            summary[key] += result[key]
+        after = tuple(keys[-1])
+
+    return summary
@@ -0,0 +1,182 @@
+"""
+Faceted marketplace search.
+
+Open listings (is_available and not is_sold) are filtered by:
+    - text: every word of the query must prefix-match a word of the title,
+      description or course. PostgreSQL uses a GIN index on
+      to_tsvector('simple', ...); SQLite uses the marketplace_listings_fts
+      FTS5 table (see app/models/marketplace.py)
+    - exact category / university, any of several conditions
+    - a price range
+and returned newest first, a page at a time, with an opaque keyset cursor on
+(created_at, id). The partial indexes on open listings serve the unfiltered
+and category / university pages without sorting.
+
+Facet counts (open listings per category, university and condition) are read
+from marketplace_facet_counts, which the MarketplaceListing listeners keep up
+to date. They describe the whole open marketplace, not the current filters.
+
+Usage:
+    listings, next_cursor = search_listings('calculus', category='textbooks')
+    facets = facet_counts()
+"""
+import re
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import column, delete, func, insert, literal, literal_column, select, table, text, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.extensions import db
+from app.utils import cursors
+
+FACETS = ('category', 'university', 'condition')
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+MAX_TERMS = 8
+
+
+def facet_keys(values: dict) -> frozenset:
+    """(facet, value) pairs a listing counts towards; none unless it is open."""
+    if values.get('is_available') is False or values.get('is_sold'):
+        return frozenset()
+    return frozenset((facet, str(values[facet])) for facet in FACETS if values.get(facet))
+
+
+def apply_facet_deltas(connection, keys: Iterable[Tuple[str, str]], delta: int) -> None:
+    """Add delta to each (facet, value) counter, creating missing rows (upsert)."""
+    if not keys:
+        return
+    from app.models import MarketplaceFacetCount
+
+    upsert = postgresql.insert if connection.dialect.name == 'postgresql' else sqlite.insert
+    counts = MarketplaceFacetCount.__table__
+    statement = upsert(counts)
+    statement = statement.on_conflict_do_update(
+        index_elements=[counts.c.facet, counts.c.value],
+        set_={'listing_count': counts.c.listing_count + statement.excluded.listing_count}
+    )
+    # Sorted so concurrent flushes take the counter rows in the same order
+    connection.execute(statement, [
+        {'facet': facet, 'value': value, 'listing_count': delta} for facet, value in sorted(keys)
+    ])
+
+
+def facet_counts() -> Dict[str, Dict[str, int]]:
+    """{facet: {value: open listings}}, most common values first."""
+    from app.models import MarketplaceFacetCount
+
+    facets = {facet: {} for facet in FACETS}
+    rows = db.session.execute(
+        select(MarketplaceFacetCount.facet, MarketplaceFacetCount.value, MarketplaceFacetCount.listing_count)
+        .where(MarketplaceFacetCount.listing_count > 0)
+        .order_by(MarketplaceFacetCount.facet, MarketplaceFacetCount.listing_count.desc(), MarketplaceFacetCount.value)
+    )
+    for facet, value, count in rows:
+        facets.setdefault(facet, {})[value] = count
+    return facets
+
+
+def rebuild_facet_counts() -> int:
+    """Recount every facet from the listings (after bulk edits or a restore); returns the number of rows."""
+    from app.models import MarketplaceFacetCount, MarketplaceListing
+
+    db.session.execute(delete(MarketplaceFacetCount))
+    total = 0
+    for facet in FACETS:
+        facet_column = getattr(MarketplaceListing, facet)
+        rows = db.session.execute(
+            select(literal(facet), facet_column, func.count())
+            .where(MarketplaceListing.is_available.isnot(False), MarketplaceListing.is_sold.isnot(True),
+                   facet_column.isnot(None), facet_column != '')
+            .group_by(facet_column)
+        ).all()
+        if rows:
+            db.session.execute(insert(MarketplaceFacetCount), [
+                {'facet': name, 'value': str(value), 'listing_count': count} for name, value, count in rows
+            ])
+        total += len(rows)
+    return total
+
+
+def search_terms(query: Optional[str]) -> List[str]:
+    """Words of the query, case-folded; punctuation and FTS operators are dropped."""
+    return re.findall(r'\w+', (query or '').casefold())[:MAX_TERMS]
+
+
+def encode_cursor(created_at: datetime, listing_id: int) -> str:
+    return cursors.encode_cursor([created_at.isoformat(), listing_id])
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """(created_at, id) of the last listing on the previous page; ValueError if malformed."""
+    created_at, listing_id = cursors.decode_cursor(cursor, 2)
+    try:
+        return datetime.fromisoformat(created_at), int(listing_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def _text_filter(terms: List[str], dialect: str):
+    from app.models import MarketplaceListing
+    from app.models.marketplace import search_document
+
+    if dialect == 'postgresql':
+        document = search_document(MarketplaceListing.title, MarketplaceListing.description, MarketplaceListing.course)
+        return document.op('@@')(func.to_tsquery(literal_column("'simple'"), ' & '.join(f'{term}:*' for term in terms)))
+
+    fts = table('marketplace_listings_fts', column('rowid'))
+    match = ' '.join(f'"{term}"*' for term in terms)
+    return MarketplaceListing.id.in_(
+        select(fts.c.rowid).where(text('marketplace_listings_fts MATCH :match').bindparams(match=match))
+    )
+
+
+def search_listings(query: Optional[str] = None, category: Optional[str] = None, university: Optional[str] = None,
+                    conditions: Optional[List[str]] = None, min_price: Optional[Decimal] = None,
+                    max_price: Optional[Decimal] = None, cursor: Optional[str] = None,
+                    limit: int = DEFAULT_LIMIT):
+    """
+    One page of open listings matching every given filter, newest first.
+
+    Returns (listings, next_cursor); next_cursor is None on the last page.
+    Raises ValueError for a malformed cursor or an inverted price range.
+    """
+    from app.models import MarketplaceListing
+
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise ValueError('min_price is greater than max_price')
+    limit = min(max(int(limit or DEFAULT_LIMIT), 1), MAX_LIMIT)
+
+    # Same predicate as the partial indexes
+    listings = MarketplaceListing.query.filter(
+        MarketplaceListing.is_available == True,
+        MarketplaceListing.is_sold == False
+    )
+    if category:
+        listings = listings.filter(MarketplaceListing.category == category)
+    if university:
+        listings = listings.filter(MarketplaceListing.university == university)
+    if conditions:
+        listings = listings.filter(MarketplaceListing.condition.in_(conditions))
+    if min_price is not None:
+        listings = listings.filter(MarketplaceListing.price >= min_price)
+    if max_price is not None:
+        listings = listings.filter(MarketplaceListing.price <= max_price)
+
+    terms = search_terms(query)
+    if terms:
+        listings = listings.filter(_text_filter(terms, db.session.get_bind().dialect.name))
+
+    if cursor:
+        listings = listings.filter(
+            tuple_(MarketplaceListing.created_at, MarketplaceListing.id) < tuple_(*decode_cursor(cursor))
+        )
+
+    rows = listings.order_by(
+        MarketplaceListing.created_at.desc(), MarketplaceListing.id.desc()
+    ).limit(limit + 1).all()
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].created_at, page[-1].id) if len(rows) > limit else None
+    return page, next_cursor
@@ -0,0 +1,91 @@
+"""
+Marketplace order history for buyers and sellers.
+
+A page of orders is one query: the orders joined to their listing (title and
+price only - never the images) and to the other party's username. Orders come
+newest first by id, a page at a time, with an opaque keyset cursor:
+    - buyers:  ix_marketplace_orders_buyer_id
+    - sellers: ix_marketplace_orders_seller_id (seller_id, id), on the
+      seller_id copied onto each order when it is placed
+
+Usage:
+    orders, next_cursor = order_history(user_id, role='seller')
+"""
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select
+
+from app.utils import cursors
+
+ROLES = ('buyer', 'seller')
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+
+
+def encode_cursor(order_id: int) -> str:
+    return cursors.encode_cursor([order_id])
+
+
+def decode_cursor(cursor: str) -> int:
+    """Id of the last order on the previous page; ValueError if malformed."""
+    (order_id,) = cursors.decode_cursor(cursor, 1)
+    try:
+        return int(order_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def _order_dict(row) -> dict:
+    return {
+        'id': row.id,
+        'listing_id': row.listing_id,
+        'listing_title': row.listing_title,
+        'listing_price': float(row.listing_price),
+        'buyer_id': row.buyer_id,
+        'seller_id': row.seller_id,
+        'counterparty_username': row.counterparty_username,
+        'amount': float(row.amount),
+        'status': row.status,
+        'escrow_released': row.escrow_released,
+        'created_at': row.created_at.isoformat() if row.created_at else None,
+        'completed_at': row.completed_at.isoformat() if row.completed_at else None
+    }
+
+
+def order_history(user_id: int, role: str = 'buyer', cursor: Optional[str] = None,
+                  limit: int = DEFAULT_LIMIT) -> Tuple[List[dict], Optional[str]]:
+    """
+    One page of the user's purchases (role='buyer') or sales (role='seller').
+
+    Returns (orders, next_cursor); next_cursor is None on the last page.
+    Raises ValueError for an unknown role or a malformed cursor.
+    """
+    from app.extensions import db
+    from app.models import MarketplaceListing, MarketplaceOrder, User
+
+    if role not in ROLES:
+        raise ValueError(f'role must be one of: {", ".join(ROLES)}')
+    limit = min(max(int(limit or DEFAULT_LIMIT), 1), MAX_LIMIT)
+    orders = MarketplaceOrder.__table__
+    listings = MarketplaceListing.__table__
+    users = User.__table__
+    owner, counterparty = (
+        (orders.c.buyer_id, orders.c.seller_id) if role == 'buyer' else (orders.c.seller_id, orders.c.buyer_id)
+    )
+
+    query = select(
+        orders.c.id, orders.c.listing_id, orders.c.buyer_id, orders.c.seller_id, orders.c.amount,
+        orders.c.status, orders.c.escrow_released, orders.c.created_at, orders.c.completed_at,
+        listings.c.title.label('listing_title'), listings.c.price.label('listing_price'),
+        users.c.username.label('counterparty_username')
+    ).select_from(
+        orders.join(listings, listings.c.id == orders.c.listing_id)
+        .outerjoin(users, users.c.id == counterparty)
+    ).where(owner == user_id)
+    if cursor:
+        query = query.where(orders.c.id < decode_cursor(cursor))
+
+    rows = db.session.execute(query.order_by(orders.c.id.desc()).limit(limit + 1)).all()
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].id) if len(rows) > limit else None
+    return [_order_dict(row) for row in page], next_cursor
@@ -0,0 +1,125 @@
+"""
+Overdue-loan scanner: stamps loans.overdue_at on open loans past due_date and
+queues reminders - the borrower every REMINDER_INTERVAL, the lender once.
+Candidates come from the partial index ix_loans_open_due_date.
+"""
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import and_, func, insert, or_, select, tuple_, update
+
+from app.extensions import db
+from app.models import Loan, Notification, User
+
+DEFAULT_CHUNK_SIZE = 500
+REMINDER_INTERVAL = timedelta(days=3)
+
+
+def _due_filter(today: date, now: datetime):
+    """Open loans past their due date that are new or due another reminder."""
+    loans = Loan.__table__
+    return and_(
+        loans.c.status == 'active',
+        loans.c.is_fully_repaid == False,  # same predicate as the partial index
+        loans.c.due_date < today,
+        or_(loans.c.last_reminder_at.is_(None), loans.c.last_reminder_at <= now - REMINDER_INTERVAL)
+    )
+
+
+def _due_loans(today: date, now: datetime, after, limit: int):
+    """Next chunk of (due_date, id) keys after the `after` key."""
+    loans = Loan.__table__
+    query = select(loans.c.due_date, loans.c.id).where(_due_filter(today, now))
+    if after is not None:
+        query = query.where(tuple_(loans.c.due_date, loans.c.id) > tuple_(*after))
+    return db.session.execute(
+        query.order_by(loans.c.due_date, loans.c.id).limit(limit)
+    ).all()
+
+
+def _process_chunk(ids, today: date, now: datetime) -> dict:
+    loans = Loan.__table__
+
+    rows = db.session.execute(
+        select(
+            loans.c.id, loans.c.lender_id, loans.c.borrower_id, loans.c.amount,
+            loans.c.amount_repaid, loans.c.accrued_interest, loans.c.due_date, loans.c.overdue_at
+        )
+        .where(loans.c.id.in_(ids), _due_filter(today, now))
+        .order_by(loans.c.id)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not rows:
+        db.session.commit()
+        return {'loans': 0, 'newly_overdue': 0, 'notifications': 0}
+
+    usernames = dict(db.session.execute(
+        select(User.id, User.username)
+        .where(User.id.in_({row.lender_id for row in rows} | {row.borrower_id for row in rows}))
+    ).all())
+
+    notifications, newly_overdue = [], 0
+    for row in rows:
+        outstanding = round(float(row.amount) + float(row.accrued_interest or 0) - float(row.amount_repaid or 0), 2)
+        days = (today - row.due_date).days
+        metadata = {
+            'loan_id': row.id,
+            'due_date': row.due_date.isoformat(),
+            'days_overdue': days,
+            'amount_remaining': outstanding
+        }
+        lender = usernames.get(row.lender_id, 'the lender')
+        borrower = usernames.get(row.borrower_id, 'the borrower')
+        notifications.append({
+            'user_id': row.borrower_id,
+            'notification_type': 'loan_overdue',
+            'title': 'Loan overdue',
+            'message': f'Your loan from @{lender} is {days} days overdue. ${outstanding:.2f} left to repay.',
+            'notification_metadata': metadata,
+            'is_read': False,
+            'created_at': now
+        })
+        if row.overdue_at is None:
+            newly_overdue += 1
+            notifications.append({
+                'user_id': row.lender_id,
+                'notification_type': 'loan_overdue_lender',
+                'title': 'Loan overdue',
+                'message': f'@{borrower} missed the due date for ${outstanding:.2f} of your loan.',
+                'notification_metadata': metadata,
+                'is_read': False,
+                'created_at': now
+            })
+
+    db.session.execute(
+        update(loans)
+        .where(loans.c.id.in_([row.id for row in rows]))
+        .values(overdue_at=func.coalesce(loans.c.overdue_at, now), last_reminder_at=now)
+    )
+    db.session.execute(insert(Notification), notifications)
+
+    db.session.commit()
+    return {'loans': len(rows), 'newly_overdue': newly_overdue, 'notifications': len(notifications)}
+
+
+def scan_overdue_loans(now: datetime = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+    """Flag overdue loans and queue their reminders; returns run totals."""
+    now = now or datetime.utcnow()
+    today = now.date()
+    summary = {'chunks': 0, 'loans': 0, 'newly_overdue': 0, 'notifications': 0}
+
+    after = None
+    while True:
+        keys = _due_loans(today, now, after, chunk_size)
+        if not keys:
+            break
+        try:
+            result = _process_chunk([key.id for key in keys], today, now)
+        except Exception:
+            db.session.rollback()
+            raise
+        summary['chunks'] += 1
+        for key in ('loans', 'newly_overdue', 'notifications'):
+            summary[key] += result[key]
+        after = tuple(keys[-1])
+
+    return summary
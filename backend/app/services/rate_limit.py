@@ -0,0 +1,174 @@
+"""
+Rate limiting helpers for UniPay.
+
+- user_or_remote_address: Flask-Limiter key function that limits authenticated
+  requests per user (JWT identity) and anonymous requests per client IP, so a
+  whole campus behind one NAT address no longer shares a single budget.
+- SQLiteStorage: a `limits` storage backend registered for ``sqlite://`` URIs.
+  Counters live in a WAL-mode SQLite file, so every worker process on the host
+  sees the same counts. It supports the sliding-window-counter strategy
+  (fixed windows with interpolation of the previous window), which needs just
+  two counters per key and a single short write transaction per hit.
+
+Usage:
+    RATELIMIT_STORAGE_URI = 'sqlite:///instance/ratelimit.db'   # relative path
+    RATELIMIT_STORAGE_URI = 'sqlite:////var/lib/unipay/rl.db'   # absolute path
+    RATELIMIT_STRATEGY = 'sliding-window-counter'
+"""
+import os
+import sqlite3
+import threading
+import time
+from math import floor
+from typing import Tuple
+
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_limiter.util import get_remote_address
+from limits.storage.base import SlidingWindowCounterSupport, Storage, TimestampedSlidingWindow
+
+
+def user_or_remote_address() -> str:
+    """Rate limit key: JWT identity when a valid token is present, else client IP."""
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+    except Exception:
+        identity = None
+
+    if identity:
+        return f'user:{identity}'
+    return f'ip:{get_remote_address()}'
+
+
+class SQLiteStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """Shared rate limit counters in a single-host SQLite file (WAL mode)."""
+
+    STORAGE_SCHEME = ['sqlite']
+
+    # Expired rows are purged every CLEANUP_EVERY increments
+    CLEANUP_EVERY = 1000
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, **options):
+        path = uri.split('://', 1)[1]
+        if path.startswith('/'):
+            path = path[1:]
+        self.path = path or 'ratelimit.db'
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._local = threading.local()
+        self._hits = 0
+        conn = self._conn()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS rate_limits ('
+            ' key TEXT PRIMARY KEY,'
+            ' count INTEGER NOT NULL,'
+            ' expires_at REAL NOT NULL'
+            ') WITHOUT ROWID'
+        )
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _incr(self, conn: sqlite3.Connection, key: str, expiry: float, amount: int, now: float) -> int:
+        row = conn.execute(
+            'INSERT INTO rate_limits (key, count, expires_at) VALUES (?, ?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET '
+            ' count = CASE WHEN expires_at <= ? THEN excluded.count ELSE count + excluded.count END,'
+            ' expires_at = CASE WHEN expires_at <= ? THEN excluded.expires_at ELSE expires_at END '
+            'RETURNING count',
+            (key, amount, now + expiry, now, now)
+        ).fetchone()
+        return row[0]
+
+    def _get(self, conn: sqlite3.Connection, key: str, now: float) -> Tuple[int, float]:
+        row = conn.execute(
+            'SELECT count, expires_at FROM rate_limits WHERE key = ? AND expires_at > ?',
+            (key, now)
+        ).fetchone()
+        return (row[0], row[1]) if row else (0, now)
+
+    def _maybe_cleanup(self, conn: sqlite3.Connection, now: float) -> None:
+        self._hits += 1
+        if self._hits % self.CLEANUP_EVERY == 0:
+            conn.execute('DELETE FROM rate_limits WHERE expires_at <= ?', (now,))
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        conn = self._conn()
+        now = time.time()
+        count = self._incr(conn, key, expiry, amount, now)
+        self._maybe_cleanup(conn, now)
+        return count
+
+    def get(self, key: str) -> int:
+        return self._get(self._conn(), key, time.time())[0]
+
+    def get_expiry(self, key: str) -> float:
+        return self._get(self._conn(), key, time.time())[1]
+
+    def check(self) -> bool:
+        try:
+            self._conn().execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> int:
+        cursor = self._conn().execute('DELETE FROM rate_limits')
+        return cursor.rowcount
+
+    def clear(self, key: str) -> None:
+        self._conn().execute('DELETE FROM rate_limits WHERE key = ?', (key,))
+
+    def _window_info(self, conn, key: str, expiry: int, now: float) -> Tuple[int, float, int, float]:
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        previous_count = self._get(conn, previous_key, now)[0]
+        current_count = self._get(conn, current_key, now)[0]
+        previous_ttl = 0.0 if previous_count == 0 else (1 - (((now - expiry) / expiry) % 1)) * expiry
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+
+        conn = self._conn()
+        now = time.time()
+        # BEGIN IMMEDIATE takes the write lock up front, so the read-check-increment
+        # below is atomic across worker processes and never needs to be reverted.
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            previous_count, previous_ttl, current_count, _ = self._window_info(conn, key, expiry, now)
+            weighted_count = previous_count * previous_ttl / expiry + current_count
+            if floor(weighted_count) + amount > limit:
+                conn.execute('COMMIT')
+                return False
+
+            _, current_key = self.sliding_window_keys(key, expiry, now)
+            self._incr(conn, current_key, 2 * expiry, amount, now)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        self._maybe_cleanup(conn, now)
+        return True
+
+    def get_sliding_window(self, key: str, expiry: int) -> Tuple[int, float, int, float]:
+        return self._window_info(self._conn(), key, expiry, time.time())
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        previous_key, current_key = self.sliding_window_keys(key, expiry, time.time())
+        self.clear(previous_key)
+        self.clear(current_key)
@@ -0,0 +1,304 @@
+"""
+Lazy expansion of recurring payments into occurrences.
+
+Recurring expected payments are stored once as RecurringSeries rules and
+card subscriptions already carry their own rule (next_billing_date +
+billing_cycle). Calendar and upcoming views ask for a date window and get
+the occurrences inside it computed on the fly; nothing is written for future
+dates. Occurrences that do exist as Transaction rows (series_id +
+occurrence_date, e.g. the first payment of a series) take precedence over the
+virtual ones.
+
+Occurrence n of a series is start + n * step, computed from the start date
+(or billing anchor day) rather than from the previous occurrence, so monthly
+series started on the 31st land on the last day of shorter months without
+drifting.
+
+Usage:
+    occurrences = upcoming_occurrences(user_id, date(2030, 1, 1), date(2030, 3, 31))
+"""
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.extensions import db
+from app.models import RecurringSeries, Subscription, Transaction, VirtualCard
+from app.services.subscription_billing import CYCLE_DAYS, CYCLE_MONTHS, add_months
+
+FREQUENCIES = ('weekly', 'monthly', 'yearly')
+
+# Upper bound on a window's length (keeps expansion cost bounded)
+MAX_WINDOW_DAYS = 732
+
+
+def nth_occurrence(start: date, frequency: str, n: int, anchor_day: int = None) -> date:
+    """Date of occurrence n (0 = start) of a weekly, monthly or yearly rule."""
+    if frequency == 'weekly':
+        return start + timedelta(weeks=n)
+    months = n * 12 if frequency == 'yearly' else n
+    return add_months(start, months, anchor_day or start.day)
+
+
+def expand(start: date, frequency: str, window_start: date, window_end: date,
+           interval: int = 1, until: Optional[date] = None, anchor_day: int = None) -> List[date]:
+    """Occurrence dates of a rule that fall inside [window_start, window_end]."""
+    if frequency not in FREQUENCIES:
+        raise ValueError(f'Unknown recurrence frequency: {frequency}')
+    interval = max(int(interval or 1), 1)
+    last = min(window_end, until) if until else window_end
+    if last < start or last < window_start:
+        return []
+
+    # Jump close to the window instead of walking from the start date
+    if frequency == 'weekly':
+        n = max((window_start - start).days // (7 * interval), 0)
+    elif frequency == 'monthly':
+        months = (window_start.year - start.year) * 12 + window_start.month - start.month
+        n = max(months // interval - 1, 0)
+    else:
+        n = max((window_start.year - start.year) // interval - 1, 0)
+
+    dates = []
+    while True:
+        occurrence = nth_occurrence(start, frequency, n * interval, anchor_day)
+        if occurrence > last:
+            break
+        if occurrence >= window_start:
+            dates.append(occurrence)
+        n += 1
+    return dates
+
+
+def series_values(payment) -> Optional[Dict]:
+    """
+    RecurringSeries column values for an expected payment (a Transaction or a
+    row with the same columns), or None for one-time payments.
+    """
+    metadata = payment.transaction_metadata or {}
+    frequency = metadata.get('frequency', 'one-time')
+    if frequency not in FREQUENCIES:
+        return None
+    return {
+        'title': payment.description,
+        'amount': payment.amount,
+        'transaction_type': payment.transaction_type,
+        'transaction_source': payment.transaction_source or 'main_wallet',
+        'category': metadata.get('category', 'other'),
+        'notes': metadata.get('notes', ''),
+        'frequency': frequency,
+        'start_date': payment.created_at.date(),
+        'is_active': True
+    }
+
+
+def series_for_payment(transaction: Transaction) -> Optional[RecurringSeries]:
+    """
+    Series of a recurring expected payment, created from the payment if missing.
+
+    The payment becomes the series' first (persisted) occurrence. Returns None
+    for one-time payments. The caller commits.
+    """
+    values = series_values(transaction)
+    if values is None:
+        return None
+
+    series = db.session.get(RecurringSeries, transaction.series_id) if transaction.series_id else None
+    if series is None:
+        series = RecurringSeries(user_id=transaction.user_id)
+        db.session.add(series)
+    for name, value in values.items():
+        setattr(series, name, value)
+    db.session.flush()
+
+    transaction.series_id = series.id
+    transaction.occurrence_date = series.start_date
+    return series
+
+
+def persist_occurrences(series: RecurringSeries, window_start: date, window_end: date,
+                        status: str = 'scheduled') -> int:
+    """
+    Write the series' occurrences in the window as Transaction rows.
+
+    One range query finds the occurrence dates already stored, the missing
+    ones are worked out in memory and written with a single INSERT. The
+    unique (user_id, series_id, occurrence_date) constraint makes concurrent
+    callers skip rows another request inserted in between (ON CONFLICT DO
+    NOTHING). Returns the number of rows written; the caller commits.
+    """
+    existing = set(db.session.execute(
+        select(Transaction.occurrence_date).where(
+            Transaction.user_id == series.user_id,
+            Transaction.series_id == series.id,
+            Transaction.occurrence_date.between(window_start, window_end)
+        )
+    ).scalars())
+    missing = [
+        when for when in expand(series.start_date, series.frequency, window_start, window_end,
+                                series.interval, series.until_date)
+        if when not in existing
+    ]
+    if not missing:
+        return 0
+
+    metadata = {
+        'source': 'USER_EXPECTED_PAYMENT',
+        'category': series.category,
+        'scheduled': status == 'scheduled',
+        'upcoming': status == 'scheduled',
+        'frequency': series.frequency,
+        'notes': series.notes or '',
+        'user_created': True
+    }
+    rows = [{
+        'user_id': series.user_id,
+        'transaction_type': series.transaction_type,
+        'transaction_source': series.transaction_source or 'main_wallet',
+        'amount': series.amount,
+        'currency': series.currency or 'USD',
+        'status': status,
+        'description': series.title,
+        'transaction_metadata': metadata,
+        'series_id': series.id,
+        'occurrence_date': when,
+        'created_at': datetime.combine(when, datetime.min.time())
+    } for when in missing]
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        statement = postgresql.insert(Transaction).on_conflict_do_nothing(
+            index_elements=['user_id', 'series_id', 'occurrence_date']
+        )
+    elif dialect == 'sqlite':
+        statement = sqlite.insert(Transaction).on_conflict_do_nothing()
+    else:
+        statement = Transaction.__table__.insert()
+    return db.session.execute(statement.values(rows)).rowcount
+
+
+def subscription_frequency(billing_cycle: str):
+    """(frequency, interval) for a subscription billing cycle."""
+    cycle = (billing_cycle or 'monthly').lower()
+    if cycle in CYCLE_DAYS:
+        return 'weekly', CYCLE_DAYS[cycle] // 7
+    months = CYCLE_MONTHS.get(cycle, 1)
+    if months % 12 == 0:
+        return 'yearly', months // 12
+    return 'monthly', months
+
+
+def _occurrence(occurrence_id: str, user_id: int, when: date, amount, description: str,
+                transaction_type: str, transaction_source: str, metadata: Dict, **extra) -> Dict:
+    """Occurrence shaped like Transaction.to_dict() so views can mix both."""
+    data = {
+        'id': None,
+        'occurrence_id': occurrence_id,
+        'user_id': user_id,
+        'transaction_type': transaction_type,
+        'transaction_source': transaction_source or 'main_wallet',
+        'amount': float(amount),
+        'currency': 'USD',
+        'status': 'scheduled',
+        'sender_id': None,
+        'receiver_id': None,
+        'description': description,
+        'metadata': dict(metadata, scheduled=True, upcoming=True, virtual=True),
+        'series_id': None,
+        'occurrence_date': when.isoformat(),
+        'created_at': datetime.combine(when, datetime.min.time()).isoformat(),
+        'completed_at': None
+    }
+    data.update(extra)
+    return data
+
+
+def series_occurrences(user_id: int, window_start: date, window_end: date) -> List[Dict]:
+    """Virtual occurrences of the user's active series (two queries)."""
+    series_list = RecurringSeries.query.filter(
+        RecurringSeries.user_id == user_id,
+        RecurringSeries.is_active.is_(True),
+        RecurringSeries.start_date <= window_end,
+        or_(RecurringSeries.until_date.is_(None), RecurringSeries.until_date >= window_start)
+    ).all()
+    if not series_list:
+        return []
+
+    persisted = {
+        (series_id, occurrence_date)
+        for series_id, occurrence_date in Transaction.query.with_entities(
+            Transaction.series_id, Transaction.occurrence_date
+        ).filter(
+            Transaction.user_id == user_id,
+            Transaction.series_id.in_([series.id for series in series_list]),
+            Transaction.occurrence_date.between(window_start, window_end)
+        )
+    }
+
+    occurrences = []
+    for series in series_list:
+        metadata = {
+            'source': 'USER_EXPECTED_PAYMENT',
+            'category': series.category,
+            'frequency': series.frequency,
+            'notes': series.notes or '',
+            'user_created': True
+        }
+        for when in expand(series.start_date, series.frequency, window_start, window_end,
+                           series.interval, series.until_date):
+            if (series.id, when) in persisted:
+                continue
+            occurrences.append(_occurrence(
+                f'series-{series.id}-{when.isoformat()}', user_id, when, series.amount, series.title,
+                series.transaction_type, series.transaction_source, metadata, series_id=series.id
+            ))
+    return occurrences
+
+
+def subscription_occurrences(user_id: int, window_start: date, window_end: date) -> List[Dict]:
+    """Upcoming billings of the user's active card subscriptions (one query)."""
+    rows = Subscription.query.join(VirtualCard, VirtualCard.id == Subscription.card_id).filter(
+        VirtualCard.user_id == user_id,
+        Subscription.is_active.is_(True),
+        Subscription.auto_renew.isnot(False),
+        Subscription.next_billing_date.isnot(None),
+        Subscription.next_billing_date <= window_end
+    ).all()
+
+    occurrences = []
+    for sub in rows:
+        frequency, interval = subscription_frequency(sub.billing_cycle)
+        metadata = {
+            'source': 'SUBSCRIPTION_PAYMENT',
+            'subscription_id': sub.id,
+            'card_id': sub.card_id,
+            'billing_cycle': sub.billing_cycle,
+            'category': sub.service_category or 'subscription',
+            'display_color': '#FACC15'
+        }
+        for when in expand(sub.next_billing_date, frequency, window_start, window_end, interval,
+                           anchor_day=sub.billing_anchor_day):
+            occurrences.append(_occurrence(
+                f'subscription-{sub.id}-{when.isoformat()}', user_id, when, sub.amount,
+                f'{sub.service_name} - {sub.billing_cycle} subscription',
+                'subscription_payment', 'budget_card', metadata
+            ))
+    return occurrences
+
+
+def upcoming_occurrences(user_id: int, window_start: date, window_end: date) -> List[Dict]:
+    """Scheduled rows plus virtual occurrences in the window, ordered by date."""
+    window_start_dt = datetime.combine(window_start, datetime.min.time())
+    window_end_dt = datetime.combine(window_end + timedelta(days=1), datetime.min.time())
+    scheduled = Transaction.query.filter(
+        Transaction.user_id == user_id,
+        Transaction.status == 'scheduled',
+        and_(Transaction.created_at >= window_start_dt, Transaction.created_at < window_end_dt)
+    ).all()
+
+    occurrences = [t.to_dict() for t in scheduled]
+    occurrences += series_occurrences(user_id, window_start, window_end)
+    occurrences += subscription_occurrences(user_id, window_start, window_end)
+    occurrences.sort(key=lambda o: o['created_at'])
+    return occurrences
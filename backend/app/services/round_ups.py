@@ -0,0 +1,181 @@
+"""
+Round-up micro-savings: payments append a RoundUpEntry in their own commit,
+and settle_round_ups() later moves the summed entries into the chosen pocket.
+Only entries up to the run's starting watermark, stamped with its token, are settled.
+"""
+import uuid
+from datetime import datetime
+from decimal import ROUND_CEILING, Decimal
+from typing import Optional
+
+from sqlalchemy import and_, bindparam, delete, func, insert, select, tuple_, update
+
+from app.extensions import db
+from app.models import RoundUpEntry, SavingsPocket, Transaction, Wallet
+from app.services.wallet_locks import lock_wallets
+
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_UNIT = Decimal('1.00')
+UNITS = (Decimal('1.00'), Decimal('2.00'), Decimal('5.00'), Decimal('10.00'))
+
+
+def round_up_amount(amount, unit=None) -> Decimal:
+    """Difference between amount and the next multiple of unit (0 if already a multiple)."""
+    amount = Decimal(str(amount))
+    unit = Decimal(str(unit or DEFAULT_UNIT))
+    rounded = (amount / unit).to_integral_value(rounding=ROUND_CEILING) * unit
+    return (rounded - amount).quantize(Decimal('0.01'))
+
+
+def record_round_up(wallet: Wallet, amount, source: str) -> Optional[Decimal]:
+    """Queue the round-up of a payment made from wallet; the caller commits."""
+    if not wallet.round_up_pocket_id:
+        return None
+    difference = round_up_amount(amount, wallet.round_up_unit)
+    if difference <= 0:
+        return None
+    db.session.add(RoundUpEntry(
+        user_id=wallet.user_id,
+        pocket_id=wallet.round_up_pocket_id,
+        source=source,
+        payment_amount=Decimal(str(amount)),
+        amount=difference
+    ))
+    return difference
+
+
+def pending_round_ups(user_id: int) -> dict:
+    """Live total of a user's unsettled round-ups."""
+    total, count = db.session.execute(
+        select(func.sum(RoundUpEntry.amount), func.count(RoundUpEntry.id)).where(RoundUpEntry.user_id == user_id)
+    ).one()
+    return {'pending_amount': float(total or 0), 'pending_count': count}
+
+
+def _user_ids(watermark: int, after_user_id: int, limit: int):
+    entries = RoundUpEntry.__table__
+    return db.session.execute(
+        select(entries.c.user_id)
+        .where(entries.c.id <= watermark, entries.c.user_id > after_user_id)
+        .group_by(entries.c.user_id)
+        .order_by(entries.c.user_id)
+        .limit(limit)
+    ).scalars().all()
+
+
+def _settle_chunk(user_ids, watermark: int, now: datetime) -> dict:
+    entries = RoundUpEntry.__table__
+    pockets = SavingsPocket.__table__
+    wallets = Wallet.__table__
+
+    available = {
+        user_id: None if wallet.is_frozen else Decimal(str(wallet.balance or 0))
+        for user_id, wallet in lock_wallets(user_ids).items()
+    }
+
+    token = uuid.uuid4().hex
+    db.session.execute(
+        update(entries)
+        .where(entries.c.user_id.in_(user_ids), entries.c.id <= watermark, entries.c.settlement_token.is_(None))
+        .values(settlement_token=token)
+        .execution_options(synchronize_session=False)
+    )
+
+    groups = db.session.execute(
+        select(
+            entries.c.user_id, entries.c.pocket_id, pockets.c.name.label('pocket_name'),
+            func.sum(entries.c.amount).label('amount'), func.count(entries.c.id).label('entries')
+        )
+        .outerjoin(pockets, and_(pockets.c.id == entries.c.pocket_id, pockets.c.user_id == entries.c.user_id))
+        .where(entries.c.settlement_token == token)
+        .group_by(entries.c.user_id, entries.c.pocket_id, pockets.c.name)
+        .order_by(entries.c.user_id, entries.c.pocket_id)
+    ).all()
+
+    settled, credits, debits, ledger = [], [], {}, []
+    for group in groups:
+        if group.pocket_name is None:
+            settled.append((group.user_id, group.pocket_id))
+            continue
+        amount = Decimal(str(group.amount))
+        balance = available.get(group.user_id)
+        if balance is None or balance < amount:
+            continue
+
+        available[group.user_id] = balance - amount
+        debits[group.user_id] = debits.get(group.user_id, Decimal('0.00')) + amount
+        credits.append({'pocket_id': group.pocket_id, 'credit': amount})
+        settled.append((group.user_id, group.pocket_id))
+        ledger.append({
+            'user_id': group.user_id,
+            'transaction_type': 'savings_deposit',
+            'transaction_source': 'dark_days',
+            'amount': amount,
+            'status': 'completed',
+            'description': f'Round-ups to {group.pocket_name}',
+            'transaction_metadata': {
+                'pocket_id': group.pocket_id,
+                'pocket_name': group.pocket_name,
+                'round_up': True,
+                'entries': group.entries
+            },
+            'created_at': now,
+            'completed_at': now
+        })
+
+    if credits:
+        db.session.connection().execute(
+            update(pockets)
+            .where(pockets.c.id == bindparam('pocket_id'))
+            .values(balance=pockets.c.balance + bindparam('credit'), updated_at=now),
+            credits
+        )
+        db.session.connection().execute(
+            update(wallets)
+            .where(wallets.c.user_id == bindparam('wallet_user_id'))
+            .values(balance=wallets.c.balance - bindparam('debit'), updated_at=now),
+            [{'wallet_user_id': user_id, 'debit': debit} for user_id, debit in debits.items()]
+        )
+        db.session.execute(insert(Transaction), ledger)
+    if settled:
+        db.session.execute(
+            delete(entries)
+            .where(entries.c.settlement_token == token, tuple_(entries.c.user_id, entries.c.pocket_id).in_(settled))
+            .execution_options(synchronize_session=False)
+        )
+    # Groups that couldn't be paid stay pending for the next run
+    db.session.execute(
+        update(entries).where(entries.c.settlement_token == token).values(settlement_token=None)
+        .execution_options(synchronize_session=False)
+    )
+
+    db.session.commit()
+    return {'pockets_credited': len(credits), 'amount_settled': sum(debits.values(), Decimal('0.00'))}
+
+
+def settle_round_ups(now: datetime = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+    """Settle every round-up queued before the run started; returns run totals."""
+    now = now or datetime.utcnow()
+    summary = {'chunks': 0, 'users': 0, 'pockets_credited': 0, 'amount_settled': Decimal('0.00')}
+
+    watermark = db.session.execute(select(func.max(RoundUpEntry.id))).scalar()
+    if watermark is None:
+        return summary
+
+    last_user_id = 0
+    while True:
+        user_ids = _user_ids(watermark, last_user_id, chunk_size)
+        if not user_ids:
+            break
+        try:
+            result = _settle_chunk(user_ids, watermark, now)
+        except Exception:
+            db.session.rollback()
+            raise
+        summary['chunks'] += 1
+        summary['users'] += len(user_ids)
+        for key in ('pockets_credited', 'amount_settled'):
+            summary[key] += result[key]
+        last_user_id = user_ids[-1]
+
+    return summary
@@ -0,0 +1,70 @@
+"""
+Seller profiles shown on marketplace listings.
+
+A listing page shows the same few sellers over and over, so their public
+profile (name, username, university, faculty, member since) is kept in a
+TTL + LRU cache keyed by user id. A page of listings looks up all of its
+sellers at once. Those already cached are free; the rest are read with one
+"WHERE id IN (...)" query, so a page costs at most one seller query instead
+of one per listing. Email addresses and other private columns are never
+loaded.
+
+User updates and deletes in this process drop the user's entry (see the
+listeners in app/models/user.py); other worker processes see the change when
+their entry expires (SELLER_PROFILE_CACHE_TTL).
+
+Usage:
+    seller_profile_cache.init_app(app)
+    sellers = seller_profiles(listing.seller_id for listing in listings)
+    data = listing.to_dict(include_seller=True, sellers=sellers)
+"""
+from collections import namedtuple
+from typing import Dict, Iterable, List
+
+from sqlalchemy import select
+
+from app.services.ttl_cache import TTLCache
+
+SellerProfile = namedtuple('SellerProfile', ['id', 'username', 'first_name', 'last_name', 'university', 'faculty',
+                                             'created_at'])
+
+
+class SellerProfileCache(TTLCache):
+    """
+    TTL + LRU map of user id -> SellerProfile.
+
+    Usage:
+        seller_profile_cache.init_app(app)
+        profiles = seller_profile_cache.get_many(user_ids, load_seller_profiles)
+        seller_profile_cache.invalidate(user_id)
+
+    Unknown ids aren't cached, so they are looked up again next time.
+    """
+
+    config_prefix = 'SELLER_PROFILE_CACHE'
+    extension_name = 'seller_profile_cache'
+    default_ttl = 60
+    default_size = 10000
+
+
+def load_seller_profiles(user_ids: List[int]) -> Dict[int, SellerProfile]:
+    """Read the public profile columns of several users in one query."""
+    from app.extensions import db
+    from app.models import User
+
+    rows = db.session.execute(
+        select(User.id, User.username, User.first_name, User.last_name, User.university, User.faculty,
+               User.created_at)
+        .where(User.id.in_(user_ids))
+    )
+    return {
+        row.id: SellerProfile(*row[:-1], row.created_at.isoformat() if row.created_at else None)
+        for row in rows
+    }
+
+
+def seller_profiles(user_ids: Iterable[int]) -> Dict[int, SellerProfile]:
+    """{user_id: SellerProfile} for the given sellers, from the shared cache."""
+    from app.extensions import seller_profile_cache
+
+    return seller_profile_cache.get_many(user_ids, load_seller_profiles)
@@ -0,0 +1,144 @@
+"""
+Per-card spending velocity limits backed by running counters.
+
+Each payment card keeps one CardSpendCounter row per period (calendar day and
+calendar month, UTC). The windows are calendar windows, not rolling ones: a
+counter restarts at 00:00 UTC or on the 1st of the month, so the last 24 hours
+or 30 days are never summed. Authorising a payment reads at most two rows by primary
+key and compares them with the card's limits; recording it adds the amount to
+the same rows in the payment's own transaction. Nothing sums Transaction rows
+on the payment path.
+
+Limits:
+    - daily:   VirtualCard.daily_limit
+    - monthly: VirtualCard.spending_limit
+
+The counters can be rebuilt from completed card_payment transactions with
+rebuild_counters() (e.g. after a restore or a manual ledger correction). The
+c5d17a3e9b42 migration runs it once so existing cards start with their current
+spend; afterwards use scripts/rebuild_spend_counters.py.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import and_, case, delete, func, insert, or_, select
+
+from app.extensions import db
+from app.models import CardSpendCounter, Transaction, VirtualCard
+
+PERIODS = ('daily', 'monthly')
+
+
+def window_start(period: str, now: datetime) -> date:
+    """First day of the daily or monthly window containing now."""
+    if period == 'daily':
+        return now.date()
+    if period == 'monthly':
+        return now.date().replace(day=1)
+    raise ValueError(f'Unknown spend counter period: {period}')
+
+
+def card_limits(card: VirtualCard) -> Dict[str, Optional[Decimal]]:
+    return {
+        'daily': card.daily_limit,
+        'monthly': card.spending_limit,
+    }
+
+
+def load_counters(card_id: int) -> Dict[str, CardSpendCounter]:
+    """Counter rows of a card keyed by period (one primary-key range query)."""
+    return {counter.period: counter for counter in CardSpendCounter.query.filter_by(card_id=card_id).all()}
+
+
+def current_spend(counters: Dict[str, CardSpendCounter], now: datetime) -> Dict[str, Decimal]:
+    return {
+        period: counters[period].current_amount(window_start(period, now)) if period in counters else Decimal('0.00')
+        for period in PERIODS
+    }
+
+
+def check_limits(card: VirtualCard, amount: Decimal, spent: Dict[str, Decimal]) -> Optional[str]:
+    """Error message if amount would break a daily or monthly limit, else None."""
+    for period, limit in card_limits(card).items():
+        if limit is None:
+            continue
+        limit = VirtualCard.to_decimal(limit)
+        if spent[period] + amount > limit:
+            label = 'daily' if period == 'daily' else 'spending'
+            return f'Payment exceeds {label} limit. Available: ${float(limit - spent[period]):.2f}'
+    return None
+
+
+def record_spend(card_id: int, amount: Decimal, counters: Dict[str, CardSpendCounter], now: datetime) -> None:
+    """Add amount to the card's counters; caller commits together with the payment."""
+    for period in PERIODS:
+        start = window_start(period, now)
+        counter = counters.get(period)
+        if counter is None:
+            counter = CardSpendCounter(card_id=card_id, period=period, window_start=start, amount=amount)
+            db.session.add(counter)
+            counters[period] = counter
+        else:
+            counter.amount = counter.current_amount(start) + amount
+            counter.window_start = start
+
+
+def rebuild_counters(card_ids: Optional[Iterable[int]] = None, now: Optional[datetime] = None, bind=None) -> int:
+    """
+    Recompute counters from completed card_payment transactions.
+
+    One grouped query over the current month plus a delete and a bulk insert,
+    run on bind (a migration's connection) or db.session. Returns the number of
+    counter rows written. The caller commits.
+    """
+    bind = bind if bind is not None else db.session
+    now = now or datetime.utcnow()
+    day_start = window_start('daily', now)
+    month_start = window_start('monthly', now)
+    day_start_dt = datetime.combine(day_start, datetime.min.time())
+    month_start_dt = datetime.combine(month_start, datetime.min.time())
+
+    # Older payments only record the card in metadata
+    card_id_expr = func.coalesce(Transaction.card_id, Transaction.transaction_metadata['card_id'].as_integer())
+    query = (
+        select(
+            card_id_expr.label('card_id'),
+            func.sum(case((Transaction.created_at >= day_start_dt, Transaction.amount), else_=0)).label('daily'),
+            func.sum(Transaction.amount).label('monthly')
+        )
+        .where(
+            Transaction.transaction_type == 'card_payment',
+            Transaction.status == 'completed',
+            Transaction.created_at >= month_start_dt
+        )
+        .group_by(card_id_expr)
+    )
+
+    card_ids = list(card_ids) if card_ids is not None else None
+    clear = delete(CardSpendCounter)
+    if card_ids is not None:
+        query = query.where(or_(
+            Transaction.card_id.in_(card_ids),
+            and_(Transaction.card_id.is_(None), Transaction.transaction_metadata['card_id'].as_integer().in_(card_ids))
+        ))
+        clear = clear.where(CardSpendCounter.card_id.in_(card_ids))
+
+    totals = bind.execute(query).all()
+    existing_cards = set()
+    if totals:
+        existing_cards = set(bind.execute(
+            select(VirtualCard.id).where(VirtualCard.id.in_([row.card_id for row in totals]))
+        ).scalars())
+
+    rows = []
+    for row in totals:
+        if row.card_id not in existing_cards:
+            continue
+        rows.append({'card_id': row.card_id, 'period': 'daily', 'window_start': day_start, 'amount': row.daily or 0})
+        rows.append({'card_id': row.card_id, 'period': 'monthly', 'window_start': month_start, 'amount': row.monthly or 0})
+
+    bind.execute(clear)
+    if rows:
+        bind.execute(insert(CardSpendCounter), rows)
+    return len(rows)
@@ -0,0 +1,352 @@
+"""
+Batch biller for SubscriptionCard and card Subscription rows. Due rows are
+claimed with SKIP LOCKED (PostgreSQL) or a claim token (SQLite) so billers can
+run side by side; failed charges back off and pause after MAX_ATTEMPTS.
+"""
+import calendar
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import and_, bindparam, insert, or_, select, update
+
+from app.extensions import db
+from app.models import Subscription, SubscriptionCard, Transaction, VirtualCard, Wallet
+from app.services.wallet_locks import lock_wallets
+
+DEFAULT_CHUNK_SIZE = 1000
+CLAIM_TIMEOUT = timedelta(minutes=15)
+MAX_ATTEMPTS = 4
+RETRY_BACKOFF = timedelta(hours=1)  # Doubles after every failure
+MAX_RETRY_BACKOFF = timedelta(hours=24)
+
+CYCLE_MONTHS = {'monthly': 1, 'quarterly': 3, 'yearly': 12, 'annual': 12, 'annually': 12}
+CYCLE_DAYS = {'weekly': 7, 'biweekly': 14}
+
+
+def add_months(start: date, months: int, anchor_day: int) -> date:
+    """start moved by whole months, on anchor_day clamped to the month's length."""
+    year, month = divmod(start.month - 1 + months, 12)
+    year += start.year
+    month += 1
+    return date(year, month, min(anchor_day, calendar.monthrange(year, month)[1]))
+
+
+def advance_billing_date(current: date, billing_cycle: str, anchor_day: int = None) -> date:
+    """Next billing date after current for the given cycle (unknown cycles bill monthly)."""
+    cycle = (billing_cycle or 'monthly').lower()
+    if cycle in CYCLE_DAYS:
+        return current + timedelta(days=CYCLE_DAYS[cycle])
+    return add_months(current, CYCLE_MONTHS.get(cycle, 1), anchor_day or current.day)
+
+
+def next_billing_after(current: date, billing_cycle: str, anchor_day: int, today: date) -> date:
+    """First billing date after today (missed periods are skipped, not replayed)."""
+    next_date = advance_billing_date(current, billing_cycle, anchor_day)
+    while next_date <= today:
+        next_date = advance_billing_date(next_date, billing_cycle, anchor_day)
+    return next_date
+
+
+def retry_delay(failures: int) -> timedelta:
+    return min(RETRY_BACKOFF * (2 ** (failures - 1)), MAX_RETRY_BACKOFF)
+
+
+def _is_postgres() -> bool:
+    return db.session.get_bind().dialect.name == 'postgresql'
+
+
+def _claim(table, due_clause, chunk_size: int, now: datetime):
+    """Claim up to chunk_size due rows of table; returns their ids."""
+    candidates = select(table.c.id).where(due_clause).order_by(table.c.next_billing_date, table.c.id).limit(chunk_size)
+
+    if _is_postgres():
+        # Row locks are held until the chunk transaction commits
+        return db.session.execute(candidates.with_for_update(skip_locked=True)).scalars().all()
+
+    token = uuid.uuid4().hex
+    db.session.execute(
+        update(table)
+        .where(table.c.id.in_(
+            candidates.where(or_(
+                table.c.billing_claim_token.is_(None),
+                table.c.billing_claimed_at < now - CLAIM_TIMEOUT
+            )).scalar_subquery()
+        ))
+        .values(billing_claim_token=token, billing_claimed_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return db.session.execute(select(table.c.id).where(table.c.billing_claim_token == token)).scalars().all()
+
+
+def _settle(rows, wallets: dict, now: datetime):
+    """
+    Decide each claimed row in memory against the locked wallets, charging a
+    user's rows in id order while the wallet covers them. Returns
+    (charged, failed, debits) where debits maps user_id -> total charged.
+    """
+    balances = {}
+    charged, failed, debits = [], [], {}
+    for row in rows:
+        amount = VirtualCard.to_decimal(row.amount)
+        wallet = wallets.get(row.user_id)
+        if wallet is None:
+            error = 'Wallet not found'
+        elif wallet.is_frozen:
+            error = 'Wallet is frozen'
+        elif getattr(row, 'card_blocked', False):
+            error = 'Card is frozen or inactive'
+        else:
+            balance = balances.setdefault(row.user_id, VirtualCard.to_decimal(wallet.balance))
+            if balance < amount:
+                error = 'Insufficient balance'
+            else:
+                balances[row.user_id] = balance - amount
+                debits[row.user_id] = debits.get(row.user_id, Decimal('0.00')) + amount
+                charged.append(row)
+                continue
+        failed.append((row, error))
+    return charged, failed, debits
+
+
+def _debit_wallets(debits, now: datetime) -> None:
+    if not debits:
+        return
+    wallets = Wallet.__table__
+    db.session.connection().execute(
+        update(wallets)
+        .where(wallets.c.user_id == bindparam('wallet_user_id'))
+        .values(balance=wallets.c.balance - bindparam('debit'), updated_at=now),
+        [{'wallet_user_id': user_id, 'debit': debit} for user_id, debit in debits.items()]
+    )
+
+
+def _record_failures(table, failed, now: datetime, paused_values: dict) -> int:
+    """Bump failure counters and schedule retries; pause rows that ran out of attempts."""
+    if not failed:
+        return 0
+    retry, paused = [], []
+    for row, error in failed:
+        failures = (row.billing_failures or 0) + 1
+        params = {'row_id': row.id, 'failures': failures, 'error': error}
+        if failures >= MAX_ATTEMPTS:
+            paused.append(params)
+        else:
+            retry.append(dict(params, retry_at=now + retry_delay(failures)))
+
+    base = dict(
+        billing_failures=bindparam('failures'),
+        billing_last_error=bindparam('error'),
+        billing_claim_token=None,
+        billing_claimed_at=None
+    )
+    if retry:
+        db.session.connection().execute(
+            update(table).where(table.c.id == bindparam('row_id'))
+            .values(billing_retry_at=bindparam('retry_at'), **base),
+            retry
+        )
+    if paused:
+        db.session.connection().execute(
+            update(table).where(table.c.id == bindparam('row_id'))
+            .values(billing_retry_at=None, **paused_values, **base),
+            paused
+        )
+    return len(paused)
+
+
+def _due_subscription_cards(today: date, now: datetime):
+    table = SubscriptionCard.__table__
+    return and_(
+        table.c.status == 'active',
+        table.c.next_billing_date <= today,
+        or_(table.c.billing_retry_at.is_(None), table.c.billing_retry_at <= now)
+    )
+
+
+def _bill_subscription_cards_chunk(ids, today: date, now: datetime) -> dict:
+    subs = SubscriptionCard.__table__
+
+    rows = db.session.execute(
+        select(
+            subs.c.id, subs.c.user_id, subs.c.service_name, subs.c.category,
+            subs.c.monthly_cost.label('amount'), subs.c.next_billing_date,
+            subs.c.billing_anchor_day, subs.c.billing_failures
+        )
+        .where(subs.c.id.in_(ids))
+        .order_by(subs.c.user_id, subs.c.id)
+    ).all()
+    locked_wallets = lock_wallets(row.user_id for row in rows)
+
+    charged, failed, debits = _settle(rows, locked_wallets, now)
+    _debit_wallets(debits, now)
+
+    if charged:
+        db.session.connection().execute(
+            update(subs).where(subs.c.id == bindparam('row_id')).values(
+                total_paid=subs.c.total_paid + bindparam('charged'),
+                last_billing_date=today,
+                next_billing_date=bindparam('next_date'),
+                billing_anchor_day=bindparam('anchor_day'),
+                billing_failures=0,
+                billing_retry_at=None,
+                billing_last_error=None,
+                billing_claim_token=None,
+                billing_claimed_at=None,
+                updated_at=now
+            ),
+            [{
+                'row_id': row.id,
+                'charged': row.amount,
+                'anchor_day': row.billing_anchor_day or row.next_billing_date.day,
+                'next_date': next_billing_after(
+                    row.next_billing_date, 'monthly', row.billing_anchor_day or row.next_billing_date.day, today
+                )
+            } for row in charged]
+        )
+        db.session.execute(insert(Transaction), [{
+            'user_id': row.user_id,
+            'transaction_type': 'subscription_payment',
+            'transaction_source': 'main_wallet',
+            'amount': row.amount,
+            'status': 'completed',
+            'description': f'Monthly payment for {row.service_name}',
+            'transaction_metadata': {
+                'source': 'SUBSCRIPTION_PAYMENT',
+                'subscription_card_id': row.id,
+                'billing_date': row.next_billing_date.isoformat(),
+                'category': row.category
+            },
+            'created_at': now,
+            'completed_at': now
+        } for row in charged])
+
+    paused = _record_failures(subs, failed, now, {'status': 'paused', 'updated_at': now})
+    db.session.commit()
+    return {'charged': len(charged), 'failed': len(failed), 'paused': paused,
+            'amount': sum(debits.values(), Decimal('0.00'))}
+
+
+def _due_card_subscriptions(today: date, now: datetime):
+    table = Subscription.__table__
+    return and_(
+        table.c.is_active.is_(True),
+        table.c.auto_renew.isnot(False),
+        table.c.next_billing_date <= today,
+        or_(table.c.billing_retry_at.is_(None), table.c.billing_retry_at <= now)
+    )
+
+
+def _bill_card_subscriptions_chunk(ids, today: date, now: datetime) -> dict:
+    subs = Subscription.__table__
+    cards = VirtualCard.__table__
+
+    rows = db.session.execute(
+        select(
+            subs.c.id, subs.c.card_id, subs.c.service_name, subs.c.service_category,
+            subs.c.amount, subs.c.billing_cycle, subs.c.next_billing_date,
+            subs.c.billing_anchor_day, subs.c.billing_failures,
+            cards.c.user_id,
+            or_(cards.c.is_frozen.is_(True), cards.c.is_active.is_(False)).label('card_blocked')
+        )
+        .outerjoin(cards, cards.c.id == subs.c.card_id)
+        .where(subs.c.id.in_(ids))
+        .order_by(cards.c.user_id, subs.c.id)
+    ).all()
+    locked_wallets = lock_wallets(row.user_id for row in rows)
+
+    charged, failed, debits = _settle(rows, locked_wallets, now)
+    _debit_wallets(debits, now)
+
+    if charged:
+        card_spend = {}
+        for row in charged:
+            card_spend[row.card_id] = card_spend.get(row.card_id, Decimal('0.00')) + VirtualCard.to_decimal(row.amount)
+        db.session.connection().execute(
+            update(cards).where(cards.c.id == bindparam('row_id')).values(
+                spent_amount=cards.c.spent_amount + bindparam('charged'), updated_at=now
+            ),
+            [{'row_id': card_id, 'charged': amount} for card_id, amount in card_spend.items()]
+        )
+
+        next_dates = {}
+        for row in charged:
+            anchor = row.billing_anchor_day or row.next_billing_date.day
+            next_dates[row.id] = (next_billing_after(row.next_billing_date, row.billing_cycle, anchor, today), anchor)
+        db.session.connection().execute(
+            update(subs).where(subs.c.id == bindparam('row_id')).values(
+                last_payment_date=today,
+                next_billing_date=bindparam('next_date'),
+                billing_anchor_day=bindparam('anchor_day'),
+                billing_failures=0,
+                billing_retry_at=None,
+                billing_last_error=None,
+                billing_claim_token=None,
+                billing_claimed_at=None
+            ),
+            [{'row_id': sub_id, 'next_date': next_date, 'anchor_day': anchor}
+             for sub_id, (next_date, anchor) in next_dates.items()]
+        )
+
+        # Only the settled payment is written; upcoming billings are expanded
+        # from next_billing_date (app.services.recurrence)
+        ledger = []
+        for row in charged:
+            ledger.append({
+                'user_id': row.user_id,
+                'transaction_type': 'subscription_payment',
+                'transaction_source': 'budget_card',
+                'amount': row.amount,
+                'status': 'completed',
+                'description': f'{row.service_name} - {row.billing_cycle} subscription',
+                'transaction_metadata': {
+                    'source': 'SUBSCRIPTION_PAYMENT',
+                    'subscription_id': row.id,
+                    'card_id': row.card_id,
+                    'billing_cycle': row.billing_cycle,
+                    'category': row.service_category or 'subscription',
+                    'billing_date': row.next_billing_date.isoformat()
+                },
+                'card_id': row.card_id,
+                'created_at': now,
+                'completed_at': now
+            })
+        db.session.execute(insert(Transaction), ledger)
+
+    paused = _record_failures(subs, failed, now, {'is_active': False})
+    db.session.commit()
+    return {'charged': len(charged), 'failed': len(failed), 'paused': paused,
+            'amount': sum(debits.values(), Decimal('0.00'))}
+
+
+BILLERS = (
+    ('subscription_cards', SubscriptionCard.__table__, _due_subscription_cards, _bill_subscription_cards_chunk),
+    ('card_subscriptions', Subscription.__table__, _due_card_subscriptions, _bill_card_subscriptions_chunk),
+)
+
+
+def run_subscription_billing(now: datetime = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+    """Bill every due subscription of both kinds; returns per-kind totals."""
+    now = now or datetime.utcnow()
+    today = now.date()
+    summary = {}
+
+    for name, table, due, bill_chunk in BILLERS:
+        totals = {'chunks': 0, 'charged': 0, 'failed': 0, 'paused': 0, 'amount': Decimal('0.00')}
+        while True:
+            try:
+                ids = _claim(table, due(today, now), chunk_size, now)
+                if not ids:
+                    db.session.rollback()
+                    break
+                result = bill_chunk(ids, today, now)
+            except Exception:
+                db.session.rollback()
+                raise
+            totals['chunks'] += 1
+            for key in ('charged', 'failed', 'paused', 'amount'):
+                totals[key] += result[key]
+        summary[name] = totals
+
+    return summary
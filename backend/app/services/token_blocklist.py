@@ -0,0 +1,228 @@
+"""
+JWT revocation (deny-list) for UniPay.
+
+Revoked token JTIs are kept in process memory behind a Bloom filter, so the
+check done on every authenticated request is a handful of bit lookups and
+never touches the application database. Entries carry the token's own expiry
+and are dropped once the token could no longer be used anyway.
+
+Workers share revocations through a pluggable backend. Each worker pulls new
+entries from the backend at most once per sync interval, so a revocation made
+by one worker is honoured by the others within that interval.
+
+Backends:
+    - "memory": single-process only (tests, one-worker dev server)
+    - "sqlite": a small WAL-mode SQLite file shared by all workers on a host
+"""
+import bisect
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over string keys."""
+
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class MemoryBlocklistBackend:
+    """
+    Process-local backend; nothing is shared between workers.
+
+    Entries are numbered like the SQLite backend's rowids, so pruning expired
+    ones never invalidates a cursor.
+    """
+
+    def __init__(self):
+        self._entries: List[Tuple[int, str, float]] = []
+        self._last_id = 0
+
+    def publish(self, jti: str, expires_at: float) -> None:
+        self._last_id += 1
+        self._entries.append((self._last_id, jti, expires_at))
+
+    def fetch_since(self, cursor: int) -> Tuple[int, List[Tuple[str, float]]]:
+        start = bisect.bisect_right(self._entries, cursor, key=lambda entry: entry[0])
+        rows = self._entries[start:]
+        if not rows:
+            return cursor, []
+        return rows[-1][0], [(jti, expires_at) for _, jti, expires_at in rows]
+
+    def prune(self, now: float) -> None:
+        self._entries = [entry for entry in self._entries if entry[2] >= now]
+
+
+class SQLiteBlocklistBackend:
+    """
+    Shared backend stored in a SQLite file (WAL mode).
+
+    Stand-in for Redis/Postgres LISTEN in local and single-host deployments.
+    The rowid is used as a monotonically increasing cursor.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS revoked_tokens ('
+                ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+                ' jti TEXT NOT NULL,'
+                ' expires_at REAL NOT NULL)'
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5, isolation_level=None)
+
+    def publish(self, jti: str, expires_at: float) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT INTO revoked_tokens (jti, expires_at) VALUES (?, ?)',
+                (jti, expires_at)
+            )
+
+    def fetch_since(self, cursor: int) -> Tuple[int, List[Tuple[str, float]]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT id, jti, expires_at FROM revoked_tokens WHERE id > ? ORDER BY id',
+                (cursor,)
+            ).fetchall()
+        if not rows:
+            return cursor, []
+        return rows[-1][0], [(jti, expires_at) for _, jti, expires_at in rows]
+
+    def prune(self, now: float) -> None:
+        with self._connect() as conn:
+            conn.execute('DELETE FROM revoked_tokens WHERE expires_at < ?', (now,))
+
+
+BACKENDS = {
+    'memory': MemoryBlocklistBackend,
+    'sqlite': SQLiteBlocklistBackend,
+}
+
+
+class TokenBlocklist:
+    """
+    In-process JWT deny-list: Bloom filter in front of an exact jti -> expiry map.
+
+    Usage:
+        token_blocklist.init_app(app)
+        token_blocklist.revoke(jwt_payload['jti'], jwt_payload['exp'])
+        token_blocklist.is_revoked(jti)
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, float] = {}
+        self._bloom = BloomFilter()
+        self._backend = MemoryBlocklistBackend()
+        self._cursor = 0
+        self._sync_interval = 5.0
+        self._last_sync = 0.0
+        self._last_prune = 0.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        backend_name = app.config.get('TOKEN_BLOCKLIST_BACKEND', 'memory')
+        if backend_name not in BACKENDS:
+            raise ValueError(f'Unknown token blocklist backend: {backend_name}')
+
+        if backend_name == 'sqlite':
+            path = app.config.get('TOKEN_BLOCKLIST_PATH') or os.path.join(
+                app.instance_path, 'token_blocklist.db'
+            )
+            backend = SQLiteBlocklistBackend(path)
+        else:
+            backend = BACKENDS[backend_name]()
+
+        with self._lock:
+            self._backend = backend
+            self._entries = {}
+            self._bloom = BloomFilter(app.config.get('TOKEN_BLOCKLIST_CAPACITY', 100000))
+            self._cursor = 0
+            self._last_sync = 0.0
+            self._sync_interval = float(app.config.get('TOKEN_BLOCKLIST_SYNC_INTERVAL', 5))
+
+        app.extensions['token_blocklist'] = self
+
+    def revoke(self, jti: str, expires_at: Optional[float]) -> None:
+        """Revoke a token until its expiry (UNIX timestamp)."""
+        if expires_at is None:
+            expires_at = time.time() + 30 * 24 * 3600
+        self._backend.publish(jti, float(expires_at))
+        with self._lock:
+            self._add(jti, float(expires_at))
+
+    def is_revoked(self, jti: str) -> bool:
+        """O(1) check; performs a backend sync at most once per sync interval."""
+        now = time.time()
+        if now - self._last_sync >= self._sync_interval:
+            self.sync(now)
+
+        if jti not in self._bloom:
+            return False
+
+        expires_at = self._entries.get(jti)
+        return expires_at is not None and expires_at >= now
+
+    def sync(self, now: Optional[float] = None) -> None:
+        """Pull revocations published by other workers and drop expired entries."""
+        now = now or time.time()
+        with self._lock:
+            self._last_sync = now
+            cursor, entries = self._backend.fetch_since(self._cursor)
+            self._cursor = cursor
+            for jti, expires_at in entries:
+                self._add(jti, expires_at)
+
+            if now - self._last_prune >= 60 * self._sync_interval:
+                self._last_prune = now
+                self._expire(now)
+
+    def _add(self, jti: str, expires_at: float) -> None:
+        if expires_at > self._entries.get(jti, 0):
+            self._entries[jti] = expires_at
+        self._bloom.add(jti)
+
+    def _expire(self, now: float) -> None:
+        """Drop expired entries and rebuild the Bloom filter without them."""
+        live = {jti: exp for jti, exp in self._entries.items() if exp >= now}
+        if len(live) == len(self._entries):
+            return
+        bloom = BloomFilter(self._bloom.capacity)
+        for jti in live:
+            bloom.add(jti)
+        self._entries = live
+        self._bloom = bloom
+        self._backend.prune(now)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,114 @@
+"""
+Thread-safe TTL + LRU cache shared by the in-process caches.
+
+Entries expire TTL seconds after they were loaded and the least recently used
+ones are evicted past SIZE entries. Each cache subclasses TTLCache, naming its
+config keys (<config_prefix>_TTL, <config_prefix>_SIZE) and its
+app.extensions slot. Loaders run outside the lock, and None results are not
+cached, so an id that doesn't exist yet is looked up again next time.
+
+Usage:
+    class CardAuthCache(TTLCache):
+        config_prefix = 'CARD_AUTH_CACHE'
+        extension_name = 'card_auth_cache'
+        default_ttl = 10
+
+    card_auth_cache.init_app(app)
+    state = card_auth_cache.get(card_id, load_card_auth_state)
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List
+
+
+class TTLCache:
+    """
+    TTL + LRU map of key -> value, with hit/miss counters.
+
+    Usage:
+        cache.init_app(app)
+        value = cache.get(key, loader)
+        values = cache.get_many(keys, many_loader)
+        cache.invalidate(key)
+    """
+
+    config_prefix = ''
+    extension_name = ''
+    default_ttl = 60
+    default_size = 10000
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._ttl = float(self.default_ttl)
+        self._max_entries = self.default_size
+        self.hits = 0
+        self.misses = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        with self._lock:
+            self._ttl = float(app.config.get(f'{self.config_prefix}_TTL', self.default_ttl))
+            self._max_entries = int(app.config.get(f'{self.config_prefix}_SIZE', self.default_size))
+            self._entries.clear()
+        app.extensions[self.extension_name] = self
+
+    def get(self, key: Hashable, loader: Callable[[Hashable], Any]) -> Any:
+        """Cached value for key, calling loader(key) on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        self.misses += 1
+        value = loader(key)
+        if value is not None:
+            self._store({key: value}, now)
+        return value
+
+    def get_many(self, keys: Iterable[Hashable],
+                 loader: Callable[[List[Hashable]], Dict[Hashable, Any]]) -> Dict[Hashable, Any]:
+        """Values of the given keys, calling loader(missing_keys) once for those not cached."""
+        now = time.monotonic()
+        values, missing = {}, []
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] > now:
+                    self._entries.move_to_end(key)
+                    values[key] = entry[0]
+                else:
+                    missing.append(key)
+        self.hits += len(values)
+        if not missing:
+            return values
+
+        self.misses += len(missing)
+        loaded = loader(missing)
+        self._store(loaded, now)
+        values.update(loaded)
+        return values
+
+    def _store(self, values: Dict[Hashable, Any], now: float) -> None:
+        with self._lock:
+            for key, value in values.items():
+                self._entries[key] = (value, now + self._ttl)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
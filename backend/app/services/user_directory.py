@@ -0,0 +1,127 @@
+"""
+User directory search for recipient pickers (transfers, loans).
+
+Users are matched by prefix on their username or their "first last" name.
+Both are stored case-folded in indexed columns (users.username_search,
+users.name_search, kept in sync by the listener in app/models/user.py). A
+prefix is matched as the range [prefix, prefix + U+10FFFF) on SQLite, where
+LIKE is case-insensitive and can't use the index, and as LIKE 'prefix%' on
+the text_pattern_ops indexes on PostgreSQL, so both are index range scans.
+Results come in (username_search, id) order, a page at a time, with an
+opaque keyset cursor. Offsets are never used.
+
+Pages for hot prefixes ("a", "jo", ...) are kept in a TTL + LRU cache. Any
+username or name change in this process clears it; other worker processes
+see the change when their entries expire (USER_SEARCH_CACHE_TTL).
+
+Usage:
+    user_search_cache.init_app(app)
+    users, next_cursor = search_users('jo', exclude_user_id=user_id)
+"""
+from collections import namedtuple
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, or_, select, tuple_
+
+from app.services.ttl_cache import TTLCache
+from app.utils import cursors
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+MAX_QUERY_LENGTH = 80
+PREFIX_END = chr(0x10FFFF)  # sorts after every character that can follow a prefix
+
+DirectoryEntry = namedtuple('DirectoryEntry', ['id', 'username', 'first_name', 'last_name', 'username_search'])
+
+
+def fold(text: Optional[str]) -> str:
+    """Case-folded, whitespace-normalised form used for matching."""
+    return ' '.join((text or '').split()).casefold()
+
+
+def full_name_key(first_name: Optional[str], last_name: Optional[str]) -> Optional[str]:
+    key = fold(f'{first_name or ""} {last_name or ""}')
+    return key or None
+
+
+def encode_cursor(entry: DirectoryEntry) -> str:
+    return cursors.encode_cursor([entry.username_search, entry.id])
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """(username_search, id) of the last user on the previous page; ValueError if malformed."""
+    username_search, user_id = cursors.decode_cursor(cursor, 2)
+    try:
+        return str(username_search), int(user_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+class UserSearchCache(TTLCache):
+    """
+    TTL + LRU map of (prefix, cursor, limit) -> list of DirectoryEntry.
+
+    Usage:
+        user_search_cache.init_app(app)
+        rows = user_search_cache.get(key, loader)
+        user_search_cache.clear()
+    """
+
+    config_prefix = 'USER_SEARCH_CACHE'
+    extension_name = 'user_search_cache'
+    default_ttl = 30
+    default_size = 1024
+
+
+def _prefix_match(column, prefix: str, dialect: str):
+    if dialect == 'postgresql':
+        return column.startswith(prefix, autoescape=True)
+    return and_(column >= prefix, column < prefix + PREFIX_END)
+
+
+def _load_page(prefix: str, after: Optional[Tuple[str, int]], size: int) -> List[DirectoryEntry]:
+    from app.extensions import db
+    from app.models import User
+
+    dialect = db.session.get_bind().dialect.name
+    query = select(
+        User.id, User.username, User.first_name, User.last_name, User.username_search
+    ).where(
+        User.is_active.isnot(False),
+        or_(
+            _prefix_match(User.username_search, prefix, dialect),
+            _prefix_match(User.name_search, prefix, dialect)
+        )
+    )
+    if after is not None:
+        query = query.where(tuple_(User.username_search, User.id) > tuple_(*after))
+    rows = db.session.execute(query.order_by(User.username_search, User.id).limit(size)).all()
+    return [DirectoryEntry(*row) for row in rows]
+
+
+def search_users(query: str, limit: int = DEFAULT_LIMIT, cursor: Optional[str] = None,
+                 exclude_user_id: Optional[int] = None):
+    """
+    One page of users whose username or name starts with query.
+
+    Returns (entries, next_cursor); next_cursor is None on the last page.
+    Raises ValueError for an empty query or a malformed cursor.
+    """
+    from app.extensions import user_search_cache
+
+    prefix = fold(query)[:MAX_QUERY_LENGTH]
+    if not prefix:
+        raise ValueError('Search query is required')
+    limit = min(max(int(limit or DEFAULT_LIMIT), 1), MAX_LIMIT)
+    after = decode_cursor(cursor) if cursor else None
+
+    # Pages are shared by all callers, so fetch one spare row for the caller
+    # (dropped below) and one to tell whether another page follows
+    rows = user_search_cache.get(
+        (prefix, after, limit),
+        lambda key: _load_page(prefix, after, limit + 2)
+    )
+    rows = [row for row in rows if row.id != exclude_user_id]
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1]) if len(rows) > limit else None
+    return page, next_cursor
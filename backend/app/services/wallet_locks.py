@@ -0,0 +1,30 @@
+"""
+Wallet row locks for the batch jobs and settlements.
+"""
+from typing import Dict, Iterable
+
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import Wallet
+
+
+def lock_wallets(user_ids: Iterable[int]) -> Dict[int, object]:
+    """
+    Lock the users' wallets and return user_id -> (user_id, balance, is_frozen) as locked.
+
+    Locks are always taken in user_id order, so jobs and transfers locking
+    overlapping wallets can't deadlock, and balances read here can't change
+    before the caller's commit. FOR UPDATE is a no-op on SQLite, whose write
+    transactions are serialised anyway.
+    """
+    wallets = Wallet.__table__
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return {}
+    rows = db.session.execute(
+        select(wallets.c.user_id, wallets.c.balance, wallets.c.is_frozen)
+        .where(wallets.c.user_id.in_(user_ids))
+        .order_by(wallets.c.user_id).with_for_update()
+    )
+    return {row.user_id: row for row in rows}
@@ -0,0 +1,31 @@
+"""
+Opaque keyset cursors for paginated lists.
+
+A cursor is the sort key of the last row on a page (e.g. [created_at, id]),
+JSON-encoded and base64url'd without padding. Callers convert the decoded
+values back to their own types.
+
+Usage:
+    next_cursor = encode_cursor([row.created_at.isoformat(), row.id])
+    created_at, listing_id = decode_cursor(cursor, 2)
+"""
+import base64
+import json
+from typing import Any, List, Sequence
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values)).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """The size values packed into cursor; ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (TypeError, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('Invalid cursor')
+    return values
@@ -255,6 +255,7 @@ class MarketplaceListingSchema(Schema):
     description = fields.Str(required=True)
     price = fields.Float(required=True)
     category = fields.Str(required=True)
+    images = fields.List(fields.Str(), required=False)  # base64 data URIs, checked by validate_base64_image
     
     @validates('title')
     def validate_title(self, value, **kwargs):
@@ -292,6 +293,9 @@ class LoanRequestSchema(Schema):
     amount = fields.Float(required=True)
     reason = fields.Str(required=True)
     repayment_date = fields.DateTime(required=False, allow_none=True)
+    lender_username = fields.Str(required=False)
+    instalments = fields.Int(required=False, allow_none=True)
+    instalment_frequency = fields.Str(required=False)
     
     @validates('amount')
     def validate_amount_field(self, value, **kwargs):
@@ -310,3 +314,15 @@ class LoanRequestSchema(Schema):
             raise ValidationError("Reason is required")
         if len(sanitized) > 500:
             raise ValidationError("Reason too long (max 500 characters)")
+    
+    @validates('instalments')
+    def validate_instalments(self, value, **kwargs):
+        from app.services.loan_instalments import MAX_INSTALMENTS
+        if value is not None and not 2 <= value <= MAX_INSTALMENTS:
+            raise ValidationError(f"Instalments must be between 2 and {MAX_INSTALMENTS}")
+    
+    @validates('instalment_frequency')
+    def validate_instalment_frequency(self, value, **kwargs):
+        from app.services.loan_instalments import FREQUENCIES
+        if value not in FREQUENCIES:
+            raise ValidationError(f"Instalment frequency must be one of: {', '.join(FREQUENCIES)}")
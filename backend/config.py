@@ -15,6 +15,27 @@ class Config:
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
     
+    # Revoked-token deny-list: 'memory' (single process) or 'sqlite' (shared by workers on one host)
+    TOKEN_BLOCKLIST_BACKEND = os.environ.get('TOKEN_BLOCKLIST_BACKEND') or 'sqlite'
+    TOKEN_BLOCKLIST_PATH = os.environ.get('TOKEN_BLOCKLIST_PATH')
+    TOKEN_BLOCKLIST_SYNC_INTERVAL = 5
+    
+    # Card authorisation cache for /pay (seconds until other workers see a freeze/unfreeze)
+    CARD_AUTH_CACHE_TTL = 10
+    CARD_AUTH_CACHE_SIZE = 10000
+    
+    # User directory search cache (seconds until other workers see a new user or rename)
+    USER_SEARCH_CACHE_TTL = 30
+    USER_SEARCH_CACHE_SIZE = 1024
+    
+    # Seller profiles on marketplace listings (seconds until other workers see a profile edit)
+    SELLER_PROFILE_CACHE_TTL = 60
+    SELLER_PROFILE_CACHE_SIZE = 10000
+    
+    # Key for deriving card IBANs - required, and never rotated: a new key
+    # permutes new card ids onto IBANs that may already be stored
+    IBAN_HASH_KEY = os.environ.get('IBAN_HASH_KEY')
+    
     CORS_ORIGINS = ['http://localhost:5000', 'http://0.0.0.0:5000', 'http://localhost:5001', 'http://0.0.0.0:5001']
     
     SOCKETIO_CORS_ALLOWED_ORIGINS = '*'
@@ -25,20 +46,31 @@ class Config:
     MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
     
+    RATELIMIT_STORAGE_URI = os.environ.get('RATELIMIT_STORAGE_URI') or 'memory://'
+    
     UPLOAD_FOLDER = 'uploads'
+    # Marketplace image files (content-addressed); defaults to <instance>/images
+    IMAGE_STORE_PATH = os.environ.get('IMAGE_STORE_PATH')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024
 
 class DevelopmentConfig(Config):
     DEBUG = True
     TESTING = False
+    IBAN_HASH_KEY = os.environ.get('IBAN_HASH_KEY') or 'dev-iban-hash-key-change-in-production'
 
 class ProductionConfig(Config):
     DEBUG = False
     TESTING = False
+    # Counters shared by all worker processes on the host, fixed windows with
+    # interpolation of the previous window (two counters per key)
+    RATELIMIT_STORAGE_URI = os.environ.get('RATELIMIT_STORAGE_URI') or 'sqlite:///instance/ratelimit.db'
+    RATELIMIT_STRATEGY = 'sliding-window-counter'
 
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///test.db'
+    TOKEN_BLOCKLIST_BACKEND = 'memory'
+    IBAN_HASH_KEY = 'test-iban-hash-key'
 
 config = {
     'development': DevelopmentConfig,
@@ -0,0 +1,30 @@
+"""Add card_number_sequences table for preallocated card numbers
+
+Revision ID: 3f1c2a7d9e10
+Revises: 748f170551f2
+Create Date: 2026-10-19 09:12:44.118203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a7d9e10'
+down_revision = '748f170551f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('card_number_sequences',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('next_value', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.execute("INSERT INTO card_number_sequences (name, next_value) VALUES ('virtual_card_number', 0)")
+
+
+def downgrade():
+    op.drop_table('card_number_sequences')
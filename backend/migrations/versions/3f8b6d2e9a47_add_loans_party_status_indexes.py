@@ -0,0 +1,32 @@
+"""Replace loans lender_id/borrower_id indexes with (party, status) indexes
+
+Revision ID: 3f8b6d2e9a47
+Revises: 9c4a7e1b3d56
+Create Date: 2026-10-19 20:41:52.630915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f8b6d2e9a47'
+down_revision = '9c4a7e1b3d56'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('loans', schema=None) as batch_op:
+        batch_op.create_index('ix_loans_lender_status', ['lender_id', 'status'], unique=False)
+        batch_op.create_index('ix_loans_borrower_status', ['borrower_id', 'status'], unique=False)
+        batch_op.drop_index(batch_op.f('ix_loans_lender_id'))
+        batch_op.drop_index(batch_op.f('ix_loans_borrower_id'))
+
+
+def downgrade():
+    with op.batch_alter_table('loans', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_loans_borrower_id'), ['borrower_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_loans_lender_id'), ['lender_id'], unique=False)
+        batch_op.drop_index('ix_loans_borrower_status')
+        batch_op.drop_index('ix_loans_lender_status')
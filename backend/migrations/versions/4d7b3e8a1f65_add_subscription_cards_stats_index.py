@@ -0,0 +1,26 @@
+"""Add (user_id, status, next_billing_date) index on subscription_cards
+
+Revision ID: 4d7b3e8a1f65
+Revises: e2a94f6b0c38
+Create Date: 2026-10-19 16:02:13.488071
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4d7b3e8a1f65'
+down_revision = 'e2a94f6b0c38'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('subscription_cards', schema=None) as batch_op:
+        batch_op.create_index('ix_subscription_cards_user_status_billing', ['user_id', 'status', 'next_billing_date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('subscription_cards', schema=None) as batch_op:
+        batch_op.drop_index('ix_subscription_cards_user_status_billing')
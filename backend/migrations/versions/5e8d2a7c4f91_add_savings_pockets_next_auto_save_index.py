@@ -0,0 +1,26 @@
+"""Index savings_pockets.next_auto_save_date for the auto-save sweep
+
+Revision ID: 5e8d2a7c4f91
+Revises: b61f4c0e8d23
+Create Date: 2026-10-19 19:12:40.558213
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8d2a7c4f91'
+down_revision = 'b61f4c0e8d23'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('savings_pockets', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_savings_pockets_next_auto_save_date'), ['next_auto_save_date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('savings_pockets', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_savings_pockets_next_auto_save_date'))
@@ -0,0 +1,158 @@
+"""Add recurring_series and transactions.series_id / occurrence_date
+
+Upcoming subscription billings are now expanded from the subscription's own
+rule, so the materialised 'scheduled' subscription_payment rows are removed.
+
+Existing recurring expected payments get a RecurringSeries each (same fields
+as series_for_payment), with the payment as its first occurrence. Copies made
+by the old generate-recurring endpoint that fall on a series' dates are
+linked to it as persisted occurrences, so they aren't shown twice next to
+the virtual ones; repeated scheduled copies of the same date are deleted.
+
+Revision ID: 7a3c9e5d2b18
+Revises: 4d7b3e8a1f65
+Create Date: 2026-10-19 17:24:51.630912
+
+"""
+from datetime import datetime
+from decimal import Decimal
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a3c9e5d2b18'
+down_revision = '4d7b3e8a1f65'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade():
+    op.create_table('recurring_series',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('currency', sa.String(length=3), nullable=True),
+    sa.Column('transaction_type', sa.String(length=50), nullable=True),
+    sa.Column('transaction_source', sa.String(length=20), nullable=True),
+    sa.Column('category', sa.String(length=50), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('frequency', sa.String(length=20), nullable=False),
+    sa.Column('interval', sa.Integer(), nullable=False),
+    sa.Column('start_date', sa.Date(), nullable=False),
+    sa.Column('until_date', sa.Date(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('recurring_series', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_recurring_series_user_id'), ['user_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_recurring_series_is_active'), ['is_active'], unique=False)
+
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('series_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('occurrence_date', sa.Date(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_transactions_series_id'), ['series_id'], unique=False)
+        batch_op.create_foreign_key('fk_transactions_series_id', 'recurring_series', ['series_id'], ['id'])
+
+    op.execute(
+        "DELETE FROM transactions "
+        "WHERE status = 'scheduled' AND transaction_type = 'subscription_payment'"
+    )
+
+    _backfill_series(op.get_bind())
+
+
+def _backfill_series(conn):
+    """Series for recurring expected payments, scanning transactions in id-ordered batches."""
+    from app.services.recurrence import expand, series_values
+
+    transactions = sa.table(
+        'transactions',
+        sa.column('id', sa.Integer), sa.column('user_id', sa.Integer),
+        sa.column('transaction_type', sa.String), sa.column('transaction_source', sa.String),
+        sa.column('amount', sa.Numeric), sa.column('status', sa.String), sa.column('description', sa.String),
+        sa.column('transaction_metadata', sa.JSON), sa.column('created_at', sa.DateTime),
+        sa.column('series_id', sa.Integer), sa.column('occurrence_date', sa.Date)
+    )
+    series_table = sa.table(
+        'recurring_series',
+        sa.column('id', sa.Integer), sa.column('user_id', sa.Integer), sa.column('title', sa.String),
+        sa.column('amount', sa.Numeric), sa.column('currency', sa.String),
+        sa.column('transaction_type', sa.String), sa.column('transaction_source', sa.String),
+        sa.column('category', sa.String), sa.column('notes', sa.Text), sa.column('frequency', sa.String),
+        sa.column('interval', sa.Integer), sa.column('start_date', sa.Date), sa.column('is_active', sa.Boolean),
+        sa.column('created_at', sa.DateTime), sa.column('updated_at', sa.DateTime)
+    )
+
+    now = datetime.utcnow()
+    # (user, title, amount, type, frequency) -> [(series id, start date)]; base payments precede their copies
+    rules, taken = {}, set()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(transactions)
+            .where(transactions.c.id > last_id, transactions.c.transaction_metadata.isnot(None))
+            .order_by(transactions.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        links, stale = [], []
+        for row in rows:
+            if (row.transaction_metadata or {}).get('source') != 'USER_EXPECTED_PAYMENT' or row.created_at is None:
+                continue
+            values = series_values(row)
+            if values is None:
+                continue
+            when = values['start_date']
+            key = (row.user_id, values['title'], Decimal(str(values['amount'])), values['transaction_type'],
+                   values['frequency'])
+            series_id = next((
+                candidate for candidate, start in rules.get(key, ())
+                if expand(start, values['frequency'], when, when) == [when]
+            ), None)
+
+            if series_id is None:
+                series_id = conn.execute(series_table.insert().values(
+                    user_id=row.user_id, currency='USD', interval=1, created_at=now, updated_at=now, **values
+                ).returning(series_table.c.id)).scalar_one()
+                rules.setdefault(key, []).append((series_id, when))
+            elif (series_id, when) in taken:
+                if row.status == 'scheduled':
+                    stale.append(row.id)
+                continue
+            taken.add((series_id, when))
+            links.append({'row_id': row.id, 'link_series_id': series_id, 'link_date': when})
+
+        if links:
+            conn.execute(
+                transactions.update().where(transactions.c.id == sa.bindparam('row_id'))
+                .values(series_id=sa.bindparam('link_series_id'),
+                        occurrence_date=sa.bindparam('link_date', type_=sa.Date)),
+                links
+            )
+        if stale:
+            conn.execute(transactions.delete().where(transactions.c.id.in_(stale)))
+
+
+def downgrade():
+    # The deleted scheduled subscription rows and duplicate copies are not recreated
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_transactions_series_id', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_transactions_series_id'))
+        batch_op.drop_column('occurrence_date')
+        batch_op.drop_column('series_id')
+
+    with op.batch_alter_table('recurring_series', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_recurring_series_is_active'))
+        batch_op.drop_index(batch_op.f('ix_recurring_series_user_id'))
+
+    op.drop_table('recurring_series')
@@ -0,0 +1,59 @@
+"""Store a keyed-hash IBAN on each virtual card
+
+Revision ID: 8b4e6d2c1a57
+Revises: 3f1c2a7d9e10
+Create Date: 2026-10-19 11:03:27.540912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from flask import current_app
+
+from app.services.iban import derive_iban, legacy_iban
+
+
+# revision identifiers, used by Alembic.
+revision = '8b4e6d2c1a57'
+down_revision = '3f1c2a7d9e10'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade():
+    with op.batch_alter_table('virtual_cards', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('iban', sa.String(length=34), nullable=True))
+
+    # Backfill existing cards in id-ordered batches with the IBAN they were
+    # already shown, so shared IBANs keep resolving. The old generator could
+    # repeat a value; later repeats get a derived IBAN instead.
+    key = current_app.config['IBAN_HASH_KEY']
+    seen = set()
+    conn = op.get_bind()
+    cards = sa.table('virtual_cards', sa.column('id', sa.Integer), sa.column('iban', sa.String))
+    last_id = 0
+    while True:
+        ids = [row[0] for row in conn.execute(
+            sa.select(cards.c.id).where(cards.c.id > last_id).order_by(cards.c.id).limit(BATCH_SIZE)
+        )]
+        if not ids:
+            break
+        params = []
+        for card_id in ids:
+            iban = legacy_iban(card_id)
+            if iban in seen:
+                iban = derive_iban(card_id, key)
+            seen.add(iban)
+            params.append({'card_id': card_id, 'iban': iban})
+        conn.execute(cards.update().where(cards.c.id == sa.bindparam('card_id')), params)
+        last_id = ids[-1]
+
+    with op.batch_alter_table('virtual_cards', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_virtual_cards_iban'), ['iban'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('virtual_cards', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_virtual_cards_iban'))
+        batch_op.drop_column('iban')
@@ -0,0 +1,53 @@
+"""Add round_up_entries and wallet round-up settings
+
+Revision ID: 9c4a7e1b3d56
+Revises: 5e8d2a7c4f91
+Create Date: 2026-10-19 20:03:18.220417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c4a7e1b3d56'
+down_revision = '5e8d2a7c4f91'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('round_up_entries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('pocket_id', sa.Integer(), nullable=False),
+    sa.Column('source', sa.String(length=30), nullable=False),
+    sa.Column('payment_amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('settlement_token', sa.String(length=32), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['pocket_id'], ['savings_pockets.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('round_up_entries', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_round_up_entries_user_id'), ['user_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_round_up_entries_settlement_token'), ['settlement_token'], unique=False)
+
+    with op.batch_alter_table('wallets', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('round_up_pocket_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('round_up_unit', sa.Numeric(precision=10, scale=2), nullable=True))
+        batch_op.create_foreign_key('fk_wallets_round_up_pocket_id', 'savings_pockets', ['round_up_pocket_id'], ['id'], ondelete='SET NULL')
+
+
+def downgrade():
+    with op.batch_alter_table('wallets', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_wallets_round_up_pocket_id', type_='foreignkey')
+        batch_op.drop_column('round_up_unit')
+        batch_op.drop_column('round_up_pocket_id')
+
+    with op.batch_alter_table('round_up_entries', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_round_up_entries_settlement_token'))
+        batch_op.drop_index(batch_op.f('ix_round_up_entries_user_id'))
+
+    op.drop_table('round_up_entries')
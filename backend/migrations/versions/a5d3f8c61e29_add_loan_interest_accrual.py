@@ -0,0 +1,41 @@
+"""Add loan interest accrual columns
+
+Revision ID: a5d3f8c61e29
+Revises: e4b19c7d5a26
+Create Date: 2026-10-19 22:10:26.781345
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a5d3f8c61e29'
+down_revision = 'e4b19c7d5a26'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('loans', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('accrued_interest', sa.Numeric(precision=12, scale=4), nullable=True))
+        batch_op.add_column(sa.Column('interest_repaid', sa.Numeric(precision=12, scale=4), nullable=True))
+        batch_op.add_column(sa.Column('interest_accrued_through', sa.Date(), nullable=True))
+
+    with op.batch_alter_table('loan_repayments', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('interest_amount', sa.Numeric(precision=10, scale=2), nullable=True))
+
+    # Interest on loans that are already active starts accruing from the upgrade
+    op.execute("UPDATE loans SET accrued_interest = 0, interest_repaid = 0")
+    op.execute("UPDATE loans SET interest_accrued_through = CURRENT_DATE WHERE status = 'active'")
+    op.execute("UPDATE loan_repayments SET interest_amount = 0")
+
+
+def downgrade():
+    with op.batch_alter_table('loan_repayments', schema=None) as batch_op:
+        batch_op.drop_column('interest_amount')
+
+    with op.batch_alter_table('loans', schema=None) as batch_op:
+        batch_op.drop_column('interest_accrued_through')
+        batch_op.drop_column('interest_repaid')
+        batch_op.drop_column('accrued_interest')
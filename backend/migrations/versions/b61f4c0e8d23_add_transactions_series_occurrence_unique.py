@@ -0,0 +1,26 @@
+"""Add unique (user_id, series_id, occurrence_date) on transactions
+
+Revision ID: b61f4c0e8d23
+Revises: 7a3c9e5d2b18
+Create Date: 2026-10-19 18:05:37.914260
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b61f4c0e8d23'
+down_revision = '7a3c9e5d2b18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_transactions_series_occurrence', ['user_id', 'series_id', 'occurrence_date'])
+
+
+def downgrade():
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_transactions_series_occurrence', type_='unique')
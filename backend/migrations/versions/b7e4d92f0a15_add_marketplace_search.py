@@ -0,0 +1,84 @@
+"""Add marketplace search: open-listing partial indexes, full-text index, facet counters
+
+The partial (created_at, id) indexes on open listings replace the boolean
+is_available / is_sold indexes, which nothing could use selectively.
+PostgreSQL gets a GIN index on the listing text; SQLite gets an FTS5 table
+kept in step by triggers (same DDL as app/models/marketplace.py).
+
+Revision ID: b7e4d92f0a15
+Revises: f3a7c1e86b24
+Create Date: 2026-10-20 00:24:51.906337
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e4d92f0a15'
+down_revision = 'f3a7c1e86b24'
+branch_labels = None
+depends_on = None
+
+OPEN_LISTINGS_PG = sa.text('is_available = true AND is_sold = false')
+OPEN_LISTINGS_SQLITE = sa.text('is_available = 1 AND is_sold = 0')
+SEARCH_DOCUMENT = ("to_tsvector('simple', (((coalesce(title, '') || ' ') || coalesce(description, '')) || ' ') "
+                   "|| coalesce(course, ''))")
+
+
+def upgrade():
+    from app.models.marketplace import SQLITE_FTS_DDL
+
+    op.create_table('marketplace_facet_counts',
+    sa.Column('facet', sa.String(length=20), nullable=False),
+    sa.Column('value', sa.String(length=100), nullable=False),
+    sa.Column('listing_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('facet', 'value')
+    )
+
+    with op.batch_alter_table('marketplace_listings', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_marketplace_listings_is_available'))
+        batch_op.drop_index(batch_op.f('ix_marketplace_listings_is_sold'))
+        for name, columns in (
+            ('ix_marketplace_listings_open_created', ['created_at', 'id']),
+            ('ix_marketplace_listings_open_category', ['category', 'created_at', 'id']),
+            ('ix_marketplace_listings_open_university', ['university', 'created_at', 'id']),
+        ):
+            batch_op.create_index(name, columns, unique=False,
+                                  postgresql_where=OPEN_LISTINGS_PG, sqlite_where=OPEN_LISTINGS_SQLITE)
+
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute(f'CREATE INDEX ix_marketplace_listings_fts ON marketplace_listings USING gin ({SEARCH_DOCUMENT})')
+    elif dialect == 'sqlite':
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
+        op.execute("INSERT INTO marketplace_listings_fts(marketplace_listings_fts) VALUES ('rebuild')")
+
+    # Seed the counters from the open listings
+    for facet in ('category', 'university', 'condition'):
+        op.execute(
+            f"INSERT INTO marketplace_facet_counts (facet, value, listing_count) "
+            f"SELECT '{facet}', {facet}, count(*) FROM marketplace_listings "
+            f"WHERE is_available IS NOT false AND is_sold IS NOT true AND {facet} IS NOT NULL AND {facet} != '' "
+            f"GROUP BY {facet}"
+        )
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute('DROP INDEX ix_marketplace_listings_fts')
+    elif dialect == 'sqlite':
+        for trigger in ('ai', 'ad', 'au'):
+            op.execute(f'DROP TRIGGER IF EXISTS marketplace_listings_fts_{trigger}')
+        op.execute('DROP TABLE IF EXISTS marketplace_listings_fts')
+
+    with op.batch_alter_table('marketplace_listings', schema=None) as batch_op:
+        batch_op.drop_index('ix_marketplace_listings_open_university')
+        batch_op.drop_index('ix_marketplace_listings_open_category')
+        batch_op.drop_index('ix_marketplace_listings_open_created')
+        batch_op.create_index(batch_op.f('ix_marketplace_listings_is_sold'), ['is_sold'], unique=False)
+        batch_op.create_index(batch_op.f('ix_marketplace_listings_is_available'), ['is_available'], unique=False)
+
+    op.drop_table('marketplace_facet_counts')
@@ -0,0 +1,38 @@
+"""Add seller_id to marketplace orders for seller order history
+
+Revision ID: c41e8a7d92b6
+Revises: b7e4d92f0a15
+Create Date: 2026-10-20 01:12:08.553417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41e8a7d92b6'
+down_revision = 'b7e4d92f0a15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('marketplace_orders', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('seller_id', sa.Integer(), nullable=True))
+
+    op.execute(
+        'UPDATE marketplace_orders SET seller_id = ('
+        'SELECT seller_id FROM marketplace_listings WHERE marketplace_listings.id = marketplace_orders.listing_id)'
+    )
+
+    with op.batch_alter_table('marketplace_orders', schema=None) as batch_op:
+        batch_op.alter_column('seller_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key('fk_marketplace_orders_seller_id', 'users', ['seller_id'], ['id'])
+        batch_op.create_index('ix_marketplace_orders_seller_id', ['seller_id', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('marketplace_orders', schema=None) as batch_op:
+        batch_op.drop_index('ix_marketplace_orders_seller_id')
+        batch_op.drop_constraint('fk_marketplace_orders_seller_id', type_='foreignkey')
+        batch_op.drop_column('seller_id')
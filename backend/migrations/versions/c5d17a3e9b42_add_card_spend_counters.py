@@ -0,0 +1,41 @@
+"""Add card_spend_counters and virtual_cards.daily_limit
+
+Revision ID: c5d17a3e9b42
+Revises: 8b4e6d2c1a57
+Create Date: 2026-10-19 13:41:09.271554
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5d17a3e9b42'
+down_revision = '8b4e6d2c1a57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('card_spend_counters',
+    sa.Column('card_id', sa.Integer(), nullable=False),
+    sa.Column('period', sa.String(length=10), nullable=False),
+    sa.Column('window_start', sa.Date(), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['card_id'], ['virtual_cards.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('card_id', 'period')
+    )
+    with op.batch_alter_table('virtual_cards', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('daily_limit', sa.Numeric(precision=10, scale=2), nullable=True))
+
+    # Seed counters from this month's card payments so limits hold from the first request
+    from app.services.spend_counters import rebuild_counters
+    rebuild_counters(bind=op.get_bind())
+
+
+def downgrade():
+    with op.batch_alter_table('virtual_cards', schema=None) as batch_op:
+        batch_op.drop_column('daily_limit')
+
+    op.drop_table('card_spend_counters')
@@ -0,0 +1,70 @@
+"""Add case-folded username/name search columns to users
+
+Revision ID: c7e2a94d1b80
+Revises: 3f8b6d2e9a47
+Create Date: 2026-10-19 21:05:37.914206
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.user_directory import fold, full_name_key
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e2a94d1b80'
+down_revision = '3f8b6d2e9a47'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('username_search', sa.String(length=80), nullable=True))
+        batch_op.add_column(sa.Column('name_search', sa.String(length=101), nullable=True))
+
+    # Backfill existing users in id-ordered batches with the same folding as the
+    # User model listener, which keeps new and renamed users in sync
+    conn = op.get_bind()
+    users = sa.table(
+        'users',
+        sa.column('id', sa.Integer), sa.column('username', sa.String), sa.column('first_name', sa.String),
+        sa.column('last_name', sa.String), sa.column('username_search', sa.String),
+        sa.column('name_search', sa.String)
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(users.c.id, users.c.username, users.c.first_name, users.c.last_name)
+            .where(users.c.id > last_id).order_by(users.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            users.update().where(users.c.id == sa.bindparam('user_id')),
+            [
+                {
+                    'user_id': row.id,
+                    'username_search': fold(row.username),
+                    'name_search': full_name_key(row.first_name, row.last_name)
+                }
+                for row in rows
+            ]
+        )
+        last_id = rows[-1].id
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_username_search', ['username_search'], unique=False,
+                              postgresql_ops={'username_search': 'text_pattern_ops'})
+        batch_op.create_index('ix_users_name_search', ['name_search'], unique=False,
+                              postgresql_ops={'name_search': 'text_pattern_ops'})
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_name_search')
+        batch_op.drop_index('ix_users_username_search')
+        batch_op.drop_column('name_search')
+        batch_op.drop_column('username_search')
@@ -0,0 +1,54 @@
+"""Add loan instalment plans
+
+Revision ID: d8f2b5a91c37
+Revises: a5d3f8c61e29
+Create Date: 2026-10-19 23:02:47.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8f2b5a91c37'
+down_revision = 'a5d3f8c61e29'
+branch_labels = None
+depends_on = None
+
+SCHEDULED = sa.text("status = 'scheduled'")
+
+
+def upgrade():
+    op.create_table('loan_instalments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('loan_id', sa.Integer(), nullable=False),
+    sa.Column('sequence', sa.SmallInteger(), nullable=False),
+    sa.Column('due_date', sa.Date(), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('amount_paid', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('status', sa.String(length=10), nullable=True),
+    sa.Column('attempts', sa.SmallInteger(), nullable=True),
+    sa.Column('last_attempt_on', sa.Date(), nullable=True),
+    sa.Column('paid_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['loan_id'], ['loans.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('loan_id', 'sequence', name='uq_loan_instalments_loan_sequence')
+    )
+    with op.batch_alter_table('loan_instalments', schema=None) as batch_op:
+        batch_op.create_index('ix_loan_instalments_scheduled_due', ['due_date', 'id'], unique=False,
+                              postgresql_where=SCHEDULED, sqlite_where=SCHEDULED)
+
+    with op.batch_alter_table('loans', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('instalment_count', sa.SmallInteger(), nullable=True))
+        batch_op.add_column(sa.Column('instalment_frequency', sa.String(length=10), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('loans', schema=None) as batch_op:
+        batch_op.drop_column('instalment_frequency')
+        batch_op.drop_column('instalment_count')
+
+    with op.batch_alter_table('loan_instalments', schema=None) as batch_op:
+        batch_op.drop_index('ix_loan_instalments_scheduled_due')
+
+    op.drop_table('loan_instalments')
@@ -0,0 +1,44 @@
+"""Add batch biller state to subscriptions and subscription_cards
+
+Revision ID: e2a94f6b0c38
+Revises: c5d17a3e9b42
+Create Date: 2026-10-19 15:20:47.903318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a94f6b0c38'
+down_revision = 'c5d17a3e9b42'
+branch_labels = None
+depends_on = None
+
+TABLES = ('subscription_cards', 'subscriptions')
+
+
+def upgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('billing_anchor_day', sa.SmallInteger(), nullable=True))
+            batch_op.add_column(sa.Column('billing_failures', sa.Integer(), nullable=False, server_default='0'))
+            batch_op.add_column(sa.Column('billing_retry_at', sa.DateTime(), nullable=True))
+            batch_op.add_column(sa.Column('billing_last_error', sa.String(length=255), nullable=True))
+            batch_op.add_column(sa.Column('billing_claim_token', sa.String(length=32), nullable=True))
+            batch_op.add_column(sa.Column('billing_claimed_at', sa.DateTime(), nullable=True))
+            batch_op.create_index(batch_op.f(f'ix_{table}_billing_claim_token'), ['billing_claim_token'], unique=False)
+            batch_op.create_index(batch_op.f(f'ix_{table}_next_billing_date'), ['next_billing_date'], unique=False)
+
+
+def downgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(batch_op.f(f'ix_{table}_next_billing_date'))
+            batch_op.drop_index(batch_op.f(f'ix_{table}_billing_claim_token'))
+            batch_op.drop_column('billing_claimed_at')
+            batch_op.drop_column('billing_claim_token')
+            batch_op.drop_column('billing_last_error')
+            batch_op.drop_column('billing_retry_at')
+            batch_op.drop_column('billing_failures')
+            batch_op.drop_column('billing_anchor_day')
@@ -0,0 +1,59 @@
+"""Add notifications, loan overdue flags and open-loan due_date partial index
+
+The partial index replaces ix_loans_status: per-party lookups use the
+(party, status) indexes and nothing else filters on status alone.
+
+Revision ID: e4b19c7d5a26
+Revises: c7e2a94d1b80
+Create Date: 2026-10-19 21:38:04.552193
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b19c7d5a26'
+down_revision = 'c7e2a94d1b80'
+branch_labels = None
+depends_on = None
+
+OPEN_LOANS = sa.text("status = 'active' AND is_fully_repaid = false")
+
+
+def upgrade():
+    op.create_table('notifications',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('notification_type', sa.String(length=30), nullable=False),
+    sa.Column('title', sa.String(length=120), nullable=False),
+    sa.Column('message', sa.String(length=255), nullable=False),
+    sa.Column('notification_metadata', sa.JSON(), nullable=True),
+    sa.Column('is_read', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('read_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.create_index('ix_notifications_user_created', ['user_id', 'created_at'], unique=False)
+
+    with op.batch_alter_table('loans', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('overdue_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('last_reminder_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_loans_open_due_date', ['due_date'], unique=False,
+                              postgresql_where=OPEN_LOANS, sqlite_where=OPEN_LOANS)
+        batch_op.drop_index(batch_op.f('ix_loans_status'))
+
+
+def downgrade():
+    with op.batch_alter_table('loans', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_loans_status'), ['status'], unique=False)
+        batch_op.drop_index('ix_loans_open_due_date')
+        batch_op.drop_column('last_reminder_at')
+        batch_op.drop_column('overdue_at')
+
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.drop_index('ix_notifications_user_created')
+
+    op.drop_table('notifications')
@@ -0,0 +1,99 @@
+"""Move marketplace listing images out of the JSON column into the image store
+
+Each base64 image in marketplace_listings.images is written to the
+content-addressed image store (IMAGE_STORE_PATH) and replaced by its file
+name. Listings are rewritten in batches by id; entries that are already file
+names are left alone, so the upgrade can be re-run after an interruption.
+
+Revision ID: f3a7c1e86b24
+Revises: d8f2b5a91c37
+Create Date: 2026-10-19 23:41:09.582716
+
+"""
+import base64
+
+from alembic import op
+import sqlalchemy as sa
+from flask import current_app
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a7c1e86b24'
+down_revision = 'd8f2b5a91c37'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 200
+
+listings = sa.table(
+    'marketplace_listings',
+    sa.column('id', sa.Integer),
+    sa.column('images', sa.JSON)
+)
+
+
+def _rewrite_images(convert):
+    """Apply convert to every listing's image list, BATCH_SIZE rows at a time."""
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(listings.c.id, listings.c.images)
+            .where(listings.c.id > last_id, listings.c.images.isnot(None))
+            .order_by(listings.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        updates = []
+        for listing_id, images in rows:
+            converted = convert(images or [])
+            if converted != images:
+                updates.append({'listing_id': listing_id, 'new_images': converted})
+        if updates:
+            connection.execute(
+                listings.update()
+                .where(listings.c.id == sa.bindparam('listing_id'))
+                .values(images=sa.bindparam('new_images', type_=sa.JSON)),
+                updates
+            )
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    from app.services.image_store import ImageStore, is_image_name
+
+    store = ImageStore(current_app)
+
+    def extract(images):
+        names = []
+        for image in images:
+            if is_image_name(image):
+                names.append(image)
+                continue
+            try:
+                names.append(store.put_data_uri(image))
+            except (AttributeError, TypeError, ValueError):
+                current_app.logger.warning('Dropping an unreadable marketplace listing image')
+        return list(dict.fromkeys(names))
+
+    _rewrite_images(extract)
+
+
+def downgrade():
+    from app.services.image_store import MIMETYPES, ImageStore, is_image_name
+
+    store = ImageStore(current_app)
+
+    def inline(images):
+        data_uris = []
+        for image in images:
+            if not is_image_name(image):
+                data_uris.append(image)
+                continue
+            encoded = base64.b64encode(store.read(image)).decode()
+            data_uris.append(f"data:{MIMETYPES[image.rsplit('.', 1)[1]]};base64,{encoded}")
+        return data_uris
+
+    # Files stay in the store; they are only read back
+    _rewrite_images(inline)
@@ -0,0 +1,37 @@
+"""
+Daily loan interest accrual.
+
+Adds the simple interest each active loan has earned since its last accrual
+to loans.accrued_interest. Safe to run repeatedly (e.g. daily from cron);
+loans already accrued through today are skipped and missed days are caught up.
+
+Usage:
+    cd backend && python scripts/accrue_loan_interest.py [chunk_size]
+"""
+
+import sys
+import os
+import time
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.services.loan_interest import DEFAULT_CHUNK_SIZE, accrue_interest
+
+
+def main():
+    chunk_size = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CHUNK_SIZE
+    app = create_app()
+
+    with app.app_context():
+        start = time.perf_counter()
+        summary = accrue_interest(chunk_size=chunk_size)
+        elapsed = time.perf_counter() - start
+
+    print(f"Accrued interest on {summary['loans']} loans in {summary['chunks']} chunks ({elapsed:.2f}s)")
+    print(f"  Interest accrued: ${summary['interest_accrued']:.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark rate limiter overhead per request.
+
+Measures the cost of one sliding-window-counter hit against each storage
+backend, and the end-to-end overhead the limiter adds to a cheap request
+(/api/health) through the Flask test client.
+
+Usage:
+    cd backend && python scripts/benchmark_rate_limiter.py [iterations]
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from limits import RateLimitItemPerMinute
+from limits.storage import storage_from_string
+from limits.strategies import SlidingWindowCounterRateLimiter
+from app import create_app
+from app.extensions import limiter
+import app.services.rate_limit  # noqa: F401 - registers sqlite:// storage
+
+
+def time_per_call(fn, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(i)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def benchmark_storages(iterations):
+    item = RateLimitItemPerMinute(10 ** 9)
+    with tempfile.TemporaryDirectory() as tmp:
+        storages = {
+            'memory://': storage_from_string('memory://'),
+            'sqlite (WAL)': storage_from_string(f'sqlite:///{tmp}/bench.db'),
+        }
+        print(f"Sliding-window-counter hit, {iterations} iterations, 100 distinct users")
+        for name, storage in storages.items():
+            strategy = SlidingWindowCounterRateLimiter(storage)
+            us = time_per_call(lambda i: strategy.hit(item, f'user:{i % 100}'), iterations)
+            print(f"  {name:<14} {us:8.1f} µs/hit")
+
+
+def benchmark_requests(iterations):
+    app = create_app()
+    app.config['TESTING'] = True
+    client = app.test_client()
+
+    results = {}
+    for enabled in (False, True):
+        limiter.enabled = enabled
+        limiter.reset()
+        client.get('/api/health')  # warm up
+        # One client address per request keeps every hit under the default limits
+        results[enabled] = time_per_call(
+            lambda i: client.get('/api/health', environ_base={'REMOTE_ADDR': f'10.0.{i // 250}.{i % 250}'}),
+            iterations
+        )
+    limiter.enabled = True
+
+    print(f"\nGET /api/health through the test client, {iterations} requests "
+          f"(storage: {app.config['RATELIMIT_STORAGE_URI']})")
+    print(f"  limiter off    {results[False]:8.1f} µs/request")
+    print(f"  limiter on     {results[True]:8.1f} µs/request")
+    print(f"  overhead       {results[True] - results[False]:8.1f} µs/request")
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    benchmark_storages(n)
+    benchmark_requests(min(n, 1000))
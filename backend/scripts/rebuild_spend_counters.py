@@ -0,0 +1,37 @@
+"""
+Rebuild card spend counters from transaction history.
+
+Recomputes the daily and monthly counters used for payment card limits from
+completed card_payment transactions. The c5d17a3e9b42 migration already
+seeds them once on deploy; run this after restoring a backup or correcting
+transactions by hand.
+
+Usage:
+    cd backend && python scripts/rebuild_spend_counters.py [card_id ...]
+"""
+
+import sys
+import os
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.extensions import db
+from app.services.spend_counters import rebuild_counters
+
+
+def main():
+    card_ids = [int(arg) for arg in sys.argv[1:]] or None
+    app = create_app()
+
+    with app.app_context():
+        written = rebuild_counters(card_ids)
+        db.session.commit()
+
+    scope = f"{len(card_ids)} cards" if card_ids else "all cards"
+    print(f"Rebuilt {written} counter rows for {scope}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+Scheduled DarkDays auto-save sweep.
+
+Moves the configured percentage of each user's recent income from their wallet
+into every savings pocket whose next_auto_save_date has arrived, then schedules
+the next run of each pocket. Safe to run repeatedly (e.g. hourly from cron);
+pockets that aren't due are skipped.
+
+Usage:
+    cd backend && python scripts/run_auto_save.py [chunk_size]
+"""
+
+import sys
+import os
+import time
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.services.auto_save import DEFAULT_CHUNK_SIZE, run_auto_save
+
+
+def main():
+    chunk_size = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CHUNK_SIZE
+    app = create_app()
+
+    with app.app_context():
+        start = time.perf_counter()
+        summary = run_auto_save(chunk_size=chunk_size)
+        elapsed = time.perf_counter() - start
+
+    print(f"Processed {summary['pockets']} pockets in {summary['chunks']} chunks ({elapsed:.2f}s)")
+    print(f"  Pockets funded: {summary['pockets_funded']}")
+    print(f"  Amount saved:   ${summary['amount_saved']:.2f}")
+
+
+if __name__ == '__main__':
+    main()
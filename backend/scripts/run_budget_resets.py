@@ -0,0 +1,40 @@
+"""
+Monthly budget card reset and auto-allocation.
+
+Resets spent_amount on every budget card that hasn't been reset this month and
+moves auto_allocate_amount from the owner's wallet onto auto-allocating cards.
+Safe to run repeatedly (e.g. hourly from cron); cards already reset this month
+are skipped.
+
+Usage:
+    cd backend && python scripts/run_budget_resets.py [chunk_size]
+"""
+
+import sys
+import os
+import time
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.services.budget_reset import DEFAULT_CHUNK_SIZE, run_budget_resets
+
+
+def main():
+    chunk_size = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CHUNK_SIZE
+    app = create_app()
+
+    with app.app_context():
+        start = time.perf_counter()
+        summary = run_budget_resets(chunk_size=chunk_size)
+        elapsed = time.perf_counter() - start
+
+    print(f"Processed {summary['users']} users in {summary['chunks']} chunks ({elapsed:.2f}s)")
+    print(f"  Cards reset:      {summary['cards_reset']}")
+    print(f"  Cards funded:     {summary['cards_funded']}")
+    print(f"  Amount allocated: ${summary['amount_allocated']:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+Loan instalment auto-debit.
+
+Collects every due loan instalment from the borrower's wallet. Safe to run
+repeatedly (e.g. daily from cron); an instalment is tried at most once a day
+and ones that couldn't be collected are retried on the next day's run.
+
+Usage:
+    cd backend && python scripts/run_loan_auto_debits.py [chunk_size]
+"""
+
+import sys
+import os
+import time
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.services.loan_instalments import DEFAULT_CHUNK_SIZE, run_auto_debits
+
+
+def main():
+    chunk_size = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CHUNK_SIZE
+    app = create_app()
+
+    with app.app_context():
+        start = time.perf_counter()
+        summary = run_auto_debits(chunk_size=chunk_size)
+        elapsed = time.perf_counter() - start
+
+    print(f"Processed {summary['instalments']} instalments in {summary['chunks']} chunks ({elapsed:.2f}s)")
+    print(f"  Paid: {summary['paid']}")
+    print(f"  Failed (retried tomorrow): {summary['failed']}")
+    print(f"  Collected: ${summary['amount_collected']:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Bill due subscriptions in batches.
+
+Charges every due SubscriptionCard and card-attached Subscription, advances
+billing dates and schedules retries for failed charges. Several copies can
+run at once (rows are claimed per chunk), e.g. to work through the
+1st-of-month renewals faster.
+
+Usage:
+    cd backend && python scripts/run_subscription_billing.py [chunk_size]
+"""
+
+import sys
+import os
+import time
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.services.subscription_billing import DEFAULT_CHUNK_SIZE, run_subscription_billing
+
+
+def main():
+    chunk_size = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CHUNK_SIZE
+    app = create_app()
+
+    with app.app_context():
+        start = time.perf_counter()
+        summary = run_subscription_billing(chunk_size=chunk_size)
+        elapsed = time.perf_counter() - start
+
+    print(f"Subscription billing finished in {elapsed:.2f}s")
+    for name, totals in summary.items():
+        print(f"  {name}: {totals['charged']} charged (${totals['amount']:.2f}), "
+              f"{totals['failed']} failed, {totals['paused']} paused, {totals['chunks']} chunks")
+
+
+if __name__ == '__main__':
+    main()
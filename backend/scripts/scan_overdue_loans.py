@@ -0,0 +1,39 @@
+"""
+Scheduled overdue-loan scan.
+
+Flags active loans that are past their due date as overdue and queues
+reminder notifications (borrowers every few days while the loan stays open,
+lenders once). Safe to run repeatedly (e.g. daily from cron); loans reminded
+recently are skipped.
+
+Usage:
+    cd backend && python scripts/scan_overdue_loans.py [chunk_size]
+"""
+
+import sys
+import os
+import time
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.services.overdue_loans import DEFAULT_CHUNK_SIZE, scan_overdue_loans
+
+
+def main():
+    chunk_size = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CHUNK_SIZE
+    app = create_app()
+
+    with app.app_context():
+        start = time.perf_counter()
+        summary = scan_overdue_loans(chunk_size=chunk_size)
+        elapsed = time.perf_counter() - start
+
+    print(f"Processed {summary['loans']} overdue loans in {summary['chunks']} chunks ({elapsed:.2f}s)")
+    print(f"  Newly overdue:        {summary['newly_overdue']}")
+    print(f"  Notifications queued: {summary['notifications']}")
+
+
+if __name__ == '__main__':
+    main()
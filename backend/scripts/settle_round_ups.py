@@ -0,0 +1,39 @@
+"""
+Batched round-up settlement.
+
+Moves queued round-ups from each user's wallet into their chosen savings pocket
+and writes one savings_deposit ledger entry per pocket. Round-ups a wallet
+can't cover yet stay pending. Safe to run repeatedly (e.g. every 15 minutes
+from cron).
+
+Usage:
+    cd backend && python scripts/settle_round_ups.py [chunk_size]
+"""
+
+import sys
+import os
+import time
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.services.round_ups import DEFAULT_CHUNK_SIZE, settle_round_ups
+
+
+def main():
+    chunk_size = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CHUNK_SIZE
+    app = create_app()
+
+    with app.app_context():
+        start = time.perf_counter()
+        summary = settle_round_ups(chunk_size=chunk_size)
+        elapsed = time.perf_counter() - start
+
+    print(f"Processed {summary['users']} users in {summary['chunks']} chunks ({elapsed:.2f}s)")
+    print(f"  Pockets credited: {summary['pockets_credited']}")
+    print(f"  Amount settled:   ${summary['amount_settled']:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,8 +4,10 @@ Provides reusable test fixtures for all test modules.
 """
 import pytest
 import os
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
 from app import create_app
-from app.extensions import db
+from app.extensions import db, seller_profile_cache
 from app.models import User, Wallet
 from datetime import datetime
 
@@ -39,6 +41,8 @@ def clean_db(app):
         for table in reversed(db.metadata.sorted_tables):
             db.session.execute(table.delete())
         db.session.commit()
+        # Bulk deletes skip the ORM listeners; ids are reused
+        seller_profile_cache.clear()
     yield
     with app.app_context():
         db.session.rollback()
@@ -127,6 +131,38 @@ def auth_headers(auth_token):
     return {'Authorization': f'Bearer {auth_token}'}
 
 
+@pytest.fixture
+def mint_headers(app):
+    """Mint auth headers for a user id directly (avoids the login rate limit)"""
+    def mint(user_id):
+        return {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+    return mint
+
+
+@pytest.fixture
+def token_headers(test_user, mint_headers):
+    """Minted auth headers for test_user"""
+    return mint_headers(test_user.id)
+
+
+@pytest.fixture
+def count_queries(app):
+    """Run fn() and return (its result, the SQL statements it executed)"""
+    def count(fn):
+        statements = []
+        
+        def before_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+        
+        event.listen(db.engine, 'before_cursor_execute', before_execute)
+        try:
+            result = fn()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_execute)
+        return result, statements
+    return count
+
+
 class AuthenticatedClient:
     """Wrapper for test client with authentication"""
     def __init__(self, client, token):
@@ -110,3 +110,33 @@ class TestAuthenticationAPI:
         })
         
         assert response.status_code == 422  # JWT decode error
+    
+    def test_logout_revokes_token(self, client, test_user):
+        """Test a token presented to /logout is rejected afterwards"""
+        from flask_jwt_extended import create_access_token
+        
+        token = create_access_token(identity=str(test_user.id))
+        headers = {'Authorization': f'Bearer {token}'}
+        
+        assert client.get('/api/auth/me', headers=headers).status_code == 200
+        assert client.post('/api/auth/logout', headers=headers).status_code == 200
+        
+        response = client.get('/api/auth/me', headers=headers)
+        assert response.status_code == 401
+    
+    def test_logout_revokes_refresh_token(self, client, test_user, test_user2):
+        """Test the refresh token sent with /logout can't be used afterwards"""
+        from flask_jwt_extended import create_access_token, create_refresh_token
+        
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(test_user.id))}'}
+        refresh_token = create_refresh_token(identity=str(test_user.id))
+        
+        foreign = create_refresh_token(identity=str(test_user2.id))
+        assert client.post('/api/auth/logout', headers=headers, json={'refresh_token': foreign}).status_code == 400
+        assert client.get('/api/auth/me', headers=headers).status_code == 200
+        
+        response = client.post('/api/auth/logout', headers=headers, json={'refresh_token': refresh_token})
+        assert response.status_code == 200
+        
+        refresh_headers = {'Authorization': f'Bearer {refresh_token}'}
+        assert client.post('/api/auth/logout', headers=refresh_headers).status_code == 401
@@ -0,0 +1,156 @@
+"""
+API Integration Tests - Cards
+Tests card listing and card payment endpoints
+"""
+import pytest
+from datetime import date
+from app.extensions import db
+from app.models import VirtualCard, Subscription, SavingsPocket
+
+
+@pytest.mark.integration
+class TestCardListing:
+    """Test GET /api/cards"""
+    
+    def test_subscriptions_loaded_in_one_query(self, client, test_user, token_headers, count_queries):
+        """Test listing many subscription cards does not issue a query per card"""
+        for i in range(5):
+            card = VirtualCard(user_id=test_user.id, card_purpose='subscription', card_name=f'Subs {i}',
+                               allocated_amount=0, spent_amount=0)
+            db.session.add(card)
+            db.session.flush()
+            db.session.add_all([
+                Subscription(card_id=card.id, service_name='Music', amount=10, billing_cycle='monthly',
+                             next_billing_date=date(2030, 1, 10 + i)),
+                Subscription(card_id=card.id, service_name='Cloud', amount=120, billing_cycle='yearly',
+                             next_billing_date=date(2030, 1, 5 + i)),
+            ])
+        db.session.commit()
+        
+        response, statements = count_queries(lambda: client.get('/api/cards', headers=token_headers))
+        
+        assert response.status_code == 200
+        subscription_queries = [s for s in statements if 'FROM subscriptions' in s]
+        assert len(subscription_queries) == 1
+        
+        data = response.json
+        assert data['summary']['subscription_card_count'] == 5
+        assert data['summary']['total_monthly_subscription'] == pytest.approx(50.0)
+        first = next(c for c in data['cards'] if c['card_name'] == 'Subs 0')
+        assert first['subscription_count'] == 2
+        assert first['total_monthly_spend'] == pytest.approx(20.0)
+        assert first['next_billing_date'] == '2030-01-05'
+    
+    def test_default_cards_use_luhn_valid_numbers_without_probes(self, client, token_headers, count_queries):
+        """Test default card creation needs no card_number uniqueness queries"""
+        from app.services.card_numbers import is_luhn_valid
+        
+        response, statements = count_queries(
+            lambda: client.get('/api/cards/default-cards', headers=token_headers)
+        )
+        
+        assert response.status_code == 200
+        numbers = [card['card_number'] for card in response.json['cards']]
+        assert len(set(numbers)) == 2
+        assert all(is_luhn_valid(n) for n in numbers)
+        assert not [s for s in statements if 'virtual_cards.card_number =' in s]
+
+
+@pytest.mark.integration
+class TestCardIbanLookup:
+    """Test GET /api/cards/lookup"""
+    
+    def test_lookup_by_iban(self, client, test_user, token_headers):
+        """Test an IBAN resolves to its card and owner without sensitive fields"""
+        card = VirtualCard(user_id=test_user.id, card_purpose='payment', card_name='Main',
+                           card_number='4517600000000001', cvv='123')
+        db.session.add(card)
+        db.session.commit()
+        
+        response = client.get(f'/api/cards/lookup?iban={card.iban}', headers=token_headers)
+        
+        assert response.status_code == 200
+        assert response.json['card_id'] == card.id
+        assert response.json['owner']['username'] == test_user.username
+        assert 'card_number' not in response.json and 'cvv' not in response.json
+    
+    def test_unknown_iban_returns_404(self, client, token_headers):
+        """Test unknown and missing IBANs are rejected"""
+        assert client.get('/api/cards/lookup?iban=GB00UNIP0000000000', headers=token_headers).status_code == 404
+        assert client.get('/api/cards/lookup', headers=token_headers).status_code == 400
+
+
+@pytest.mark.integration
+class TestCardPaymentLimits:
+    """Test POST /api/cards/<id>/pay against daily and monthly limits"""
+    
+    def test_limits_use_running_counters(self, client, test_user, token_headers, count_queries):
+        """Test payments are declined once the daily limit is used up"""
+        card = VirtualCard(user_id=test_user.id, card_purpose='payment', card_name='Main',
+                           daily_limit=50, spending_limit=500)
+        db.session.add(card)
+        db.session.commit()
+        
+        first = client.post(f'/api/cards/{card.id}/pay', json={'amount': 30}, headers=token_headers)
+        second = client.post(f'/api/cards/{card.id}/pay', json={'amount': 30}, headers=token_headers)
+        
+        assert first.status_code == 200
+        assert second.status_code == 400
+        assert 'daily limit' in second.json['error']
+        assert first.json['transaction']['metadata']['card_id'] == card.id
+        
+        def pay_small():
+            return client.post(f'/api/cards/{card.id}/pay', json={'amount': 5}, headers=token_headers)
+        response, statements = count_queries(pay_small)
+        assert response.status_code == 200
+        assert not [s for s in statements if 'sum(' in s.lower()]
+
+
+@pytest.mark.integration
+class TestCardPaymentAuthorisation:
+    """Test /pay declines from cached card state"""
+    
+    def test_frozen_card_declined_without_locking(self, client, test_user, token_headers, count_queries):
+        """Test repeat payments on a frozen card don't query the database and unfreeze takes effect"""
+        card = VirtualCard(user_id=test_user.id, card_purpose='payment', card_name='Main')
+        db.session.add(card)
+        db.session.commit()
+        client.post(f'/api/cards/{card.id}/freeze', headers=token_headers)
+        client.post(f'/api/cards/{card.id}/pay', json={'amount': 5}, headers=token_headers)
+        
+        response, statements = count_queries(
+            lambda: client.post(f'/api/cards/{card.id}/pay', json={'amount': 5}, headers=token_headers)
+        )
+        
+        assert response.status_code == 403
+        assert not [s for s in statements if 'virtual_cards' in s or 'wallets' in s]
+        
+        client.post(f'/api/cards/{card.id}/unfreeze', headers=token_headers)
+        assert client.post(f'/api/cards/{card.id}/pay', json={'amount': 5}, headers=token_headers).status_code == 200
+
+
+@pytest.mark.integration
+class TestCardPaymentRoundUps:
+    """Test round-ups queued by POST /api/cards/<id>/pay"""
+    
+    def test_payment_queues_pending_round_up(self, client, test_user, token_headers):
+        """Test the round-up is pending, not moved, until settlement"""
+        card = VirtualCard(user_id=test_user.id, card_purpose='payment', card_name='Main')
+        pocket = SavingsPocket(user_id=test_user.id, balance=0)
+        db.session.add_all([card, pocket])
+        db.session.commit()
+        
+        enabled = client.put(f'/api/savings/pockets/{pocket.id}/round-ups',
+                             json={'enabled': True, 'unit': 5}, headers=token_headers)
+        assert enabled.status_code == 200
+        assert client.put(f'/api/savings/pockets/{pocket.id}/round-ups',
+                          json={'unit': 3}, headers=token_headers).status_code == 400
+        
+        response = client.post(f'/api/cards/{card.id}/pay', json={'amount': 12.30}, headers=token_headers)
+        round_ups = client.get('/api/savings/round-ups', headers=token_headers).json['round_ups']
+        
+        assert response.status_code == 200
+        assert response.json['wallet_balance'] == 987.70
+        assert round_ups['pending_amount'] == 2.70
+        assert round_ups['pending_count'] == 1
+        assert round_ups['pocket_id'] == pocket.id
@@ -0,0 +1,25 @@
+"""
+API Integration Tests - Forecast
+Tests the cash-flow forecast endpoint
+"""
+import pytest
+
+
+@pytest.mark.integration
+class TestForecast:
+    """Test GET /api/forecast"""
+    
+    def test_forecast_months(self, client, token_headers):
+        """Test the projection covers the requested months, capped at 24"""
+        response = client.get('/api/forecast?months=6', headers=token_headers)
+        data = response.get_json()
+        
+        assert response.status_code == 200
+        assert data['months'] == 6
+        assert data['days'][0]['balance'] == 1000.0
+        assert data['negative_days'] == []
+        assert client.get('/api/forecast?months=99', headers=token_headers).get_json()['months'] == 24
+    
+    def test_invalid_months(self, client, token_headers):
+        """Test a non-integer months parameter is rejected"""
+        assert client.get('/api/forecast?months=soon', headers=token_headers).status_code == 400
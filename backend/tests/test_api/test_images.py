@@ -0,0 +1,57 @@
+"""
+API Integration Tests - Images
+Tests listing image upload and streaming from the image store
+"""
+import base64
+import pytest
+from app.extensions import image_store
+
+PNG = b'\x89PNG\r\n\x1a\n' + bytes(range(32))
+
+
+@pytest.fixture
+def seller_headers(app, token_headers, tmp_path):
+    """Minted auth headers, with the image store in a temp dir"""
+    app.config['IMAGE_STORE_PATH'] = str(tmp_path)
+    image_store.init_app(app)
+    return token_headers
+
+
+@pytest.mark.integration
+class TestListingImages:
+    """Test POST /api/marketplace/listings images and GET /api/images/<name>"""
+    
+    def test_listing_returns_urls_and_images_stream(self, client, seller_headers):
+        """Test uploaded images are stored once, listed as URLs and served with ranges and ETags"""
+        data_uri = f'data:image/png;base64,{base64.b64encode(PNG).decode()}'
+        response = client.post('/api/marketplace/listings', headers=seller_headers, json={
+            'title': 'Calculus textbook', 'description': 'Barely used', 'price': 20, 'category': 'textbooks',
+            'images': [data_uri, data_uri]
+        })
+        
+        assert response.status_code == 201
+        images = response.get_json()['listing']['images']
+        assert len(images) == 1
+        
+        listed = client.get('/api/marketplace/listings', headers=seller_headers).get_json()
+        assert listed['listings'][0]['images'] == images
+        assert 'base64' not in str(listed)
+        
+        image = client.get(images[0]['url'])
+        assert image.status_code == 200
+        assert image.data == PNG
+        assert image.mimetype == 'image/png'
+        assert 'immutable' in image.headers['Cache-Control']
+        
+        partial = client.get(images[0]['url'], headers={'Range': 'bytes=0-7'})
+        assert partial.status_code == 206
+        assert partial.data == PNG[:8]
+        
+        cached = client.get(images[0]['url'], headers={'If-None-Match': image.headers['ETag']})
+        assert cached.status_code == 304
+        assert client.get(images[0]['thumbnail_url']).status_code == 200
+    
+    def test_unknown_image_is_404(self, client, seller_headers):
+        """Test names that aren't stored content hashes are not found"""
+        assert client.get('/api/images/' + 'a' * 64 + '.png').status_code == 404
+        assert client.get('/api/images/..%2Fconfig.py').status_code == 404
@@ -0,0 +1,116 @@
+"""
+API Integration Tests - Loans
+Tests the loans dashboard endpoint
+"""
+import pytest
+from decimal import Decimal
+from app.extensions import db
+from app.models import Loan, LoanInstalment
+
+
+@pytest.mark.integration
+class TestLoansDashboard:
+    """Test GET /api/loans"""
+    
+    def test_partitions_loans_in_one_query(self, client, test_user, test_user2, token_headers, count_queries):
+        """Test loans are split by role and status and summed from a single SELECT"""
+        me, other = test_user.id, test_user2.id
+        db.session.add_all([
+            Loan(lender_id=me, borrower_id=other, amount=Decimal('40'), status='pending'),
+            Loan(lender_id=other, borrower_id=me, amount=Decimal('15'), status='pending'),
+            Loan(lender_id=me, borrower_id=other, amount=Decimal('100'), amount_repaid=Decimal('30'), status='active'),
+            Loan(lender_id=other, borrower_id=me, amount=Decimal('25'), amount_repaid=Decimal('0'), status='active'),
+            Loan(lender_id=other, borrower_id=me, amount=Decimal('10'), amount_repaid=Decimal('10'),
+                 status='repaid', is_fully_repaid=True),
+            Loan(lender_id=me, borrower_id=other, amount=Decimal('60'), status='cancelled'),
+            Loan(lender_id=other, borrower_id=me, amount=Decimal('20'), status='declined'),
+        ])
+        db.session.commit()
+        db.session.expire_all()
+        
+        response, statements = count_queries(lambda: client.get('/api/loans', headers=token_headers))
+        data = response.get_json()
+        selects = [s for s in statements if s.lstrip().upper().startswith('SELECT')]
+        
+        assert response.status_code == 200
+        assert len([s for s in selects if 'FROM loans' in s]) == 1
+        assert [loan['amount'] for loan in data['pending_requests_received']] == [40.0]
+        assert [loan['amount'] for loan in data['pending_requests_sent']] == [15.0]
+        assert [loan['amount'] for loan in data['loans_given']] == [100.0]
+        assert sorted(loan['amount'] for loan in data['loans_taken']) == [10.0, 25.0]
+        assert data['loans_given'][0]['borrower']['username'] == test_user2.username
+        assert data['summary'] == {
+            'owed_to_me': 70.0,
+            'i_owe': 25.0,
+            'net_balance': 45.0,
+            'pending_received_count': 1,
+            'pending_sent_count': 1
+        }
+
+
+@pytest.mark.integration
+class TestLoanSettlement:
+    """Test GET /api/loans/settlement and POST /api/loans/settle"""
+    
+    def test_preview_then_settle(self, client, test_user, test_user2, token_headers, mint_headers):
+        """Test the preview matches what settling moves"""
+        me, other = test_user.id, test_user2.id
+        db.session.add_all([
+            Loan(lender_id=me, borrower_id=other, amount=Decimal('15'), amount_repaid=Decimal('0'), status='active'),
+            Loan(lender_id=other, borrower_id=me, amount=Decimal('40'), amount_repaid=Decimal('0'), status='active'),
+        ])
+        db.session.commit()
+        
+        preview = client.get('/api/loans/settlement', headers=token_headers).get_json()
+        assert preview['transfers'] == [{'from_user_id': me, 'from_username': 'testuser',
+                                         'to_user_id': other, 'to_username': 'testuser2', 'amount': 25.0}]
+        
+        other_headers = mint_headers(other)
+        assert client.post('/api/loans/settle', headers=other_headers).status_code == 400
+        
+        response = client.post('/api/loans/settle', headers=token_headers)
+        data = response.get_json()
+        
+        assert response.status_code == 200
+        assert data['settlement']['loans_settled'] == 2
+        assert data['wallet_balance'] == 975.0
+        assert client.post('/api/loans/settle', headers=token_headers).status_code == 400
+
+
+@pytest.mark.integration
+class TestLoanInstalments:
+    """Test instalment plans on POST /api/loans and GET /api/loans/<id>/instalments"""
+    
+    def test_approval_schedules_instalments(self, client, test_user, test_user2, token_headers, mint_headers):
+        """Test a planned loan gets its schedule on approval and its due date from the last instalment"""
+        borrower_headers = mint_headers(test_user2.id)
+        response = client.post('/api/loans', headers=borrower_headers, json={
+            'lender_username': 'testuser', 'amount': 90, 'reason': 'Rent', 'instalments': 3,
+            'instalment_frequency': 'weekly'
+        })
+        loan_id = response.get_json()['loan']['id']
+        
+        assert response.status_code == 201
+        assert client.post(f'/api/loans/{loan_id}/approve', headers=token_headers).status_code == 200
+        
+        data = client.get(f'/api/loans/{loan_id}/instalments', headers=borrower_headers).get_json()
+        assert [i['amount'] for i in data['instalments']] == [30.0, 30.0, 30.0]
+        assert db.session.get(Loan, loan_id).due_date.isoformat() == data['instalments'][-1]['due_date']
+        
+        invalid = client.post('/api/loans', headers=borrower_headers, json={
+            'lender_username': 'testuser', 'amount': 90, 'reason': 'Rent', 'instalments': 99
+        })
+        assert invalid.status_code == 400
+    
+    def test_cancel_cancels_scheduled_instalments(self, client, test_user, test_user2, token_headers, mint_headers):
+        """Test cancelling a planned loan cancels its scheduled instalments right away"""
+        borrower_headers = mint_headers(test_user2.id)
+        loan_id = client.post('/api/loans', headers=borrower_headers, json={
+            'lender_username': 'testuser', 'amount': 90, 'reason': 'Rent', 'instalments': 3
+        }).get_json()['loan']['id']
+        client.post(f'/api/loans/{loan_id}/approve', headers=token_headers)
+        
+        assert client.post(f'/api/loans/{loan_id}/cancel', headers=token_headers).status_code == 200
+        
+        statuses = [i.status for i in LoanInstalment.query.filter_by(loan_id=loan_id)]
+        assert statuses == ['cancelled'] * 3
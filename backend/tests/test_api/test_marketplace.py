@@ -0,0 +1,94 @@
+"""
+API Integration Tests - Marketplace
+Tests listing search, facets, cursor pagination and order history
+"""
+import pytest
+from app.extensions import db
+from app.models import MarketplaceListing
+
+
+@pytest.fixture
+def listings(app, test_user):
+    """Three open listings and one sold one"""
+    rows = [
+        MarketplaceListing(seller_id=test_user.id, title='Calculus textbook', price=30, category='textbooks',
+                           condition='good', university='MIT'),
+        MarketplaceListing(seller_id=test_user.id, title='Linear algebra notes', price=5, category='textbooks',
+                           condition='fair', university='MIT'),
+        MarketplaceListing(seller_id=test_user.id, title='Desk lamp', price=12, category='furniture',
+                           condition='good', university='MIT'),
+        MarketplaceListing(seller_id=test_user.id, title='Calculus workbook', price=8, category='textbooks',
+                           condition='good', university='MIT', is_sold=True, is_available=False),
+    ]
+    db.session.add_all(rows)
+    db.session.commit()
+    return rows
+
+
+@pytest.mark.integration
+class TestListingSearch:
+    """Test GET /api/marketplace/listings"""
+    
+    def test_search_filters_and_facets(self, client, token_headers, listings):
+        """Test text, condition and price filters, with facets over all open listings"""
+        response = client.get('/api/marketplace/listings?q=calc&condition=good,fair&min_price=10',
+                              headers=token_headers)
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert [listing['title'] for listing in data['listings']] == ['Calculus textbook']
+        assert data['listings'][0]['seller']['username'] == 'testuser'
+        assert 'email' not in data['listings'][0]['seller']
+        assert data['next_cursor'] is None
+        assert data['facets']['category'] == {'textbooks': 2, 'furniture': 1}
+        assert data['facets']['condition'] == {'good': 2, 'fair': 1}
+    
+    def test_cursor_pages(self, client, token_headers, listings):
+        """Test next_cursor walks the open listings newest first without repeats"""
+        first = client.get('/api/marketplace/listings?limit=2', headers=token_headers).get_json()
+        second = client.get(f'/api/marketplace/listings?limit=2&cursor={first["next_cursor"]}',
+                            headers=token_headers).get_json()
+        
+        titles = [listing['title'] for listing in first['listings'] + second['listings']]
+        assert titles == ['Desk lamp', 'Linear algebra notes', 'Calculus textbook']
+        assert second['next_cursor'] is None
+    
+    def test_invalid_parameters(self, client, token_headers, listings):
+        """Test a malformed cursor or price range is rejected"""
+        for query in ('cursor=not-a-cursor', 'min_price=abc', 'min_price=20&max_price=10', 'max_price=nan'):
+            response = client.get(f'/api/marketplace/listings?{query}', headers=token_headers)
+            assert response.status_code == 400, query
+
+
+@pytest.mark.integration
+class TestOrderHistory:
+    """Test GET /api/marketplace/orders"""
+    
+    def test_buyer_and_seller_history(self, client, app, listings, test_user2, token_headers, mint_headers):
+        """Test purchases and sales are listed newest first with listing details and cursor pages"""
+        buyer_headers = mint_headers(test_user2.id)
+        for listing in listings[:2]:
+            response = client.post('/api/marketplace/orders', headers=buyer_headers, json={'listing_id': listing.id})
+            assert response.status_code == 201
+        
+        first = client.get('/api/marketplace/orders?limit=1', headers=buyer_headers).get_json()
+        second = client.get(f'/api/marketplace/orders?limit=1&cursor={first["next_cursor"]}',
+                            headers=buyer_headers).get_json()
+        
+        purchases = first['orders'] + second['orders']
+        assert [order['listing_title'] for order in purchases] == ['Linear algebra notes', 'Calculus textbook']
+        assert purchases[0]['listing_price'] == 5.0
+        assert purchases[0]['counterparty_username'] == 'testuser'
+        assert all('images' not in order for order in purchases)
+        assert second['next_cursor'] is None
+        
+        sales = client.get('/api/marketplace/orders?role=seller', headers=token_headers).get_json()['orders']
+        assert [order['id'] for order in sales] == [order['id'] for order in purchases]
+        assert sales[0]['counterparty_username'] == 'testuser2'
+        assert client.get('/api/marketplace/orders', headers=token_headers).get_json()['orders'] == []
+    
+    def test_invalid_parameters(self, client, token_headers):
+        """Test an unknown role or malformed cursor is rejected"""
+        for query in ('role=admin', 'cursor=not-a-cursor'):
+            response = client.get(f'/api/marketplace/orders?{query}', headers=token_headers)
+            assert response.status_code == 400, query
@@ -0,0 +1,33 @@
+"""
+API Integration Tests - Notifications
+Tests listing notifications and marking them read
+"""
+import pytest
+from app.extensions import db
+from app.models import Notification
+
+
+@pytest.mark.integration
+class TestNotifications:
+    """Test GET /api/notifications and POST /api/notifications/<id>/read"""
+    
+    def test_list_and_mark_read(self, client, test_user, test_user2, token_headers):
+        """Test users see only their own notifications and can mark them read"""
+        mine = Notification(user_id=test_user.id, notification_type='loan_overdue',
+                            title='Loan overdue', message='Your loan is 3 days overdue.')
+        theirs = Notification(user_id=test_user2.id, notification_type='loan_overdue',
+                              title='Loan overdue', message='Your loan is 1 days overdue.')
+        db.session.add_all([mine, theirs])
+        db.session.commit()
+        
+        listed = client.get('/api/notifications', headers=token_headers).get_json()
+        assert [n['id'] for n in listed['notifications']] == [mine.id]
+        assert listed['unread_count'] == 1
+        
+        assert client.post(f'/api/notifications/{theirs.id}/read', headers=token_headers).status_code == 404
+        read = client.post(f'/api/notifications/{mine.id}/read', headers=token_headers)
+        assert read.status_code == 200
+        assert read.get_json()['notification']['is_read'] is True
+        
+        unread = client.get('/api/notifications?unread=true', headers=token_headers).get_json()
+        assert unread == {'notifications': [], 'unread_count': 0}
@@ -0,0 +1,52 @@
+"""
+API Integration Tests - Subscriptions
+Tests subscription statistics endpoint
+"""
+import pytest
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models import SubscriptionCard
+from app.services.subscription_billing import add_months
+
+
+@pytest.mark.integration
+class TestSubscriptionStatistics:
+    """Test GET /api/subscriptions/statistics"""
+    
+    def test_statistics_aggregated_in_sql(self, client, test_user, token_headers, count_queries):
+        """Test totals, next billing, categories and projection without loading rows"""
+        first_of_month = datetime.utcnow().date().replace(day=1)
+        next_month = add_months(first_of_month, 1, 1)
+        db.session.add_all([
+            SubscriptionCard(user_id=test_user.id, service_name='Music', category='streaming',
+                             monthly_cost=10, total_paid=30, next_billing_date=first_of_month),
+            SubscriptionCard(user_id=test_user.id, service_name='Video', category='streaming',
+                             monthly_cost=15, total_paid=0, next_billing_date=next_month + timedelta(days=3)),
+            SubscriptionCard(user_id=test_user.id, service_name='Gym', category='health', status='paused',
+                             monthly_cost=40, total_paid=80, next_billing_date=first_of_month),
+        ])
+        db.session.commit()
+        
+        response, statements = count_queries(
+            lambda: client.get('/api/subscriptions/statistics?months=3', headers=token_headers)
+        )
+        
+        assert response.status_code == 200
+        data = response.json
+        assert (data['total_subscriptions'], data['active_subscriptions'], data['paused_subscriptions']) == (3, 2, 1)
+        assert data['total_monthly_cost'] == pytest.approx(25.0)
+        assert data['total_paid'] == pytest.approx(110.0)
+        assert data['next_billing']['service_name'] == 'Music'
+        assert data['category_spending'] == {'streaming': pytest.approx(25.0)}
+        assert [m['amount'] for m in data['projected_spend']] == [pytest.approx(10.0), pytest.approx(25.0), pytest.approx(25.0)]
+        assert data['projected_spend'][1]['month'] == next_month.strftime('%Y-%m')
+        
+        stats_queries = [s for s in statements if 'subscription_cards' in s]
+        assert len(stats_queries) == 3
+        assert all('subscription_cards.id AS subscription_cards_id' not in s for s in stats_queries)
+    
+    def test_invalid_months(self, client, token_headers):
+        """Test a non-numeric months parameter is rejected"""
+        response = client.get('/api/subscriptions/statistics?months=abc', headers=token_headers)
+        
+        assert response.status_code == 400
@@ -0,0 +1,77 @@
+"""
+API Integration Tests - Transactions
+Tests the upcoming occurrences endpoint and recurring expected payments
+"""
+import pytest
+from datetime import date, timedelta
+from app.models import RecurringSeries, Transaction
+
+
+@pytest.mark.integration
+class TestUpcomingTransactions:
+    """Test GET /api/transactions/upcoming"""
+    
+    def test_recurring_payment_expanded_not_stored(self, client, test_user, token_headers):
+        """Test a weekly expected payment is stored once and expanded for any window"""
+        start = date.today() + timedelta(days=1)
+        response = client.post('/api/expected-payments', headers=token_headers, json={
+            'title': 'Groceries', 'amount': 40, 'date': start.isoformat(), 'frequency': 'weekly'
+        })
+        assert response.status_code == 201
+        payment = response.get_json()['payment']
+        
+        response = client.post('/api/expected-payments/generate-recurring', headers=token_headers,
+                               json={'payment_id': payment['id'], 'months': 12})
+        assert response.status_code == 201
+        assert len(response.get_json()['payments']) >= 51
+        assert Transaction.query.count() == 1
+        assert RecurringSeries.query.count() == 1
+        
+        end = start + timedelta(days=27)
+        response = client.get(f'/api/transactions/upcoming?start={start}&end={end}', headers=token_headers)
+        data = response.get_json()
+        
+        assert response.status_code == 200
+        assert [t['occurrence_date'] for t in data['transactions']] == [
+            (start + timedelta(weeks=n)).isoformat() for n in range(4)
+        ]
+        assert data['transactions'][0]['id'] == payment['id']
+        assert all(t['id'] is None for t in data['transactions'][1:])
+    
+    def test_persisted_generation_is_idempotent(self, client, test_user, token_headers):
+        """Test persist=true writes each occurrence once, however often it is called"""
+        start = date.today() + timedelta(days=1)
+        payment = client.post('/api/expected-payments', headers=token_headers, json={
+            'title': 'Gym', 'amount': 15, 'date': start.isoformat(), 'frequency': 'weekly'
+        }).get_json()['payment']
+        
+        for _ in range(2):
+            response = client.post('/api/expected-payments/generate-recurring', headers=token_headers,
+                                   json={'payment_id': payment['id'], 'months': 3, 'persist': True})
+            assert response.status_code == 201
+        
+        payments = response.get_json()['payments']
+        assert response.get_json()['message'] == 'Generated 0 recurring payments'
+        assert all(p['id'] is not None for p in payments)
+        assert Transaction.query.count() == len(payments) + 1
+        assert len({p['occurrence_date'] for p in payments}) == len(payments)
+    
+    def test_deleting_base_payment_ends_series(self, client, test_user, token_headers):
+        """Test deleting the expected payment stops its expansion"""
+        start = date.today() + timedelta(days=1)
+        payment = client.post('/api/expected-payments', headers=token_headers, json={
+            'title': 'Rent', 'amount': 500, 'date': start.isoformat(), 'frequency': 'monthly'
+        }).get_json()['payment']
+        
+        client.delete(f"/api/expected-payments/{payment['id']}", headers=token_headers)
+        response = client.get('/api/transactions/upcoming', headers=token_headers)
+        
+        assert response.get_json()['transactions'] == []
+    
+    def test_invalid_window(self, client, token_headers):
+        """Test bad dates and oversized windows are rejected"""
+        assert client.get('/api/transactions/upcoming?start=nope', headers=token_headers).status_code == 400
+        assert client.get('/api/transactions/upcoming?start=2030-01-01&end=2029-01-01',
+                          headers=token_headers).status_code == 400
+        assert client.get('/api/transactions/upcoming?start=2030-01-01&end=2035-01-01',
+                          headers=token_headers).status_code == 400
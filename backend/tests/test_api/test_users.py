@@ -0,0 +1,25 @@
+"""
+API Integration Tests - Users
+Tests the user directory search endpoint
+"""
+import pytest
+
+
+@pytest.mark.integration
+class TestUserSearch:
+    """Test GET /api/users/search"""
+    
+    def test_search_excludes_caller_and_emails(self, client, test_user, test_user2, token_headers):
+        """Test results leave out the caller and don't expose emails"""
+        response = client.get('/api/users/search?q=TestUser', headers=token_headers)
+        data = response.get_json()
+        
+        assert response.status_code == 200
+        assert data['users'] == [{'id': test_user2.id, 'username': 'testuser2',
+                                  'first_name': test_user2.first_name, 'last_name': test_user2.last_name}]
+        assert data['next_cursor'] is None
+    
+    def test_missing_query_or_bad_cursor(self, client, token_headers):
+        """Test requests without a query or with a malformed cursor are rejected"""
+        assert client.get('/api/users/search', headers=token_headers).status_code == 400
+        assert client.get('/api/users/search?q=a&cursor=zzz', headers=token_headers).status_code == 400
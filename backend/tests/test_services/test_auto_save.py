@@ -0,0 +1,96 @@
+"""
+Unit tests for the DarkDays auto-save sweep
+Tests income-based amounts, wallet caps, scheduling and chunking
+"""
+import pytest
+from datetime import date, datetime
+from decimal import Decimal
+from app.extensions import db
+from app.models import SavingsPocket, Transaction, Wallet
+from app.services.auto_save import next_save_date, run_auto_save
+
+NOW = datetime(2030, 3, 1, 6, 0)
+
+
+def _income(user, amount, created_at):
+    return Transaction(user_id=user.id, transaction_type='income', amount=amount, status='completed',
+                       created_at=created_at)
+
+
+def _pocket(user, **kwargs):
+    kwargs.setdefault('auto_save_enabled', True)
+    kwargs.setdefault('auto_save_percentage', 20)
+    kwargs.setdefault('auto_save_frequency', 'monthly')
+    kwargs.setdefault('next_auto_save_date', date(2030, 3, 1))
+    return SavingsPocket(user_id=user.id, balance=0, **kwargs)
+
+
+@pytest.mark.unit
+class TestAutoSaveSchedule:
+    """Test next_save_date"""
+    
+    def test_skips_missed_periods(self):
+        """Test overdue pockets are scheduled after today rather than replayed"""
+        assert next_save_date('monthly', date(2030, 1, 31), date(2030, 3, 1)) == date(2030, 3, 31)
+        assert next_save_date('weekly', date(2030, 2, 1), date(2030, 2, 15)) == date(2030, 2, 22)
+
+
+@pytest.mark.unit
+class TestAutoSaveSweep:
+    """Test run_auto_save"""
+    
+    def test_saves_percentage_of_period_income(self, app, clean_db, test_user):
+        """Test only income from the last period counts and the date advances"""
+        pocket = _pocket(test_user)
+        db.session.add_all([
+            pocket,
+            _income(test_user, 500, datetime(2030, 2, 10)),
+            _income(test_user, 150, datetime(2030, 1, 20)),
+            Transaction(user_id=test_user.id, transaction_type='payment', amount=90, status='completed',
+                        created_at=datetime(2030, 2, 11)),
+        ])
+        db.session.commit()
+        
+        summary = run_auto_save(now=NOW)
+        db.session.expire_all()
+        
+        assert summary['pockets_funded'] == 1
+        assert pocket.balance == Decimal('100.00')
+        assert pocket.next_auto_save_date == date(2030, 4, 1)
+        assert Wallet.query.filter_by(user_id=test_user.id).first().balance == Decimal('900.00')
+        ledger = Transaction.query.filter_by(transaction_type='savings_deposit').one()
+        assert ledger.transaction_metadata['period_income'] == 500.0
+        assert run_auto_save(now=NOW)['pockets'] == 0
+    
+    def test_caps_at_wallet_and_skips_disabled(self, app, clean_db, test_user):
+        """Test pockets are funded in order until the wallet runs out"""
+        first = _pocket(test_user, auto_save_percentage=80)
+        second = _pocket(test_user, auto_save_percentage=50)
+        disabled = _pocket(test_user, auto_save_enabled=False)
+        db.session.add_all([first, second, disabled, _income(test_user, 1000, datetime(2030, 2, 20))])
+        db.session.commit()
+        
+        summary = run_auto_save(now=NOW)
+        db.session.expire_all()
+        
+        assert summary['pockets'] == 2
+        assert first.balance == Decimal('800.00')
+        assert second.balance == Decimal('200.00')
+        assert disabled.next_auto_save_date == date(2030, 3, 1)
+        assert Wallet.query.filter_by(user_id=test_user.id).first().balance == Decimal('0.00')
+    
+    def test_processes_in_chunks(self, app, clean_db, test_user, test_user2):
+        """Test chunked runs cover every due pocket, with or without income"""
+        with_income = _pocket(test_user, auto_save_frequency='weekly', next_auto_save_date=date(2030, 2, 28))
+        no_income = _pocket(test_user2)
+        db.session.add_all([with_income, no_income, _income(test_user, 50, datetime(2030, 2, 25))])
+        db.session.commit()
+        
+        summary = run_auto_save(now=NOW, chunk_size=1)
+        db.session.expire_all()
+        
+        assert summary['chunks'] == 2
+        assert summary['amount_saved'] == Decimal('10.00')
+        assert with_income.next_auto_save_date == date(2030, 3, 7)
+        assert no_income.balance == 0
+        assert no_income.next_auto_save_date == date(2030, 4, 1)
@@ -0,0 +1,90 @@
+"""
+Unit tests for the monthly budget card reset engine
+Tests rollover, wallet-limited auto-allocation, idempotency and chunking
+"""
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from app.extensions import db
+from app.models import Transaction, VirtualCard, Wallet
+from app.services.budget_reset import run_budget_resets
+
+LAST_MONTH = datetime(2030, 1, 15)
+NOW = datetime(2030, 2, 1, 6, 0)
+
+
+def make_budget_card(user_id, name, allocated, spent, auto_amount=None, **kwargs):
+    card = VirtualCard(
+        user_id=user_id, card_purpose='budget', card_name=name,
+        allocated_amount=allocated, spent_amount=spent,
+        auto_allocate=auto_amount is not None, auto_allocate_amount=auto_amount,
+        created_at=LAST_MONTH, **kwargs
+    )
+    db.session.add(card)
+    return card
+
+
+@pytest.mark.unit
+class TestBudgetReset:
+    """Test run_budget_resets"""
+    
+    def test_rolls_over_and_auto_allocates(self, app, clean_db, test_user):
+        """Test spent resets, unspent carries over and auto amounts are debited from the wallet"""
+        food = make_budget_card(test_user.id, 'Food', 300, 120, auto_amount=200)
+        rent = make_budget_card(test_user.id, 'Rent', 500, 500)
+        db.session.commit()
+        
+        summary = run_budget_resets(now=NOW)
+        db.session.expire_all()
+        
+        assert summary['cards_reset'] == 2
+        assert summary['cards_funded'] == 1
+        assert food.spent_amount == 0
+        assert food.allocated_amount == Decimal('380.00')
+        assert rent.allocated_amount == 0
+        assert food.last_reset_at == NOW
+        assert Wallet.query.filter_by(user_id=test_user.id).first().balance == Decimal('800.00')
+        txn = Transaction.query.filter_by(user_id=test_user.id, transaction_type='budget_allocation').one()
+        assert txn.amount == Decimal('200.00')
+        assert txn.transaction_metadata['period'] == '2030-02'
+    
+    def test_funds_cards_until_wallet_runs_out(self, app, clean_db, test_user):
+        """Test cards beyond the wallet balance are reset but not funded"""
+        first = make_budget_card(test_user.id, 'First', 0, 0, auto_amount=600)
+        second = make_budget_card(test_user.id, 'Second', 0, 0, auto_amount=600)
+        db.session.commit()
+        
+        summary = run_budget_resets(now=NOW)
+        db.session.expire_all()
+        
+        assert summary['cards_funded'] == 1
+        assert first.allocated_amount == Decimal('600.00')
+        assert second.allocated_amount == 0
+        assert Wallet.query.filter_by(user_id=test_user.id).first().balance == Decimal('400.00')
+    
+    def test_second_run_in_same_month_is_noop(self, app, clean_db, test_user):
+        """Test already-reset cards and cards created this month are skipped"""
+        make_budget_card(test_user.id, 'Food', 100, 50, auto_amount=100)
+        new_card = make_budget_card(test_user.id, 'New', 100, 40)
+        new_card.created_at = datetime(2030, 2, 1, 1, 0)
+        db.session.commit()
+        
+        run_budget_resets(now=NOW)
+        summary = run_budget_resets(now=NOW)
+        db.session.expire_all()
+        
+        assert summary['cards_reset'] == 0
+        assert new_card.spent_amount == Decimal('40.00')
+        assert Transaction.query.filter_by(transaction_type='budget_allocation').count() == 1
+    
+    def test_processes_users_in_chunks(self, app, clean_db, test_user, test_user2):
+        """Test every due card is handled when users span several chunks"""
+        make_budget_card(test_user.id, 'A', 100, 10, auto_amount=50)
+        make_budget_card(test_user2.id, 'B', 100, 20, auto_amount=50)
+        db.session.commit()
+        
+        summary = run_budget_resets(now=NOW, chunk_size=1)
+        
+        assert summary['chunks'] == 2
+        assert summary['cards_reset'] == 2
+        assert summary['amount_allocated'] == Decimal('100.00')
@@ -0,0 +1,77 @@
+"""
+Unit tests for the card authorisation cache
+Tests TTL/LRU behaviour and invalidation on card updates
+"""
+import pytest
+from datetime import datetime
+from app.extensions import db, card_auth_cache
+from app.models import VirtualCard
+from app.services.card_auth_cache import CardAuthCache, CardAuthState, decline_reason, load_card_auth_state
+
+
+@pytest.mark.unit
+class TestCardAuthCache:
+    """Test the cache container"""
+    
+    def test_loader_called_once_per_entry(self):
+        """Test hits are served from memory and unknown cards aren't cached"""
+        cache = CardAuthCache()
+        calls = []
+        
+        def loader(card_id):
+            calls.append(card_id)
+            return CardAuthState(1, 'payment', True, False) if card_id == 1 else None
+        
+        assert cache.get(1, loader) == cache.get(1, loader)
+        assert cache.get(2, loader) is None
+        assert cache.get(2, loader) is None
+        assert calls == [1, 2, 2]
+    
+    def test_evicts_least_recently_used(self, app):
+        """Test the cache stays within CARD_AUTH_CACHE_SIZE"""
+        cache = CardAuthCache()
+        cache._max_entries = 2
+        for card_id in (1, 2, 1, 3):
+            cache.get(card_id, lambda i: CardAuthState(1, 'payment', True, False))
+        
+        assert len(cache) == 2
+        assert 2 not in cache._entries
+    
+    def test_decline_reasons(self):
+        """Test frozen, inactive, foreign and wrong-purpose cards are declined"""
+        assert decline_reason(None, 1) == ('Card not found', 404)
+        assert decline_reason(CardAuthState(2, 'payment', True, False), 1)[1] == 404
+        assert decline_reason(CardAuthState(1, 'budget', True, False), 1)[1] == 400
+        assert decline_reason(CardAuthState(1, 'payment', False, False), 1)[1] == 403
+        assert decline_reason(CardAuthState(1, 'payment', True, True), 1)[1] == 403
+        assert decline_reason(CardAuthState(1, 'payment', True, False), 1) is None
+
+
+@pytest.mark.integration
+class TestCardAuthInvalidation:
+    """Test card updates drop cached state"""
+    
+    def test_update_invalidates_entry(self, app, clean_db, test_user):
+        """Test freezing a card through the ORM is visible on the next lookup"""
+        card = VirtualCard(user_id=test_user.id, card_purpose='payment', card_name='Main')
+        db.session.add(card)
+        db.session.commit()
+        assert card_auth_cache.get(card.id, load_card_auth_state).is_frozen is False
+        
+        card.is_frozen = True
+        db.session.commit()
+        
+        assert card_auth_cache.get(card.id, load_card_auth_state).is_frozen is True
+    
+    def test_spend_update_keeps_entry(self, app, clean_db, test_user):
+        """Test recording spend on a card doesn't drop its cached state"""
+        card = VirtualCard(user_id=test_user.id, card_purpose='payment', card_name='Main')
+        db.session.add(card)
+        db.session.commit()
+        card_auth_cache.get(card.id, load_card_auth_state)
+        
+        card.spent_amount = (card.spent_amount or 0) + 5
+        card.updated_at = datetime.utcnow()
+        db.session.commit()
+        
+        assert card.id in card_auth_cache._entries
@@ -0,0 +1,51 @@
+"""
+Unit tests for the card number allocator
+Tests Luhn validity, uniqueness and block reservation
+"""
+import pytest
+from app.services.card_numbers import (
+    CardNumberAllocator, card_number_for_serial, is_luhn_valid, luhn_check_digit
+)
+
+
+@pytest.mark.unit
+class TestLuhn:
+    """Test Luhn helpers"""
+    
+    def test_known_check_digits(self):
+        """Test check digits of well-known test card numbers"""
+        assert luhn_check_digit('411111111111111') == '1'
+        assert is_luhn_valid('4111111111111111') is True
+        assert is_luhn_valid('4111111111111112') is False
+    
+    def test_serials_map_to_unique_valid_numbers(self):
+        """Test distinct serials give distinct 16-digit Luhn-valid numbers"""
+        numbers = [card_number_for_serial(serial) for serial in range(5000)]
+        
+        assert len(set(numbers)) == len(numbers)
+        assert all(len(n) == 16 and is_luhn_valid(n) for n in numbers)
+
+
+@pytest.mark.unit
+class TestCardNumberAllocator:
+    """Test block reservation against the sequence table"""
+    
+    def test_reserves_blocks_and_serves_from_memory(self, app, clean_db):
+        """Test one reservation serves a whole block"""
+        allocator = CardNumberAllocator(sequence_name='test_sequence', block_size=10)
+        
+        numbers = [allocator.allocate() for _ in range(25)]
+        
+        assert len(set(numbers)) == 25
+        from app.models import CardNumberSequence
+        sequence = CardNumberSequence.query.filter_by(name='test_sequence').first()
+        assert sequence.next_value == 30
+    
+    def test_two_allocators_never_overlap(self, app, clean_db):
+        """Test allocators in different workers get disjoint blocks"""
+        worker_a = CardNumberAllocator(sequence_name='shared', block_size=5)
+        worker_b = CardNumberAllocator(sequence_name='shared', block_size=5)
+        
+        numbers = [worker_a.allocate() for _ in range(7)] + [worker_b.allocate() for _ in range(7)]
+        
+        assert len(set(numbers)) == 14
@@ -0,0 +1,100 @@
+"""
+Unit tests for debt netting
+Tests the min-cash-flow plan and locked batch settlement of a user's loans
+"""
+import pytest
+from decimal import Decimal
+from app.extensions import db
+from app.models import Loan, LoanRepayment, Transaction, User, Wallet
+from app.services.debt_netting import SettlementError, min_cash_flow, plan_settlement, settle_group
+
+
+def _user(username, balance):
+    user = User(username=username, email=f'{username}@example.com')
+    user.set_password('TestPass123!')
+    db.session.add(user)
+    db.session.flush()
+    db.session.add(Wallet(user_id=user.id, balance=Decimal(balance)))
+    return user
+
+
+def _loan(lender, borrower, amount, **kwargs):
+    kwargs.setdefault('amount_repaid', Decimal('0'))
+    loan = Loan(lender_id=lender.id, borrower_id=borrower.id, amount=Decimal(amount), status='active', **kwargs)
+    db.session.add(loan)
+    return loan
+
+
+@pytest.mark.unit
+class TestMinCashFlow:
+    """Test min_cash_flow"""
+    
+    def test_clears_balances_in_at_most_n_minus_one_transfers(self):
+        """Test largest debtors pay largest creditors until every balance is zero"""
+        balances = {1: Decimal('-40'), 2: Decimal('-10'), 3: Decimal('30'), 4: Decimal('20'), 5: Decimal('0')}
+        
+        transfers = min_cash_flow(balances)
+        
+        assert transfers == [(1, 3, Decimal('30')), (1, 4, Decimal('10')), (2, 4, Decimal('10'))]
+        for debtor, creditor, amount in transfers:
+            balances[debtor] += amount
+            balances[creditor] -= amount
+        assert set(balances.values()) == {0}
+
+
+@pytest.mark.unit
+class TestSettleGroup:
+    """Test plan_settlement and settle_group"""
+    
+    def test_settles_only_own_loans_with_net_transfers(self, app, clean_db):
+        """Test the user's loans are netted per counterparty and only the user pays"""
+        alice, bob, carol = _user('alice', '100'), _user('bob', '100'), _user('carol', '100')
+        loans = [
+            _loan(alice, carol, '20'),
+            _loan(carol, alice, '5', amount_repaid=Decimal('2')),
+            _loan(bob, carol, '10', accrued_interest=Decimal('0.5')),
+            _loan(carol, bob, '10.5'),
+        ]
+        owed_to_carol = _loan(carol, _user('dave', '100'), '30')
+        between_others = _loan(alice, bob, '15')
+        db.session.commit()
+        
+        plan = plan_settlement(carol.id)
+        assert plan['loan_count'] == 4
+        assert plan['loans_left_open'] == 1
+        assert [(t['from_username'], t['to_username'], t['amount']) for t in plan['transfers']] == [
+            ('carol', 'alice', 17.0)
+        ]
+        
+        result = settle_group(carol.id)
+        db.session.commit()
+        db.session.expire_all()
+        
+        assert result['loans_settled'] == 4
+        assert [w.balance for w in (alice.wallet, bob.wallet, carol.wallet)] == [
+            Decimal('117.00'), Decimal('100.00'), Decimal('83.00')
+        ]
+        assert all(loan.status == 'repaid' and loan.is_fully_repaid for loan in loans)
+        assert loans[2].interest_repaid == Decimal('0.5')
+        assert owed_to_carol.status == 'active' and between_others.status == 'active'
+        assert LoanRepayment.query.count() == 4
+        assert Transaction.query.filter_by(transaction_type='loan_repayment').count() == 1
+    
+    def test_never_debits_counterparties(self, app, clean_db):
+        """Test a lender can't force a borrower to repay, and a short wallet aborts the batch"""
+        alice, bob = _user('alice', '0'), _user('bob', '5')
+        loan = _loan(alice, bob, '30')
+        db.session.commit()
+        
+        with pytest.raises(SettlementError):
+            settle_group(alice.id)
+        db.session.rollback()
+        with pytest.raises(SettlementError):
+            settle_group(bob.id)
+        db.session.rollback()
+        
+        assert loan.status == 'active'
+        assert bob.wallet.balance == Decimal('5')
+        with pytest.raises(SettlementError):
+            settle_group(_user('carol', '0').id)
+        db.session.rollback()
@@ -0,0 +1,131 @@
+"""
+Unit tests for the cash-flow forecast
+Tests rule expansion over day buckets and the projected balances
+"""
+import time
+import pytest
+import numpy as np
+from datetime import date, datetime
+from app.extensions import db
+from app.models import Loan, LoanInstalment, RecurringSeries, SubscriptionCard, Transaction, VirtualCard
+from app.services.forecast import build_forecast, occurrence_dates
+
+TODAY = date(2030, 1, 15)
+
+
+@pytest.mark.unit
+class TestOccurrenceDates:
+    """Test occurrence_dates"""
+    
+    def test_monthly_anchor_clamps(self):
+        """Test monthly dates clamp to short months and match add_months"""
+        dates = occurrence_dates(date(2030, 1, 31), 'monthly', date(2030, 2, 1), date(2030, 4, 30))
+        
+        assert dates.tolist() == [date(2030, 2, 28), date(2030, 3, 31), date(2030, 4, 30)]
+    
+    def test_weekly_and_yearly(self):
+        """Test weekly intervals, until dates and leap-day yearly rules"""
+        weekly = occurrence_dates(date(2030, 1, 1), 'weekly', date(2030, 1, 10), date(2030, 3, 1),
+                                  interval=2, until=date(2030, 2, 12))
+        yearly = occurrence_dates(date(2028, 2, 29), 'yearly', date(2028, 3, 1), date(2032, 12, 31))
+        
+        assert weekly.tolist() == [date(2030, 1, 15), date(2030, 1, 29), date(2030, 2, 12)]
+        assert yearly.tolist() == [date(2029, 2, 28), date(2030, 2, 28), date(2031, 2, 28), date(2032, 2, 29)]
+
+
+@pytest.mark.unit
+class TestBuildForecast:
+    """Test build_forecast"""
+    
+    def test_projects_sources_and_flags_negative_days(self, app, clean_db, test_user, test_user2):
+        """Test wallet, expected payments, subscriptions, allocations and loans combine per day"""
+        db.session.add_all([
+            Transaction(user_id=test_user.id, transaction_type='payment', amount=200, status='scheduled',
+                        description='Insurance', created_at=datetime(2030, 1, 20)),
+            RecurringSeries(user_id=test_user.id, title='Rent', amount=600, frequency='monthly',
+                            start_date=date(2029, 12, 1)),
+            SubscriptionCard(user_id=test_user.id, service_name='Music', category='streaming',
+                             monthly_cost=10, total_paid=0, next_billing_date=date(2030, 1, 31)),
+            VirtualCard(user_id=test_user.id, card_purpose='budget', card_name='Food', allocated_amount=0,
+                        spent_amount=0, auto_allocate=True, auto_allocate_amount=100,
+                        last_reset_at=datetime(2030, 1, 1)),
+            Loan(lender_id=test_user2.id, borrower_id=test_user.id, amount=300, amount_repaid=100,
+                 status='active', due_date=date(2030, 2, 10)),
+        ])
+        db.session.commit()
+        
+        forecast = build_forecast(test_user.id, months=2, today=TODAY)
+        days = {day['date']: day for day in forecast['days']}
+        
+        assert forecast['starting_balance'] == 1000.0
+        assert forecast['end_date'] == '2030-03-14'
+        assert len(forecast['days']) == 59
+        assert days['2030-01-20']['balance'] == 800.0
+        assert days['2030-01-31']['balance'] == 790.0
+        # Rent and the budget allocation on the 1st
+        assert days['2030-02-01']['outflow'] == 700.0
+        assert days['2030-02-10']['balance'] == -110.0
+        assert forecast['first_negative_date'] == '2030-02-10'
+        assert forecast['totals'] == {
+            'income': 0.0, 'expected_payments': -1400.0, 'subscriptions': -20.0,
+            'budget_allocations': -200.0, 'loans': -200.0
+        }
+        assert forecast['lowest_balance'] == {'date': '2030-03-01', 'balance': -820.0}
+    
+    def test_planned_loan_follows_its_instalments(self, app, clean_db, test_user, test_user2):
+        """Test a lent loan with a plan lands on its open instalments, the last one with the interest"""
+        loan = Loan(lender_id=test_user.id, borrower_id=test_user2.id, amount=300, accrued_interest=6,
+                    amount_repaid=100, status='active', instalment_count=3, due_date=date(2030, 3, 10))
+        db.session.add(loan)
+        db.session.flush()
+        db.session.add_all([
+            LoanInstalment(loan_id=loan.id, sequence=1, due_date=date(2030, 1, 10), amount=100,
+                           amount_paid=100, status='paid'),
+            LoanInstalment(loan_id=loan.id, sequence=2, due_date=date(2030, 2, 10), amount=100),
+            LoanInstalment(loan_id=loan.id, sequence=3, due_date=date(2030, 3, 10), amount=100),
+        ])
+        db.session.commit()
+        
+        forecast = build_forecast(test_user.id, months=2, today=TODAY)
+        days = {day['date']: day for day in forecast['days']}
+        
+        assert days['2030-02-10']['inflow'] == 100.0
+        assert days['2030-03-10']['inflow'] == 106.0
+        assert forecast['totals']['loans'] == 206.0
+    
+    def test_average_income_and_persisted_occurrences(self, app, clean_db, test_user):
+        """Test historical income is spread per day and stored occurrences aren't counted twice"""
+        series = RecurringSeries(user_id=test_user.id, title='Gym', amount=30, frequency='weekly',
+                                 start_date=date(2030, 1, 15))
+        db.session.add(series)
+        db.session.flush()
+        db.session.add_all([
+            Transaction(user_id=test_user.id, transaction_type='income', amount=900, status='completed',
+                        created_at=datetime(2029, 12, 1)),
+            Transaction(user_id=test_user.id, transaction_type='payment', amount=30, status='scheduled',
+                        series_id=series.id, occurrence_date=date(2030, 1, 15), created_at=datetime(2030, 1, 15)),
+        ])
+        db.session.commit()
+        
+        forecast = build_forecast(test_user.id, months=1, today=TODAY)
+        
+        assert forecast['average_daily_income'] == 10.0
+        assert forecast['days'][0]['outflow'] == 30.0
+        assert forecast['totals']['expected_payments'] == -150.0
+    
+    def test_long_horizon_is_vectorised(self, app, clean_db, test_user):
+        """Test a 24-month forecast over many rules stays fast"""
+        db.session.add_all([
+            RecurringSeries(user_id=test_user.id, title=f'Bill {n}', amount=1, start_date=date(2029, 1, 1 + n % 28),
+                            frequency=('weekly', 'monthly', 'yearly')[n % 3])
+            for n in range(300)
+        ])
+        db.session.commit()
+        
+        start = time.perf_counter()
+        forecast = build_forecast(test_user.id, months=24, today=TODAY)
+        elapsed = time.perf_counter() - start
+        
+        assert len(forecast['days']) == 730
+        assert np.isclose(forecast['starting_balance'] + sum(forecast['totals'].values()), forecast['ending_balance'])
+        assert elapsed < 2
@@ -0,0 +1,86 @@
+"""
+Unit tests for deterministic card IBANs
+Tests the keyed permutation, checksums, storage on insert and lookup
+"""
+import random
+import pytest
+from app import create_app
+from app.extensions import db
+from app.models import VirtualCard
+from app.services.iban import derive_iban, is_valid_iban, legacy_iban, permute_account_number
+from config import DevelopmentConfig
+
+
+@pytest.mark.unit
+class TestDeriveIban:
+    """Test IBAN derivation"""
+    
+    def test_format_and_checksum(self):
+        """Test IBANs look like GBkkUNIP + 10 digits and pass mod-97"""
+        iban = derive_iban(42, 'key')
+        
+        assert len(iban) == 18
+        assert iban.startswith('GB') and iban[4:8] == 'UNIP'
+        assert iban[8:].isdigit()
+        assert is_valid_iban(iban)
+        assert not is_valid_iban(iban[:-1] + str((int(iban[-1]) + 1) % 10))
+    
+    def test_deterministic_per_key(self):
+        """Test same id and key give the same IBAN, another key a different one"""
+        assert derive_iban(7, 'key') == derive_iban(7, 'key')
+        assert derive_iban(7, 'key') != derive_iban(7, 'other-key')
+    
+    def test_no_collisions(self):
+        """Test the account permutation is injective"""
+        accounts = {permute_account_number(card_id, b'key') for card_id in range(20000)}
+        
+        assert len(accounts) == 20000
+    
+    def test_does_not_touch_global_rng(self):
+        """Test deriving IBANs leaves the random module state alone"""
+        state = random.getstate()
+        derive_iban(1, 'key')
+        legacy_iban(1)
+        
+        assert random.getstate() == state
+    
+    def test_legacy_iban_matches_previously_shown_value(self):
+        """Test existing cards keep the IBAN the old seeded generator showed"""
+        assert legacy_iban(1) == 'GB29UNIP1417776317'
+        assert legacy_iban(2) == 'GB01UNIP1524493909'
+    
+    def test_app_requires_iban_key(self, monkeypatch):
+        """Test the app refuses to start without a dedicated IBAN_HASH_KEY"""
+        monkeypatch.setattr(DevelopmentConfig, 'IBAN_HASH_KEY', None)
+        
+        with pytest.raises(RuntimeError, match='IBAN_HASH_KEY'):
+            create_app()
+
+
+@pytest.mark.integration
+class TestCardIban:
+    """Test IBAN storage and lookup on virtual cards"""
+    
+    def test_iban_stored_on_insert(self, app, clean_db, test_user):
+        """Test a new card gets its IBAN in the same flush"""
+        card = VirtualCard(user_id=test_user.id, card_purpose='budget', card_name='Food')
+        db.session.add(card)
+        db.session.commit()
+        
+        stored = db.session.execute(
+            db.select(VirtualCard.iban).where(VirtualCard.id == card.id)
+        ).scalar_one()
+        assert stored is not None
+        assert card.iban == stored == card.get_iban()
+        assert is_valid_iban(stored)
+    
+    def test_find_by_iban(self, app, clean_db, test_user):
+        """Test lookup ignores spaces and case"""
+        card = VirtualCard(user_id=test_user.id, card_purpose='budget', card_name='Rent')
+        db.session.add(card)
+        db.session.commit()
+        
+        spaced = ' '.join(card.iban[i:i + 4] for i in range(0, len(card.iban), 4)).lower()
+        
+        assert VirtualCard.find_by_iban(spaced).id == card.id
+        assert VirtualCard.find_by_iban('GB00UNIP0000000000') is None
@@ -0,0 +1,78 @@
+"""
+Unit tests for the marketplace image store
+Tests content addressing, deduplication and data URI decoding
+"""
+import base64
+import io
+import os
+import pytest
+from PIL import Image
+from app.services import image_store as image_store_module
+from app.services.image_store import ImageStore, decode_data_uri, image_urls, is_image_name
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 24
+JPEG = b'\xff\xd8\xff\xe0' + b'\x01' * 24
+
+
+@pytest.fixture
+def store(app, tmp_path):
+    app.config['IMAGE_STORE_PATH'] = str(tmp_path)
+    return ImageStore(app)
+
+
+@pytest.mark.unit
+class TestDecodeDataUri:
+    """Test decode_data_uri"""
+    
+    def test_type_comes_from_content(self):
+        """Test the sniffed type wins over the header and bare base64 is accepted"""
+        encoded = base64.b64encode(PNG).decode()
+        
+        assert decode_data_uri(f'data:image/jpeg;base64,{encoded}') == (PNG, 'image/png')
+        assert decode_data_uri(encoded) == (PNG, 'image/png')
+    
+    def test_rejects_unknown_types(self):
+        """Test data that isn't a stored image type raises ValueError"""
+        with pytest.raises(ValueError):
+            decode_data_uri(base64.b64encode(b'hello world').decode())
+        with pytest.raises(ValueError):
+            decode_data_uri('data:image/svg+xml;base64,PHN2Zy8+')
+
+
+@pytest.mark.unit
+class TestImageStore:
+    """Test ImageStore"""
+    
+    def test_same_content_is_stored_once(self, store, tmp_path):
+        """Test names are content hashes and a second put writes nothing"""
+        name = store.put(PNG, 'image/png')
+        path, mimetype = store.resolve(name)
+        mtime = os.stat(path).st_mtime_ns
+        
+        assert is_image_name(name) and name.endswith('.png')
+        assert store.put(PNG, 'image/png') == name
+        assert os.stat(path).st_mtime_ns == mtime
+        assert store.put(JPEG, 'image/jpeg') != name
+        assert (store.read(name), mimetype) == (PNG, 'image/png')
+        assert image_urls(name) == {'url': f'/api/images/{name}', 'thumbnail_url': f'/api/images/{name}/thumbnail'}
+    
+    def test_thumbnail_is_generated(self, store):
+        """Test a decodable image gets a JPEG thumbnail within THUMBNAIL_SIZE"""
+        out = io.BytesIO()
+        Image.new('RGBA', (1000, 500), (255, 0, 0, 128)).save(out, 'PNG')
+        name = store.put(out.getvalue(), 'image/png')
+        path, mimetype = store.resolve(name, thumbnail=True)
+        
+        assert mimetype == 'image/jpeg' and path != store.resolve(name)[0]
+        with Image.open(path) as thumbnail:
+            assert thumbnail.format == 'JPEG' and thumbnail.size == (320, 160)
+    
+    def test_thumbnail_falls_back_to_original(self, store):
+        """Test undecodable images serve the original, and bad names resolve to nothing"""
+        name = store.put(JPEG, 'image/jpeg')
+        
+        assert image_store_module.make_thumbnail(JPEG) is None
+        
+        assert store.resolve(name, thumbnail=True) == store.resolve(name)
+        assert store.resolve('../' + name) is None
+        assert store.resolve('0' * 64 + '.png') is None
@@ -0,0 +1,100 @@
+"""
+Unit tests for loan instalment plans
+Tests schedule building and the batch auto-debit runner
+"""
+import pytest
+from datetime import date, datetime
+from decimal import Decimal
+from app.extensions import db
+from app.models import Loan, LoanInstalment, LoanRepayment, Notification, Transaction
+from app.services.loan_instalments import instalment_dates, run_auto_debits, schedule_instalments, split_amount
+
+
+def _planned_loan(lender, borrower, amount, count, start, **kwargs):
+    loan = Loan(lender_id=lender.id, borrower_id=borrower.id, amount=Decimal(amount), amount_repaid=Decimal('0'),
+                status='active', instalment_count=count, instalment_frequency='monthly', **kwargs)
+    db.session.add(loan)
+    db.session.flush()
+    loan.due_date = schedule_instalments(loan, start)
+    db.session.commit()
+    return loan
+
+
+@pytest.mark.unit
+class TestSchedule:
+    """Test split_amount and instalment_dates"""
+    
+    def test_even_split_with_remainder_last(self):
+        """Test the cents left over go on the last instalment"""
+        assert split_amount(Decimal('100'), 3) == [Decimal('33.33'), Decimal('33.33'), Decimal('33.34')]
+    
+    def test_monthly_dates_keep_the_anchor_day(self):
+        """Test monthly dates clamp to short months without drifting"""
+        assert instalment_dates(date(2030, 1, 31), 'monthly', 3) == [date(2030, 2, 28), date(2030, 3, 31), date(2030, 4, 30)]
+        assert instalment_dates(date(2030, 1, 31), 'weekly', 2) == [date(2030, 2, 7), date(2030, 2, 14)]
+
+
+@pytest.mark.unit
+class TestRunAutoDebits:
+    """Test run_auto_debits"""
+    
+    def test_collects_due_instalments_interest_first(self, app, clean_db, test_user, test_user2):
+        """Test due instalments are debited in one batch and the last one clears the loan"""
+        loan = _planned_loan(test_user, test_user2, '100', 3, date(2030, 1, 31), accrued_interest=Decimal('0.5'))
+        assert loan.due_date == date(2030, 4, 30)
+        
+        summary = run_auto_debits(datetime(2030, 3, 31, 6, 0), chunk_size=1)
+        db.session.expire_all()
+        
+        assert summary == {'chunks': 2, 'instalments': 2, 'paid': 2, 'failed': 0, 'amount_collected': Decimal('66.66')}
+        assert test_user2.wallet.balance == Decimal('433.34')
+        assert test_user.wallet.balance == Decimal('1066.66')
+        assert loan.amount_repaid == Decimal('66.66')
+        assert loan.interest_repaid == Decimal('0.5')
+        assert [i.status for i in loan.instalments] == ['paid', 'paid', 'scheduled']
+        assert Transaction.query.filter_by(transaction_type='loan_repayment').count() == 2
+        
+        run_auto_debits(datetime(2030, 4, 30, 6, 0))
+        db.session.expire_all()
+        
+        assert loan.instalments[2].amount_paid == Decimal('33.84')
+        assert loan.status == 'repaid' and loan.is_fully_repaid
+        assert LoanRepayment.query.filter_by(loan_id=loan.id).count() == 3
+    
+    def test_short_wallet_is_retried_next_day(self, app, clean_db, test_user, test_user2):
+        """Test a partial debit keeps the instalment scheduled and notifies the borrower once"""
+        loan = _planned_loan(test_user, test_user2, '1200', 2, date(2030, 1, 1))
+        
+        first = run_auto_debits(datetime(2030, 2, 1, 6, 0))
+        again = run_auto_debits(datetime(2030, 2, 1, 18, 0))
+        db.session.expire_all()
+        instalment = loan.instalments[0]
+        
+        assert (first['failed'], again['instalments']) == (1, 0)
+        assert instalment.status == 'scheduled'
+        assert (instalment.amount_paid, instalment.attempts) == (Decimal('500.00'), 1)
+        assert test_user2.wallet.balance == Decimal('0.00')
+        assert Notification.query.filter_by(notification_type='loan_instalment_failed').count() == 1
+        
+        test_user2.wallet.balance = Decimal('200')
+        db.session.commit()
+        run_auto_debits(datetime(2030, 2, 2, 6, 0))
+        db.session.expire_all()
+        
+        assert instalment.status == 'paid'
+        assert instalment.amount_paid == Decimal('600.00')
+        assert Notification.query.count() == 1
+    
+    def test_repaid_loan_cancels_its_schedule(self, app, clean_db, test_user, test_user2):
+        """Test instalments of a loan repaid by hand are cancelled, not debited"""
+        loan = _planned_loan(test_user, test_user2, '100', 2, date(2030, 1, 1))
+        loan.amount_repaid = Decimal('100')
+        db.session.commit()
+        
+        summary = run_auto_debits(datetime(2030, 2, 1, 6, 0))
+        db.session.expire_all()
+        
+        assert summary['amount_collected'] == 0
+        assert loan.instalments[0].status == 'cancelled'
+        assert test_user2.wallet.balance == Decimal('500.00')
+        assert LoanInstalment.query.filter_by(status='scheduled').count() == 1
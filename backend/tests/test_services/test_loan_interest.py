@@ -0,0 +1,71 @@
+"""
+Unit tests for daily loan interest accrual
+Tests the vectorised accrual pass and interest-first repayment allocation
+"""
+import pytest
+import numpy as np
+from datetime import date, datetime
+from decimal import Decimal
+from app.extensions import db
+from app.models import Loan
+from app.services.loan_interest import accrue_interest, daily_interest
+
+
+def _loan(lender, borrower, amount, rate, through, **kwargs):
+    return Loan(lender_id=lender.id, borrower_id=borrower.id, amount=Decimal(amount), amount_repaid=Decimal('0'),
+                interest_rate=Decimal(rate), status='active', interest_accrued_through=through, **kwargs)
+
+
+@pytest.mark.unit
+class TestDailyInterest:
+    """Test daily_interest"""
+    
+    def test_simple_interest_on_positive_principal(self):
+        """Test interest is principal x rate / 365 x days and never negative"""
+        interest = daily_interest(np.array([365.0, 1000.0, -5.0]), np.array([10.0, 5.0, 10.0]), np.array([1, 30, 3]))
+        
+        assert interest.tolist() == [0.1, 4.1096, 0.0]
+
+
+@pytest.mark.unit
+class TestAccrueInterest:
+    """Test accrue_interest"""
+    
+    def test_accrues_open_loans_once_per_day(self, app, clean_db, test_user, test_user2):
+        """Test open loans accrue up to today, in chunks, and only once"""
+        now = datetime(2030, 3, 11, 2, 0)
+        caught_up = _loan(test_user, test_user2, '730', '10', date(2030, 3, 1))
+        daily = _loan(test_user, test_user2, '365', '20', date(2030, 3, 10), accrued_interest=Decimal('1.5'))
+        interest_free = _loan(test_user, test_user2, '500', '0', date(2030, 3, 1))
+        repaid = _loan(test_user, test_user2, '100', '10', date(2030, 3, 1), is_fully_repaid=True)
+        db.session.add_all([caught_up, daily, interest_free, repaid])
+        db.session.commit()
+        
+        summary = accrue_interest(now, chunk_size=1)
+        db.session.expire_all()
+        
+        assert summary == {'chunks': 2, 'loans': 2, 'interest_accrued': 2.2}
+        assert caught_up.accrued_interest == Decimal('2.0000')
+        assert daily.accrued_interest == Decimal('1.7000')
+        assert caught_up.interest_accrued_through == date(2030, 3, 11)
+        assert interest_free.accrued_interest in (None, 0)
+        assert accrue_interest(now)['loans'] == 0
+    
+    def test_repayment_pays_interest_first(self, app, clean_db, test_user, test_user2):
+        """Test interest is charged on principal only and repayments clear interest first"""
+        loan = _loan(test_user, test_user2, '365', '10', date(2030, 3, 1), accrued_interest=Decimal('3.0051'))
+        db.session.add(loan)
+        db.session.commit()
+        
+        assert loan.balance_due() == Decimal('368.01')
+        assert loan.apply_repayment(Decimal('65.00')) == (Decimal('3.01'), Decimal('61.99'))
+        assert loan.balance_due() == Decimal('303.01')
+        db.session.commit()
+        
+        accrue_interest(datetime(2030, 3, 2))
+        db.session.expire_all()
+        
+        # One day on the 303.01 principal still owed
+        assert loan.accrued_interest == Decimal('3.0881')
+        assert loan.apply_repayment(loan.balance_due()) == (Decimal('0.08'), Decimal('303.01'))
+        assert loan.balance_due() == 0
@@ -0,0 +1,114 @@
+"""
+Unit tests for marketplace search
+Tests text and facet filters, keyset pagination and the maintained facet counters
+"""
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from app.extensions import db
+from app.models import MarketplaceFacetCount, MarketplaceListing
+from app.services.marketplace_search import facet_counts, rebuild_facet_counts, search_listings, search_terms
+
+BASE = datetime(2030, 5, 1, 12, 0)
+
+
+def _listing(seller, title, minutes, **kwargs):
+    kwargs.setdefault('price', Decimal('10'))
+    listing = MarketplaceListing(seller_id=seller.id, title=title, created_at=BASE + timedelta(minutes=minutes), **kwargs)
+    db.session.add(listing)
+    return listing
+
+
+@pytest.mark.unit
+class TestSearchListings:
+    """Test search_listings"""
+    
+    def test_text_and_facet_filters(self, app, clean_db, test_user):
+        """Test words prefix-match title, description or course and combine with the other filters"""
+        calculus = _listing(test_user, 'Calculus textbook', 1, description='Stewart, 8th edition', category='textbooks',
+                            condition='good', price=Decimal('40'))
+        _listing(test_user, 'Desk lamp', 2, description='LED, barely used', category='furniture', condition='new')
+        course = _listing(test_user, 'Lecture notes', 3, course='Calculus II', category='textbooks', condition='new',
+                          price=Decimal('5'))
+        _listing(test_user, 'Calculus solutions', 4, category='textbooks', is_sold=True, is_available=False)
+        db.session.commit()
+        
+        assert search_terms('Calc" OR *') == ['calc', 'or']
+        assert search_listings('calc')[0] == [course, calculus]
+        assert search_listings('STEW edition')[0] == [calculus]
+        assert search_listings('calc', conditions=['good'])[0] == [calculus]
+        assert search_listings(category='textbooks', min_price=Decimal('6'), max_price=Decimal('50'))[0] == [calculus]
+        assert search_listings('nothing matches')[0] == []
+        with pytest.raises(ValueError):
+            search_listings(min_price=Decimal('9'), max_price=Decimal('1'))
+    
+    def test_keyset_pages(self, app, clean_db, test_user):
+        """Test pages follow each other newest first without overlap"""
+        listings = [_listing(test_user, f'Item {n}', n % 3) for n in range(5)]
+        db.session.commit()
+        
+        first, cursor = search_listings(limit=2)
+        second, cursor = search_listings(cursor=cursor, limit=2)
+        third, last_cursor = search_listings(cursor=cursor, limit=2)
+        
+        ordered = sorted(listings, key=lambda listing: (listing.created_at, listing.id), reverse=True)
+        assert first + second + third == ordered
+        assert last_cursor is None
+        with pytest.raises(ValueError):
+            search_listings(cursor='not-a-cursor')
+    
+    def test_open_listing_page_uses_partial_index(self, app, clean_db):
+        """Test the browse query is served by the open-listings index (no sort step)"""
+        query = MarketplaceListing.query.filter(
+            MarketplaceListing.is_available == True, MarketplaceListing.is_sold == False,
+            MarketplaceListing.category == 'textbooks'
+        ).order_by(MarketplaceListing.created_at.desc(), MarketplaceListing.id.desc()).limit(21)
+        sql = str(query.statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+        
+        plan = ' '.join(row[-1] for row in db.session.execute(db.text(f'EXPLAIN QUERY PLAN {sql}')))
+        
+        assert 'ix_marketplace_listings_open_category' in plan
+        assert 'TEMP B-TREE' not in plan
+
+
+@pytest.mark.unit
+class TestFacetCounts:
+    """Test the marketplace_facet_counts counters"""
+    
+    def test_counters_follow_listing_changes(self, app, clean_db, test_user):
+        """Test creating, re-filing, selling and deleting listings moves the counts"""
+        book = _listing(test_user, 'Book', 1, category='textbooks', university='MIT', condition='good')
+        lamp = _listing(test_user, 'Lamp', 2, category='furniture', university='MIT')
+        db.session.commit()
+        
+        assert facet_counts() == {
+            'category': {'furniture': 1, 'textbooks': 1},
+            'university': {'MIT': 2},
+            'condition': {'good': 1}
+        }
+        
+        lamp.category = 'electronics'
+        book.is_sold = True
+        book.is_available = False
+        db.session.commit()
+        
+        assert facet_counts() == {'category': {'electronics': 1}, 'university': {'MIT': 1}, 'condition': {}}
+        
+        db.session.delete(lamp)
+        db.session.commit()
+        
+        assert facet_counts() == {'category': {}, 'university': {}, 'condition': {}}
+    
+    def test_rebuild_matches_listings(self, app, clean_db, test_user):
+        """Test counters rebuilt from scratch agree with the maintained ones"""
+        _listing(test_user, 'Book', 1, category='textbooks', condition='new')
+        _listing(test_user, 'Notes', 2, category='textbooks', condition='')
+        _listing(test_user, 'Sold', 3, category='textbooks', is_sold=True)
+        db.session.commit()
+        maintained = facet_counts()
+        
+        db.session.query(MarketplaceFacetCount).delete()
+        assert rebuild_facet_counts() == 2
+        db.session.commit()
+        
+        assert facet_counts() == maintained == {'category': {'textbooks': 2}, 'university': {}, 'condition': {'new': 1}}
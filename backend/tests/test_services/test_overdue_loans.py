@@ -0,0 +1,63 @@
+"""
+Unit tests for the overdue-loan scanner
+Tests bulk overdue flagging and reminder batching
+"""
+import pytest
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from app.extensions import db
+from app.models import Loan, Notification
+from app.services.overdue_loans import REMINDER_INTERVAL, scan_overdue_loans
+
+NOW = datetime(2030, 5, 10, 6, 0)
+
+
+@pytest.mark.unit
+class TestOverdueLoanScan:
+    """Test scan_overdue_loans"""
+    
+    def test_flags_open_past_due_loans_and_queues_reminders(self, app, clean_db, test_user, test_user2):
+        """Test only active, unpaid loans past their due date are flagged"""
+        lender, borrower = test_user.id, test_user2.id
+        overdue = Loan(lender_id=lender, borrower_id=borrower, amount=Decimal('50'), amount_repaid=Decimal('20'),
+                       status='active', due_date=date(2030, 5, 1))
+        not_due = Loan(lender_id=lender, borrower_id=borrower, amount=Decimal('10'),
+                       status='active', due_date=date(2030, 5, 10))
+        repaid = Loan(lender_id=lender, borrower_id=borrower, amount=Decimal('10'), amount_repaid=Decimal('10'),
+                      status='repaid', is_fully_repaid=True, due_date=date(2030, 5, 1))
+        pending = Loan(lender_id=lender, borrower_id=borrower, amount=Decimal('10'),
+                       status='pending', due_date=date(2030, 5, 1))
+        db.session.add_all([overdue, not_due, repaid, pending])
+        db.session.commit()
+        
+        summary = scan_overdue_loans(NOW, chunk_size=1)
+        db.session.expire_all()
+        
+        assert summary == {'chunks': 1, 'loans': 1, 'newly_overdue': 1, 'notifications': 2}
+        assert overdue.overdue_at == NOW
+        assert overdue.is_overdue
+        assert not (not_due.is_overdue or repaid.is_overdue or pending.is_overdue)
+        
+        reminder = Notification.query.filter_by(user_id=borrower).one()
+        assert reminder.notification_type == 'loan_overdue'
+        assert reminder.notification_metadata == {'loan_id': overdue.id, 'due_date': '2030-05-01',
+                                                  'days_overdue': 9, 'amount_remaining': 30.0}
+        assert Notification.query.filter_by(user_id=lender).one().notification_type == 'loan_overdue_lender'
+    
+    def test_reminders_repeat_on_interval_only(self, app, clean_db, test_user, test_user2):
+        """Test reruns skip recently reminded loans and remind the borrower again later"""
+        loan = Loan(lender_id=test_user.id, borrower_id=test_user2.id, amount=Decimal('25'),
+                    status='active', due_date=date(2030, 5, 1))
+        db.session.add(loan)
+        db.session.commit()
+        
+        scan_overdue_loans(NOW)
+        assert scan_overdue_loans(NOW + timedelta(days=1))['loans'] == 0
+        
+        later = scan_overdue_loans(NOW + REMINDER_INTERVAL)
+        db.session.expire_all()
+        
+        assert later == {'chunks': 1, 'loans': 1, 'newly_overdue': 0, 'notifications': 1}
+        assert loan.overdue_at == NOW
+        assert Notification.query.filter_by(user_id=test_user2.id).count() == 2
+        assert Notification.query.filter_by(user_id=test_user.id).count() == 1
@@ -0,0 +1,68 @@
+"""
+Unit tests for the shared rate limiter storage and per-user key function
+"""
+import pytest
+from limits import RateLimitItemPerMinute
+from limits.storage import storage_from_string
+from limits.strategies import SlidingWindowCounterRateLimiter
+from app.services.rate_limit import SQLiteStorage, user_or_remote_address
+
+
+@pytest.mark.unit
+class TestSQLiteRateLimitStorage:
+    """Test counters are shared between storage instances (worker processes)"""
+    
+    def test_sqlite_uri_resolves_to_storage(self, tmp_path):
+        """Test sqlite:// URIs are handled by SQLiteStorage"""
+        storage = storage_from_string(f'sqlite:///{tmp_path}/rl.db')
+        
+        assert isinstance(storage, SQLiteStorage)
+        assert storage.check() is True
+    
+    def test_limit_shared_across_workers(self, tmp_path):
+        """Test two workers draw from the same sliding window"""
+        uri = f'sqlite:///{tmp_path}/rl.db'
+        worker_a = SlidingWindowCounterRateLimiter(storage_from_string(uri))
+        worker_b = SlidingWindowCounterRateLimiter(storage_from_string(uri))
+        limit = RateLimitItemPerMinute(4)
+        
+        results = [
+            worker_a.hit(limit, 'user:1'),
+            worker_b.hit(limit, 'user:1'),
+            worker_a.hit(limit, 'user:1'),
+            worker_b.hit(limit, 'user:1'),
+            worker_a.hit(limit, 'user:1'),
+        ]
+        
+        assert results == [True, True, True, True, False]
+        assert worker_b.hit(limit, 'user:2') is True
+    
+    def test_incr_and_clear(self, tmp_path):
+        """Test plain counters used by the fixed-window strategy"""
+        storage = storage_from_string(f'sqlite:///{tmp_path}/rl.db')
+        
+        assert storage.incr('k', 60) == 1
+        assert storage.incr('k', 60, amount=2) == 3
+        assert storage.get('k') == 3
+        
+        storage.clear('k')
+        assert storage.get('k') == 0
+
+
+@pytest.mark.unit
+class TestRateLimitKey:
+    """Test requests are keyed per user when authenticated"""
+    
+    def test_anonymous_request_keyed_by_ip(self, app):
+        """Test requests without a token fall back to the client address"""
+        with app.test_request_context('/', environ_base={'REMOTE_ADDR': '10.1.2.3'}):
+            assert user_or_remote_address() == 'ip:10.1.2.3'
+    
+    def test_authenticated_request_keyed_by_user(self, app):
+        """Test requests with a valid token are keyed by JWT identity"""
+        from flask_jwt_extended import create_access_token
+        
+        token = create_access_token(identity='42')
+        with app.test_request_context('/', headers={'Authorization': f'Bearer {token}'},
+                                      environ_base={'REMOTE_ADDR': '10.1.2.3'}):
+            assert user_or_remote_address() == 'user:42'
@@ -0,0 +1,129 @@
+"""
+Unit tests for lazy recurrence expansion
+Tests rule arithmetic, the occurrences produced for a window and bulk persistence
+"""
+import pytest
+from datetime import date, datetime
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models import RecurringSeries, Subscription, Transaction, VirtualCard
+from app.services.recurrence import expand, persist_occurrences, series_occurrences, upcoming_occurrences
+
+
+@pytest.mark.unit
+class TestExpand:
+    """Test expand()"""
+    
+    def test_monthly_month_end(self):
+        """Test a series started on the 31st clamps without drifting"""
+        dates = expand(date(2030, 1, 31), 'monthly', date(2030, 2, 1), date(2030, 5, 31))
+        
+        assert dates == [date(2030, 2, 28), date(2030, 3, 31), date(2030, 4, 30), date(2030, 5, 31)]
+    
+    def test_weekly_window_far_from_start(self):
+        """Test weekly series jump straight to the window and honour until_date"""
+        dates = expand(date(2020, 1, 6), 'weekly', date(2030, 1, 1), date(2030, 12, 31),
+                       until=date(2030, 1, 20))
+        
+        assert dates == [date(2030, 1, 7), date(2030, 1, 14)]
+    
+    def test_yearly_and_interval(self):
+        """Test yearly leap-day series and multi-month intervals"""
+        assert expand(date(2028, 2, 29), 'yearly', date(2029, 1, 1), date(2032, 12, 31)) == [
+            date(2029, 2, 28), date(2030, 2, 28), date(2031, 2, 28), date(2032, 2, 29)
+        ]
+        assert expand(date(2030, 1, 15), 'monthly', date(2030, 1, 1), date(2030, 12, 31), interval=3) == [
+            date(2030, 1, 15), date(2030, 4, 15), date(2030, 7, 15), date(2030, 10, 15)
+        ]
+    
+    def test_window_before_start(self):
+        """Test windows ending before the series starts are empty"""
+        assert expand(date(2030, 6, 1), 'monthly', date(2030, 1, 1), date(2030, 5, 31)) == []
+
+
+@pytest.mark.unit
+class TestOccurrences:
+    """Test occurrence queries"""
+    
+    def test_persisted_occurrences_take_precedence(self, app, clean_db, test_user):
+        """Test settled occurrences are not duplicated by virtual ones"""
+        series = RecurringSeries(user_id=test_user.id, title='Rent', amount=500, frequency='monthly',
+                                 start_date=date(2030, 1, 1))
+        db.session.add(series)
+        db.session.flush()
+        db.session.add(Transaction(user_id=test_user.id, transaction_type='payment', amount=500,
+                                   status='completed', description='Rent', series_id=series.id,
+                                   occurrence_date=date(2030, 2, 1), created_at=datetime(2030, 2, 1)))
+        db.session.commit()
+        
+        occurrences = series_occurrences(test_user.id, date(2030, 1, 1), date(2030, 3, 31))
+        
+        assert [o['occurrence_date'] for o in occurrences] == ['2030-01-01', '2030-03-01']
+        assert all(o['id'] is None and o['status'] == 'scheduled' for o in occurrences)
+        assert Transaction.query.count() == 1
+    
+    def test_upcoming_merges_subscriptions(self, app, clean_db, test_user):
+        """Test card subscriptions are expanded from next_billing_date and inactive series skipped"""
+        card = VirtualCard(user_id=test_user.id, card_purpose='subscription', card_name='Subs',
+                           allocated_amount=0, spent_amount=0)
+        db.session.add(card)
+        db.session.flush()
+        db.session.add_all([
+            Subscription(card_id=card.id, service_name='Music', amount=10, billing_cycle='monthly',
+                         next_billing_date=date(2030, 1, 31), billing_anchor_day=31),
+            Subscription(card_id=card.id, service_name='Paused', amount=99, billing_cycle='monthly',
+                         next_billing_date=date(2030, 1, 15), is_active=False),
+            RecurringSeries(user_id=test_user.id, title='Old', amount=5, frequency='weekly',
+                            start_date=date(2030, 1, 1), is_active=False),
+        ])
+        db.session.commit()
+        
+        occurrences = upcoming_occurrences(test_user.id, date(2030, 2, 1), date(2030, 3, 31))
+        
+        assert [(o['description'], o['occurrence_date']) for o in occurrences] == [
+            ('Music - monthly subscription', '2030-02-28'),
+            ('Music - monthly subscription', '2030-03-31'),
+        ]
+        assert occurrences[0]['metadata']['subscription_id'] is not None
+
+
+@pytest.mark.unit
+class TestPersistOccurrences:
+    """Test persist_occurrences"""
+    
+    def test_bulk_insert_skips_existing(self, app, clean_db, test_user, count_queries):
+        """Test 52 weekly rows are written in one INSERT and re-runs add nothing"""
+        series = RecurringSeries(user_id=test_user.id, title='Groceries', amount=40, frequency='weekly',
+                                 start_date=date(2030, 1, 1))
+        db.session.add(series)
+        db.session.flush()
+        db.session.add(Transaction(user_id=test_user.id, transaction_type='payment', amount=40,
+                                   status='scheduled', description='Groceries', series_id=series.id,
+                                   occurrence_date=date(2030, 1, 1), created_at=datetime(2030, 1, 1)))
+        db.session.commit()
+        
+        created, statements = count_queries(
+            lambda: persist_occurrences(series, date(2030, 1, 1), date(2030, 12, 30))
+        )
+        db.session.commit()
+        inserts = [s for s in statements if s.lstrip().upper().startswith('INSERT')]
+        
+        assert created == 51
+        assert len(inserts) == 1
+        assert Transaction.query.filter_by(series_id=series.id).count() == 52
+        assert persist_occurrences(series, date(2030, 1, 1), date(2030, 12, 30)) == 0
+    
+    def test_unique_occurrence(self, app, clean_db, test_user):
+        """Test the same occurrence can't be stored twice"""
+        series = RecurringSeries(user_id=test_user.id, title='Rent', amount=500, frequency='monthly',
+                                 start_date=date(2030, 1, 1))
+        db.session.add(series)
+        db.session.flush()
+        for _ in range(2):
+            db.session.add(Transaction(user_id=test_user.id, transaction_type='payment', amount=500,
+                                       status='scheduled', series_id=series.id,
+                                       occurrence_date=date(2030, 1, 1)))
+        
+        with pytest.raises(IntegrityError):
+            db.session.commit()
+        db.session.rollback()
@@ -0,0 +1,82 @@
+"""
+Unit tests for round-up micro-savings
+Tests round-up arithmetic, queuing and batched settlement
+"""
+import pytest
+from decimal import Decimal
+from app.extensions import db
+from app.models import RoundUpEntry, SavingsPocket, Transaction, Wallet
+from app.services.round_ups import pending_round_ups, record_round_up, round_up_amount, settle_round_ups
+
+
+def _enable(user, unit=None):
+    pocket = SavingsPocket(user_id=user.id, balance=0)
+    db.session.add(pocket)
+    db.session.flush()
+    wallet = Wallet.query.filter_by(user_id=user.id).first()
+    wallet.round_up_pocket_id = pocket.id
+    wallet.round_up_unit = unit
+    db.session.commit()
+    return wallet, pocket
+
+
+@pytest.mark.unit
+class TestRoundUpAmount:
+    """Test round_up_amount"""
+    
+    def test_rounds_to_next_unit(self):
+        """Test differences to the next dollar and to larger units"""
+        assert round_up_amount(Decimal('3.40')) == Decimal('0.60')
+        assert round_up_amount(Decimal('12.00')) == Decimal('0.00')
+        assert round_up_amount(Decimal('12.01'), Decimal('5.00')) == Decimal('2.99')
+
+
+@pytest.mark.unit
+class TestRoundUpSettlement:
+    """Test record_round_up and settle_round_ups"""
+    
+    def test_queue_then_settle(self, app, clean_db, test_user):
+        """Test round-ups stay pending until settled into the pocket and ledger"""
+        wallet, pocket = _enable(test_user)
+        for amount in ('3.40', '7.75', '5.00'):
+            record_round_up(wallet, Decimal(amount), 'card_payment')
+        db.session.commit()
+        
+        assert pending_round_ups(test_user.id) == {'pending_amount': 0.85, 'pending_count': 2}
+        assert pocket.balance == 0
+        
+        summary = settle_round_ups()
+        db.session.expire_all()
+        
+        assert summary['amount_settled'] == Decimal('0.85')
+        assert pocket.balance == Decimal('0.85')
+        assert wallet.balance == Decimal('999.15')
+        ledger = Transaction.query.filter_by(transaction_type='savings_deposit').one()
+        assert ledger.transaction_metadata['entries'] == 2
+        assert RoundUpEntry.query.count() == 0
+    
+    def test_disabled_wallet_records_nothing(self, app, clean_db, test_user):
+        """Test nothing is queued without a round-up pocket"""
+        wallet = Wallet.query.filter_by(user_id=test_user.id).first()
+        
+        assert record_round_up(wallet, Decimal('3.40'), 'transfer') is None
+        assert pending_round_ups(test_user.id)['pending_count'] == 0
+    
+    def test_unaffordable_round_ups_stay_pending(self, app, clean_db, test_user, test_user2):
+        """Test a wallet that can't cover its round-ups keeps them for a later run"""
+        broke_wallet, broke_pocket = _enable(test_user)
+        wallet, pocket = _enable(test_user2, Decimal('10.00'))
+        broke_wallet.balance = Decimal('0.10')
+        record_round_up(broke_wallet, Decimal('3.40'), 'purchase')
+        record_round_up(wallet, Decimal('4.50'), 'purchase')
+        db.session.commit()
+        
+        summary = settle_round_ups(chunk_size=1)
+        db.session.expire_all()
+        
+        assert summary['chunks'] == 2
+        assert summary['pockets_credited'] == 1
+        assert pocket.balance == Decimal('5.50')
+        assert broke_pocket.balance == 0
+        assert pending_round_ups(test_user.id) == {'pending_amount': 0.6, 'pending_count': 1}
+        assert RoundUpEntry.query.one().settlement_token is None
@@ -0,0 +1,93 @@
+"""
+Unit tests for marketplace seller profiles
+Tests the batched, cached seller lookup behind listing pages
+"""
+import pytest
+from sqlalchemy import event
+from app.extensions import db, seller_profile_cache
+from app.models import MarketplaceListing, User
+from app.services.marketplace_search import search_listings
+from app.services.seller_profiles import SellerProfile, SellerProfileCache, seller_profiles
+
+
+def profile(user_id):
+    return SellerProfile(user_id, f'user{user_id}', None, None, None, None, None)
+
+
+@pytest.fixture
+def user_queries(app):
+    """Statements that read the users table, recorded while the test runs"""
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if 'FROM users' in statement:
+            statements.append(statement)
+    
+    event.listen(db.engine, 'before_cursor_execute', record)
+    yield statements
+    event.remove(db.engine, 'before_cursor_execute', record)
+
+
+@pytest.mark.unit
+class TestSellerProfileCache:
+    """Test the cache container"""
+    
+    def test_loads_only_missing_ids_in_one_call(self):
+        """Test cached sellers are reused and the rest are loaded together"""
+        cache = SellerProfileCache()
+        calls = []
+        
+        def loader(user_ids):
+            calls.append(list(user_ids))
+            return {user_id: profile(user_id) for user_id in user_ids if user_id != 9}
+        
+        assert set(cache.get_many([1, 2, 1], loader)) == {1, 2}
+        assert set(cache.get_many([2, 3, 9], loader)) == {2, 3}
+        assert calls == [[1, 2], [3, 9]]
+        assert cache.hits == 1
+    
+    def test_evicts_least_recently_used(self):
+        """Test the cache stays within SELLER_PROFILE_CACHE_SIZE"""
+        cache = SellerProfileCache()
+        cache._max_entries = 2
+        for user_id in (1, 2, 1, 3):
+            cache.get_many([user_id], lambda ids: {i: profile(i) for i in ids})
+        
+        assert len(cache) == 2
+        assert 2 not in cache._entries
+
+
+@pytest.mark.integration
+class TestListingSellers:
+    """Test listing pages load their sellers in one query"""
+    
+    def test_page_loads_sellers_once(self, app, clean_db, test_user, test_user2, user_queries):
+        """Test a page of listings costs one seller query, then none while cached"""
+        for index in range(6):
+            seller = test_user if index % 2 else test_user2
+            db.session.add(MarketplaceListing(seller_id=seller.id, title=f'Item {index}', price=5))
+        db.session.commit()
+        user_queries.clear()
+        
+        listings, _ = search_listings()
+        sellers = seller_profiles(listing.seller_id for listing in listings)
+        data = [listing.to_dict(include_seller=True, sellers=sellers) for listing in listings]
+        
+        assert len(user_queries) == 1
+        assert {item['seller']['username'] for item in data} == {'testuser', 'testuser2'}
+        assert all('email' not in item['seller'] for item in data)
+        
+        listings[0].to_dict(include_seller=True)
+        seller_profiles(listing.seller_id for listing in listings)
+        assert len(user_queries) == 1
+    
+    def test_profile_edit_invalidates_entry(self, app, clean_db, test_user):
+        """Test a profile change through the ORM is visible on the next lookup"""
+        assert seller_profiles([test_user.id])[test_user.id].faculty != 'Physics'
+        
+        user = db.session.get(User, test_user.id)
+        user.faculty = 'Physics'
+        db.session.commit()
+        
+        assert test_user.id not in seller_profile_cache._entries
+        assert seller_profiles([test_user.id])[test_user.id].faculty == 'Physics'
@@ -0,0 +1,89 @@
+"""
+Unit tests for card spend counters
+Tests window roll-over, limit checks and rebuilding from history
+"""
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from app.extensions import db
+from app.models import CardSpendCounter, Transaction, VirtualCard
+from app.services import spend_counters
+
+
+def make_payment_card(user_id, **kwargs):
+    card = VirtualCard(user_id=user_id, card_purpose='payment', card_name='Main', **kwargs)
+    db.session.add(card)
+    db.session.commit()
+    return card
+
+
+@pytest.mark.unit
+class TestSpendCounters:
+    """Test counter maintenance and limit checks"""
+    
+    def test_record_and_roll_over(self, app, clean_db, test_user):
+        """Test counters accumulate within a window and restart in the next one"""
+        card = make_payment_card(test_user.id)
+        counters = {}
+        spend_counters.record_spend(card.id, Decimal('10.00'), counters, datetime(2030, 3, 5, 9))
+        spend_counters.record_spend(card.id, Decimal('5.00'), counters, datetime(2030, 3, 5, 18))
+        db.session.commit()
+        
+        counters = spend_counters.load_counters(card.id)
+        assert spend_counters.current_spend(counters, datetime(2030, 3, 5, 20)) == {
+            'daily': Decimal('15.00'), 'monthly': Decimal('15.00')
+        }
+        
+        spend_counters.record_spend(card.id, Decimal('7.00'), counters, datetime(2030, 3, 6, 8))
+        db.session.commit()
+        
+        spent = spend_counters.current_spend(spend_counters.load_counters(card.id), datetime(2030, 3, 6, 9))
+        assert spent == {'daily': Decimal('7.00'), 'monthly': Decimal('22.00')}
+        assert spend_counters.current_spend(counters, datetime(2030, 4, 1))['monthly'] == 0
+    
+    def test_check_limits(self, app, clean_db, test_user):
+        """Test daily and monthly limits are both enforced"""
+        card = make_payment_card(test_user.id, daily_limit=50, spending_limit=200)
+        
+        assert spend_counters.check_limits(card, Decimal('10'), {'daily': Decimal('40'), 'monthly': Decimal('0')}) is None
+        assert 'daily limit' in spend_counters.check_limits(card, Decimal('11'), {'daily': Decimal('40'), 'monthly': Decimal('0')})
+        assert 'spending limit' in spend_counters.check_limits(card, Decimal('1'), {'daily': Decimal('0'), 'monthly': Decimal('200')})
+    
+    def test_rebuild_from_history(self, app, clean_db, test_user):
+        """Test rebuilt counters match completed payments in the current windows"""
+        card = make_payment_card(test_user.id)
+        now = datetime(2030, 3, 10, 12)
+        for amount, created_at, meta_only in [
+            (20, datetime(2030, 3, 10, 9), False),
+            (30, datetime(2030, 3, 2, 9), True),
+            (99, datetime(2030, 2, 27, 9), False),
+        ]:
+            db.session.add(Transaction(
+                user_id=test_user.id, transaction_type='card_payment', amount=amount, status='completed',
+                card_id=None if meta_only else card.id, transaction_metadata={'card_id': card.id},
+                created_at=created_at
+            ))
+        db.session.commit()
+        
+        assert spend_counters.rebuild_counters(now=now) == 2
+        db.session.commit()
+        
+        spent = spend_counters.current_spend(spend_counters.load_counters(card.id), now)
+        assert spent == {'daily': Decimal('20.00'), 'monthly': Decimal('50.00')}
+        assert CardSpendCounter.query.count() == 2
+    
+    def test_rebuild_on_migration_connection(self, app, clean_db, test_user):
+        """Test the migration can rebuild counters on its own connection"""
+        card = make_payment_card(test_user.id)
+        db.session.add(Transaction(
+            user_id=test_user.id, transaction_type='card_payment', amount=15, status='completed',
+            card_id=card.id, created_at=datetime(2030, 3, 10, 9)
+        ))
+        db.session.commit()
+        
+        with db.engine.begin() as conn:
+            assert spend_counters.rebuild_counters(now=datetime(2030, 3, 10, 12), bind=conn) == 2
+        
+        assert {c.period: c.amount for c in CardSpendCounter.query.all()} == {
+            'daily': Decimal('15.00'), 'monthly': Decimal('15.00')
+        }
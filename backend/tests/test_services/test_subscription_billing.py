@@ -0,0 +1,145 @@
+"""
+Unit tests for the batch subscription biller
+Tests cycle arithmetic, charging, retries and the ledger entries
+"""
+import pytest
+from sqlalchemy import event
+from datetime import date, datetime
+from decimal import Decimal
+from app.extensions import db
+from app.models import Subscription, SubscriptionCard, Transaction, VirtualCard, Wallet
+from app.services.subscription_billing import (
+    MAX_ATTEMPTS, add_months, advance_billing_date, run_subscription_billing
+)
+
+NOW = datetime(2030, 1, 31, 3, 0)
+
+
+@pytest.mark.unit
+class TestBillingCycles:
+    """Test billing date arithmetic"""
+    
+    def test_month_end_anchor(self):
+        """Test the 31st clamps to short months and returns afterwards"""
+        feb = advance_billing_date(date(2030, 1, 31), 'monthly', 31)
+        
+        assert feb == date(2030, 2, 28)
+        assert advance_billing_date(feb, 'monthly', 31) == date(2030, 3, 31)
+        assert add_months(date(2031, 12, 15), 2, 15) == date(2032, 2, 15)
+    
+    def test_other_cycles(self):
+        """Test yearly, quarterly and weekly cycles"""
+        assert advance_billing_date(date(2028, 2, 29), 'yearly', 29) == date(2029, 2, 28)
+        assert advance_billing_date(date(2030, 11, 30), 'quarterly', 30) == date(2031, 2, 28)
+        assert advance_billing_date(date(2030, 1, 28), 'weekly') == date(2030, 2, 4)
+
+
+@pytest.mark.unit
+class TestSubscriptionBilling:
+    """Test run_subscription_billing"""
+    
+    def test_charges_due_subscription_cards(self, app, clean_db, test_user):
+        """Test due subscriptions are charged once and advanced a month"""
+        due = SubscriptionCard(user_id=test_user.id, service_name='Music', category='streaming',
+                               monthly_cost=10, total_paid=0, next_billing_date=date(2030, 1, 31))
+        later = SubscriptionCard(user_id=test_user.id, service_name='Cloud', category='cloud',
+                                 monthly_cost=5, total_paid=0, next_billing_date=date(2030, 2, 15))
+        db.session.add_all([due, later])
+        db.session.commit()
+        
+        summary = run_subscription_billing(now=NOW, chunk_size=1)
+        db.session.expire_all()
+        
+        assert summary['subscription_cards']['charged'] == 1
+        assert due.next_billing_date == date(2030, 2, 28)
+        assert due.billing_anchor_day == 31
+        assert due.total_paid == Decimal('10.00')
+        assert due.billing_claim_token is None
+        assert later.total_paid == 0
+        assert Wallet.query.filter_by(user_id=test_user.id).first().balance == Decimal('990.00')
+        assert run_subscription_billing(now=NOW)['subscription_cards']['charged'] == 0
+    
+    def test_stale_subscription_is_charged_once(self, app, clean_db, test_user):
+        """Test a months-old due date is charged once and moved past today, not replayed"""
+        stale = SubscriptionCard(user_id=test_user.id, service_name='Gym', category='fitness',
+                                 monthly_cost=10, total_paid=0, next_billing_date=date(2029, 3, 5))
+        db.session.add(stale)
+        db.session.commit()
+        
+        summary = run_subscription_billing(now=NOW, chunk_size=1)
+        db.session.expire_all()
+        
+        assert summary['subscription_cards']['charged'] == 1
+        assert summary['subscription_cards']['chunks'] == 1
+        assert stale.next_billing_date == date(2030, 2, 5)
+        assert stale.total_paid == Decimal('10.00')
+        assert Wallet.query.filter_by(user_id=test_user.id).first().balance == Decimal('990.00')
+    
+    def test_failed_charge_backs_off_then_pauses(self, app, clean_db, test_user):
+        """Test insufficient balance schedules retries and finally pauses"""
+        sub = SubscriptionCard(user_id=test_user.id, service_name='Gym', category='health',
+                               monthly_cost=5000, total_paid=0, next_billing_date=date(2030, 1, 30))
+        db.session.add(sub)
+        db.session.commit()
+        
+        run_subscription_billing(now=NOW)
+        db.session.expire_all()
+        
+        assert sub.billing_failures == 1
+        assert sub.billing_last_error == 'Insufficient balance'
+        assert sub.billing_retry_at == datetime(2030, 1, 31, 4, 0)
+        assert run_subscription_billing(now=NOW)['subscription_cards']['failed'] == 0
+        
+        for day in range(MAX_ATTEMPTS - 1):
+            run_subscription_billing(now=datetime(2030, 2, 1 + day))
+        db.session.expire_all()
+        
+        assert sub.status == 'paused'
+        assert sub.billing_failures == MAX_ATTEMPTS
+        assert Wallet.query.filter_by(user_id=test_user.id).first().balance == Decimal('1000.00')
+    
+    def test_charges_against_locked_balance(self, app, clean_db, test_user):
+        """Test a transfer committed after the rows are read but before the wallet lock is respected"""
+        sub = SubscriptionCard(user_id=test_user.id, service_name='Music', category='streaming',
+                               monthly_cost=10, total_paid=0, next_billing_date=date(2030, 1, 31))
+        db.session.add(sub)
+        db.session.commit()
+        spent_elsewhere = []
+        
+        def transfer_before_lock(conn, cursor, statement, parameters, context, executemany):
+            if 'FROM wallets' in statement and not spent_elsewhere:
+                spent_elsewhere.append(True)
+                cursor.execute('UPDATE wallets SET balance = 5 WHERE user_id = ?', (test_user.id,))
+        
+        event.listen(db.engine, 'before_cursor_execute', transfer_before_lock)
+        try:
+            summary = run_subscription_billing(now=NOW)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', transfer_before_lock)
+        db.session.expire_all()
+        
+        assert spent_elsewhere
+        assert summary['subscription_cards']['failed'] == 1
+        assert sub.billing_last_error == 'Insufficient balance'
+        assert Wallet.query.filter_by(user_id=test_user.id).first().balance == Decimal('5.00')
+    
+    def test_card_subscription_records_settled_payment_only(self, app, clean_db, test_user):
+        """Test card subscriptions record spend and a completed payment, with no scheduled rows"""
+        card = VirtualCard(user_id=test_user.id, card_purpose='subscription', card_name='Subs',
+                           allocated_amount=0, spent_amount=0)
+        db.session.add(card)
+        db.session.flush()
+        sub = Subscription(card_id=card.id, service_name='Video', amount=120, billing_cycle='yearly',
+                           next_billing_date=date(2030, 1, 31))
+        db.session.add(sub)
+        db.session.commit()
+        
+        summary = run_subscription_billing(now=NOW)
+        db.session.expire_all()
+        
+        assert summary['card_subscriptions']['charged'] == 1
+        assert sub.next_billing_date == date(2031, 1, 31)
+        assert card.spent_amount == Decimal('120.00')
+        statuses = [(t.status, t.created_at) for t in Transaction.query.filter_by(card_id=card.id)]
+        assert statuses == [('completed', NOW)]
+        assert Transaction.query.filter_by(status='scheduled').count() == 0
@@ -0,0 +1,76 @@
+"""
+Unit tests for the JWT deny-list
+Tests Bloom filter fast path, expiry and cross-worker sync
+"""
+import pytest
+import time
+from flask import Flask
+from app.services.token_blocklist import BloomFilter, MemoryBlocklistBackend, TokenBlocklist
+
+
+def make_app(tmp_path, **config):
+    app = Flask(__name__, instance_path=str(tmp_path))
+    app.config.update(config)
+    return app
+
+
+@pytest.mark.unit
+class TestTokenBlocklist:
+    """Test in-memory revocation checks"""
+    
+    def test_bloom_filter_membership(self):
+        """Test added keys are always reported present"""
+        bloom = BloomFilter(capacity=1000)
+        for i in range(1000):
+            bloom.add(f'jti-{i}')
+        
+        assert all(f'jti-{i}' in bloom for i in range(1000))
+        false_positives = sum(f'other-{i}' in bloom for i in range(1000))
+        assert false_positives < 20
+    
+    def test_revoked_token_is_rejected(self, tmp_path):
+        """Test revoke() is visible to is_revoked() immediately"""
+        blocklist = TokenBlocklist(make_app(tmp_path, TOKEN_BLOCKLIST_BACKEND='memory'))
+        
+        blocklist.revoke('abc', time.time() + 60)
+        
+        assert blocklist.is_revoked('abc') is True
+        assert blocklist.is_revoked('xyz') is False
+    
+    def test_expired_entries_are_dropped(self, tmp_path):
+        """Test entries stop matching once the token has expired"""
+        blocklist = TokenBlocklist(make_app(tmp_path, TOKEN_BLOCKLIST_BACKEND='memory'))
+        
+        blocklist.revoke('old', time.time() - 1)
+        assert blocklist.is_revoked('old') is False
+        
+        blocklist.sync(now=time.time() + 3600)
+        assert len(blocklist) == 0
+    
+    def test_memory_backend_prunes_without_losing_cursor(self):
+        """Test expired entries leave the memory backend and later ones are still fetched"""
+        backend = MemoryBlocklistBackend()
+        backend.publish('old', 10.0)
+        backend.publish('live', 100.0)
+        cursor, _ = backend.fetch_since(0)
+        
+        backend.prune(50.0)
+        backend.publish('new', 100.0)
+        
+        assert len(backend._entries) == 2
+        assert backend.fetch_since(cursor) == (3, [('new', 100.0)])
+        assert backend.fetch_since(0)[1] == [('live', 100.0), ('new', 100.0)]
+    
+    def test_sqlite_backend_syncs_between_workers(self, tmp_path):
+        """Test a revocation made by one worker reaches another"""
+        config = {
+            'TOKEN_BLOCKLIST_BACKEND': 'sqlite',
+            'TOKEN_BLOCKLIST_PATH': str(tmp_path / 'blocklist.db'),
+            'TOKEN_BLOCKLIST_SYNC_INTERVAL': 0,
+        }
+        worker_a = TokenBlocklist(make_app(tmp_path, **config))
+        worker_b = TokenBlocklist(make_app(tmp_path, **config))
+        
+        worker_a.revoke('shared', time.time() + 60)
+        
+        assert worker_b.is_revoked('shared') is True
@@ -0,0 +1,55 @@
+"""
+Unit tests for the shared TTL + LRU cache
+Tests expiry, config keys and hit/miss counting
+"""
+import pytest
+from app.services import ttl_cache as ttl_cache_module
+from app.services.ttl_cache import TTLCache
+
+
+class NumberCache(TTLCache):
+    config_prefix = 'NUMBER_CACHE'
+    extension_name = 'number_cache'
+    default_ttl = 5
+    default_size = 100
+
+
+@pytest.mark.unit
+class TestTTLCache:
+    """Test TTLCache"""
+    
+    def test_init_app_reads_prefixed_config(self, app):
+        """Test TTL and size come from <prefix>_TTL / <prefix>_SIZE"""
+        app.config.update(NUMBER_CACHE_TTL=2, NUMBER_CACHE_SIZE=3)
+        cache = NumberCache(app)
+        
+        assert (cache._ttl, cache._max_entries) == (2.0, 3)
+        assert app.extensions['number_cache'] is cache
+        assert (NumberCache()._ttl, NumberCache()._max_entries) == (5.0, 100)
+    
+    def test_entries_expire(self, monkeypatch):
+        """Test an entry is reloaded once its TTL has passed"""
+        clock = [100.0]
+        monkeypatch.setattr(ttl_cache_module.time, 'monotonic', lambda: clock[0])
+        cache = NumberCache()
+        
+        assert cache.get(1, lambda key: 'a') == 'a'
+        clock[0] += 4
+        assert cache.get(1, lambda key: 'b') == 'a'
+        clock[0] += 2
+        assert cache.get(1, lambda key: 'c') == 'c'
+        assert (cache.hits, cache.misses) == (1, 2)
+    
+    def test_get_many_loads_missing_once(self):
+        """Test get_many loads only uncached keys, in one call"""
+        cache = NumberCache()
+        calls = []
+        
+        def loader(keys):
+            calls.append(keys)
+            return {key: key * 10 for key in keys if key != 3}
+        
+        assert cache.get_many([1, 2, 1], loader) == {1: 10, 2: 20}
+        assert cache.get_many([2, 3], loader) == {2: 20}
+        assert calls == [[1, 2], [3]]
+        assert (cache.hits, cache.misses) == (1, 3)
@@ -0,0 +1,91 @@
+"""
+Unit tests for the user directory search
+Tests prefix matching, keyset pagination and the hot-prefix cache
+"""
+import pytest
+from sqlalchemy import or_, select, text
+from app.extensions import db, user_search_cache
+from app.models import User
+from app.services.user_directory import _prefix_match, decode_cursor, search_users
+
+
+def _add_users(*specs):
+    for username, first_name, last_name in specs:
+        user = User(username=username, email=f'{username}@example.com',
+                    first_name=first_name, last_name=last_name)
+        user.set_password('TestPass123!')
+        db.session.add(user)
+    db.session.commit()
+
+
+@pytest.mark.unit
+class TestUserSearch:
+    """Test search_users"""
+    
+    def test_matches_username_or_name_prefix_case_insensitively(self, app, clean_db):
+        """Test usernames and "first last" names both match, ignoring case"""
+        _add_users(('JohnD', 'John', 'Doe'), ('jsmith', 'Jane', 'Smith'),
+                   ('mary', 'Johanna', 'Lee'), ('bob', 'Bob', 'Stone'))
+        
+        users, next_cursor = search_users('JOH')
+        
+        assert [user.username for user in users] == ['JohnD', 'mary']
+        assert next_cursor is None
+        assert [user.username for user in search_users('jane sm')[0]] == ['jsmith']
+        assert search_users('j%')[0] == []
+    
+    def test_pages_follow_cursor_and_skip_caller(self, app, clean_db):
+        """Test keyset pages cover every match once and exclude the caller"""
+        _add_users(*[(f'student{i}', 'Stu', f'Dent{i}') for i in range(7)])
+        caller = User.query.filter_by(username='student1').first()
+        
+        seen, cursor = [], None
+        while True:
+            users, cursor = search_users('stu', limit=2, cursor=cursor, exclude_user_id=caller.id)
+            seen += [user.username for user in users]
+            if cursor is None:
+                break
+        
+        assert seen == ['student0', 'student2', 'student3', 'student4', 'student5', 'student6']
+    
+    def test_prefix_is_an_index_range_scan(self, app, clean_db):
+        """Test the SQLite prefix predicate searches both indexes instead of scanning them"""
+        query = select(User.id).where(or_(
+            _prefix_match(User.username_search, 'jo', 'sqlite'), _prefix_match(User.name_search, 'jo', 'sqlite')
+        ))
+        compiled = query.compile(db.engine, compile_kwargs={'literal_binds': True})
+        plan = [row[-1] for row in db.session.execute(text(f'EXPLAIN QUERY PLAN {compiled}'))]
+        
+        assert any('SEARCH users USING INDEX ix_users_username_search' in step for step in plan)
+        assert any('SEARCH users USING INDEX ix_users_name_search' in step for step in plan)
+        assert not any(step.startswith('SCAN users') for step in plan)
+    
+    def test_invalid_input(self, app, clean_db):
+        """Test empty queries and malformed cursors are rejected"""
+        with pytest.raises(ValueError):
+            search_users('   ')
+        with pytest.raises(ValueError):
+            decode_cursor('not-a-cursor')
+
+
+@pytest.mark.integration
+class TestUserSearchCache:
+    """Test the hot-prefix cache"""
+    
+    def test_hits_cache_until_a_user_changes(self, app, clean_db):
+        """Test repeated prefixes are cached and renames clear the cache"""
+        _add_users(('alice', 'Alice', 'Wong'))
+        user_search_cache.clear()
+        
+        search_users('al')
+        hits = user_search_cache.hits
+        search_users('al')
+        assert user_search_cache.hits == hits + 1
+        
+        user = User.query.filter_by(username='alice').first()
+        user.username = 'zoe'
+        db.session.commit()
+        
+        assert len(user_search_cache) == 0
+        assert [u.username for u in search_users('al')[0]] == ['zoe']
+        assert search_users('alice w')[0][0].id == user.id
@@ -0,0 +1,98 @@
+import { useEffect, useState } from 'react';
+import { useInfiniteQuery } from '@tanstack/react-query';
+import { Input } from '@/components/ui/input';
+import { usersAPI } from '@/lib/api';
+
+export interface DirectoryUser {
+  id: number;
+  username: string;
+  first_name?: string | null;
+  last_name?: string | null;
+}
+
+interface UserSearchInputProps {
+  id?: string;
+  value: string;
+  placeholder?: string;
+  onChange: (value: string) => void;
+  onSelect: (user: DirectoryUser) => void;
+}
+
+/**
+ * Username input with directory suggestions (GET /api/users/search).
+ * Searches by username or name prefix once typing pauses, one page at a time.
+ */
+export const UserSearchInput = ({ id, value, placeholder = '@username', onChange, onSelect }: UserSearchInputProps) => {
+  const [open, setOpen] = useState(false);
+  const [term, setTerm] = useState('');
+
+  useEffect(() => {
+    const timer = setTimeout(() => setTerm(value.replace(/^@/, '').trim()), 250);
+    return () => clearTimeout(timer);
+  }, [value]);
+
+  const { data, fetchNextPage, hasNextPage, isFetching } = useInfiniteQuery({
+    queryKey: ['user-search', term],
+    queryFn: async ({ pageParam }) => {
+      const response = await usersAPI.searchUsers(term, pageParam);
+      return response.data as { users: DirectoryUser[]; next_cursor: string | null };
+    },
+    initialPageParam: undefined as string | undefined,
+    getNextPageParam: (lastPage) => lastPage.next_cursor ?? undefined,
+    enabled: open && term.length > 0,
+    staleTime: 30_000,
+  });
+
+  const users = data?.pages.flatMap((page) => page.users) ?? [];
+
+  return (
+    <div className="relative">
+      <Input
+        id={id}
+        placeholder={placeholder}
+        value={value}
+        autoComplete="off"
+        onChange={(e) => {
+          onChange(e.target.value);
+          setOpen(true);
+        }}
+        onFocus={() => setOpen(true)}
+        onBlur={() => setTimeout(() => setOpen(false), 150)}
+      />
+      {open && term.length > 0 && users.length > 0 && (
+        <div className="absolute z-50 mt-1 w-full max-h-60 overflow-y-auto rounded-md border bg-white dark:bg-gray-900 shadow-lg">
+          {users.map((user) => (
+            <button
+              key={user.id}
+              type="button"
+              className="w-full px-3 py-2 text-left text-sm hover:bg-violet-50 dark:hover:bg-gray-800"
+              onMouseDown={(e) => e.preventDefault()}
+              onClick={() => {
+                onSelect(user);
+                setOpen(false);
+              }}
+            >
+              <span className="font-medium">@{user.username}</span>
+              {(user.first_name || user.last_name) && (
+                <span className="ml-2 text-gray-500">
+                  {[user.first_name, user.last_name].filter(Boolean).join(' ')}
+                </span>
+              )}
+            </button>
+          ))}
+          {hasNextPage && (
+            <button
+              type="button"
+              className="w-full px-3 py-2 text-center text-xs text-violet-600 hover:bg-violet-50 dark:hover:bg-gray-800"
+              disabled={isFetching}
+              onMouseDown={(e) => e.preventDefault()}
+              onClick={() => fetchNextPage()}
+            >
+              {isFetching ? 'Loading...' : 'Show more'}
+            </button>
+          )}
+        </div>
+      )}
+    </div>
+  );
+};
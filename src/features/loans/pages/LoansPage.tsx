@@ -5,10 +5,10 @@ import { Button } from '@/components/ui/button';
 import { Dialog, DialogContent, DialogHeader, DialogTitle, DialogTrigger } from '@/components/ui/dialog';
 import { Input } from '@/components/ui/input';
 import { Label } from '@/components/ui/label';
-import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@/components/ui/select';
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs';
 import { motion } from 'framer-motion';
 import { LoanCard } from '../components/LoanCard';
+import { UserSearchInput } from '@/components/UserSearchInput';
 import { 
   Plus, ArrowUpRight, ArrowDownRight, DollarSign, TrendingUp, 
   TrendingDown
@@ -27,7 +27,7 @@ export default function LoansPage() {
   const [approvingLoanIds, setApprovingLoanIds] = useState<Set<number>>(new Set());
   const [decliningLoanIds, setDecliningLoanIds] = useState<Set<number>>(new Set());
   
-  const [selectedUserId, setSelectedUserId] = useState('');
+  const [lenderUsername, setLenderUsername] = useState('');
   const [loanAmount, setLoanAmount] = useState('');
   const [loanDescription, setLoanDescription] = useState('');
   const [dueDate, setDueDate] = useState('');
@@ -43,14 +43,6 @@ export default function LoansPage() {
     },
   });
 
-  const { data: usersData } = useQuery({
-    queryKey: ['available-users'],
-    queryFn: async () => {
-      const response = await loansAPI.getAvailableUsers();
-      return response.data;
-    },
-  });
-
   const createLoanMutation = useMutation({
     mutationFn: (data: any) => loansAPI.createLoanRequest(data),
     onSuccess: () => {
@@ -60,7 +52,7 @@ export default function LoansPage() {
       toast.success('Loan request sent successfully!', {
         description: 'The lender will be notified and can approve or decline your request.',
       });
-      setSelectedUserId('');
+      setLenderUsername('');
       setLoanAmount('');
       setLoanDescription('');
       setDueDate('');
@@ -125,14 +117,14 @@ export default function LoansPage() {
   });
 
   const handleCreateLoan = () => {
-    const selectedUser = usersData?.users.find((u: any) => u.id === Number(selectedUserId));
-    if (!selectedUser) {
+    const lender = lenderUsername.replace(/^@/, '').trim();
+    if (!lender) {
       toast.error('Please select a lender');
       return;
     }
 
     createLoanMutation.mutate({
-      lender_username: selectedUser.username,
+      lender_username: lender,
       amount: Number(loanAmount),
       description: loanDescription,
       due_date: dueDate || undefined,
@@ -253,18 +245,13 @@ export default function LoansPage() {
             <div className="space-y-4 py-4">
               <div className="space-y-2">
                 <Label htmlFor="lender">Who would you like to borrow from?</Label>
-                <Select value={selectedUserId} onValueChange={setSelectedUserId}>
-                  <SelectTrigger>
-                    <SelectValue placeholder="Choose a lender..." />
-                  </SelectTrigger>
-                  <SelectContent>
-                    {usersData?.users.map((user: any) => (
-                      <SelectItem key={user.id} value={String(user.id)}>
-                        {user.username} ({user.email})
-                      </SelectItem>
-                    ))}
-                  </SelectContent>
-                </Select>
+                <UserSearchInput
+                  id="lender"
+                  placeholder="Search by username or name..."
+                  value={lenderUsername}
+                  onChange={setLenderUsername}
+                  onSelect={(user) => setLenderUsername(user.username)}
+                />
               </div>
               
               <div className="space-y-2">
@@ -303,7 +290,7 @@ export default function LoansPage() {
               <Button
                 className="w-full bg-gradient-to-r from-violet-600 to-indigo-600"
                 onClick={handleCreateLoan}
-                disabled={createLoanMutation.isPending || !selectedUserId || !loanAmount || Number(loanAmount) <= 0}
+                disabled={createLoanMutation.isPending || !lenderUsername || !loanAmount || Number(loanAmount) <= 0}
               >
                 {createLoanMutation.isPending ? 'Creating...' : 'Create Loan'}
               </Button>
@@ -72,6 +72,15 @@ export default function DarkDaysPocketPage() {
     },
   });
 
+  // Round-up settings and pending (not yet settled) total
+  const { data: roundUps } = useQuery({
+    queryKey: ['savings-round-ups'],
+    queryFn: async () => {
+      const response = await savingsAPI.getRoundUps();
+      return response.data.round_ups;
+    },
+  });
+
   // Create pocket mutation
   const createPocketMutation = useMutation({
     mutationFn: (data: any) => savingsAPI.createPocket(data),
@@ -141,6 +150,19 @@ export default function DarkDaysPocketPage() {
     },
   });
 
+  // Round-up toggle mutation
+  const roundUpsMutation = useMutation({
+    mutationFn: ({ pocketId, enabled }: { pocketId: number; enabled: boolean }) =>
+      savingsAPI.updateRoundUps(pocketId, { enabled, unit: roundUps?.unit ?? 1 }),
+    onSuccess: () => {
+      queryClient.invalidateQueries({ queryKey: ['savings-round-ups'] });
+      toast.success('Round-up settings updated!');
+    },
+    onError: (error: any) => {
+      toast.error(`Failed to update round-ups: ${error.response?.data?.error || error.message}`);
+    },
+  });
+
   // Handle emergency access initiation
   const handleEmergencyAccess = (pocket: any) => {
     setSelectedPocket(pocket);
@@ -199,6 +221,7 @@ export default function DarkDaysPocketPage() {
   };
 
   const activePocket = pocketsData?.[0]; // For demo, using first pocket
+  const roundUpsActive = Boolean(roundUps?.enabled && roundUps?.pocket_id === activePocket?.id);
 
   return (
     <motion.div
@@ -272,6 +295,28 @@ export default function DarkDaysPocketPage() {
                 </p>
               </div>
             </div>
+
+            {/* Round-ups */}
+            <div className="p-6 bg-gradient-to-br from-sky-50 to-cyan-50 rounded-lg border border-sky-200 flex items-center justify-between gap-4">
+              <div>
+                <h3 className="font-semibold text-sky-900 mb-2">🪙 Round-Ups</h3>
+                <p className="text-sm text-sky-700">
+                  {roundUpsActive
+                    ? `${formatCurrency(roundUps.pending_amount, selectedCurrency)} pending from ${roundUps.pending_count} payments (moved in periodically)`
+                    : `Round card payments, purchases and transfers up to the next ${formatCurrency(roundUps?.unit ?? 1, selectedCurrency)} and save the change`}
+                </p>
+              </div>
+              <Button
+                variant="outline"
+                disabled={roundUpsMutation.isPending}
+                onClick={() => roundUpsMutation.mutate({
+                  pocketId: activePocket.id,
+                  enabled: !roundUpsActive,
+                })}
+              >
+                {roundUpsActive ? 'Turn Off' : 'Turn On'}
+              </Button>
+            </div>
           </TabsContent>
 
           <TabsContent value="settings">
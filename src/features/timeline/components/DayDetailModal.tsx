@@ -124,7 +124,7 @@ export default function DayDetailModal({ date, transactions, open, onClose }: Da
                   
                   return (
                     <motion.div
-                      key={transaction.id || index}
+                      key={transaction.id || transaction.occurrence_id || index}
                       initial={{ opacity: 0, x: -20 }}
                       animate={{ opacity: 1, x: 0 }}
                       transition={{ delay: index * 0.05 }}
@@ -179,7 +179,7 @@ export default function DayDetailModal({ date, transactions, open, onClose }: Da
                                   <p className="text-xs text-gray-500 capitalize">{transaction.metadata.category}</p>
                                 )}
                               </div>
-                              {isScheduled && (
+                              {isScheduled && transaction.id && (
                                 <Button
                                   size="sm"
                                   variant="ghost"
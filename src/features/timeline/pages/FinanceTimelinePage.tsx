@@ -22,7 +22,24 @@ export default function FinanceTimelinePage() {
     },
   });
 
-  const transactions = transactionsData?.transactions || [];
+  // Recurring payments are expanded by the backend for the visible month
+  const { data: upcomingData } = useQuery({
+    queryKey: ['transactions', 'upcoming', currentDate.getMonth(), currentDate.getFullYear()],
+    queryFn: async () => {
+      const toKey = (date: Date) =>
+        `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, '0')}-${String(date.getDate()).padStart(2, '0')}`;
+      const start = new Date(currentDate.getFullYear(), currentDate.getMonth(), 1);
+      const end = new Date(currentDate.getFullYear(), currentDate.getMonth() + 1, 0);
+      const response = await transactionsAPI.getUpcoming(toKey(start), toKey(end));
+      return response.data;
+    },
+  });
+
+  const loadedIds = new Set((transactionsData?.transactions || []).map((transaction: any) => transaction.id));
+  const transactions = [
+    ...(transactionsData?.transactions || []),
+    ...(upcomingData?.transactions || []).filter((transaction: any) => !transaction.id || !loadedIds.has(transaction.id)),
+  ];
 
   const groupTransactionsByDate = () => {
     const grouped: Record<string, any[]> = {};
@@ -12,6 +12,7 @@ import { walletAPI, transactionsAPI } from '@/lib/api';
 import { useAuthStore } from '@/store/authStore';
 import { toast } from 'sonner';
 import { useCurrencyStore, formatCurrency, convertToUSD } from '@/stores/currencyStore';
+import { UserSearchInput } from '@/components/UserSearchInput';
 import { QRCodeSVG } from 'qrcode.react';
 import { Html5Qrcode } from 'html5-qrcode';
 
@@ -430,11 +431,11 @@ export default function TransfersPage() {
           <div className="space-y-4 pt-4">
             <div className="space-y-2">
               <Label htmlFor="recipient">Recipient Username</Label>
-              <Input
+              <UserSearchInput
                 id="recipient"
-                placeholder="@username"
                 value={recipientUsername}
-                onChange={(e) => setRecipientUsername(e.target.value)}
+                onChange={setRecipientUsername}
+                onSelect={(user) => setRecipientUsername(user.username)}
               />
             </div>
             <div className="space-y-2">
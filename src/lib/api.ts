@@ -40,7 +40,7 @@ export default api;
 export const authAPI = {
   register: (data: any) => api.post('/auth/register', data),
   login: (data: any) => api.post('/auth/login', data),
-  logout: () => api.post('/auth/logout'),
+  logout: (refresh_token?: string | null) => api.post('/auth/logout', { refresh_token }),
   getCurrentUser: () => api.get('/auth/me'),
   updateProfile: (data: any) => api.put('/auth/profile', data),
   setPin: (pin: string) => api.post('/auth/set-pin', { pin }),
@@ -65,6 +65,8 @@ export const transactionsAPI = {
   getTransaction: (id: number) => api.get(`/transactions/${id}`),
   getStats: (period: string = 'last_12_months', date_from?: string, date_to?: string) => 
     api.get('/transactions/stats', { params: { period, date_from, date_to } }),
+  getUpcoming: (start?: string, end?: string) => 
+    api.get('/transactions/upcoming', { params: { start, end } }),
 };
 
 export const cardsAPI = {
@@ -92,6 +94,11 @@ export const cardsAPI = {
   getDefaultCards: () => api.get('/cards/default-cards'),
 };
 
+export const usersAPI = {
+  searchUsers: (q: string, cursor?: string, limit: number = 20) =>
+    api.get('/users/search', { params: { q, cursor, limit } }),
+};
+
 export const savingsAPI = {
   getPockets: () => api.get('/savings/pockets'),
   createPocket: (data: any) => api.post('/savings/pockets', data),
@@ -101,6 +108,9 @@ export const savingsAPI = {
     api.post(`/savings/pockets/${pocketId}/withdraw`, data),
   updateAutoSave: (pocketId: number, config: any) => 
     api.put(`/savings/pockets/${pocketId}/auto-save`, config),
+  getRoundUps: () => api.get('/savings/round-ups'),
+  updateRoundUps: (pocketId: number, data: { enabled: boolean; unit?: number }) => 
+    api.put(`/savings/pockets/${pocketId}/round-ups`, data),
   getGoals: () => api.get('/savings/goals'),
   createGoal: (data: any) => api.post('/savings/goals', data),
   contributeToGoal: (goalId: number, amount: number) => 
@@ -108,21 +118,38 @@ export const savingsAPI = {
 };
 
 export const marketplaceAPI = {
-  getListings: (page: number = 1, category?: string, university?: string) => 
-    api.get('/marketplace/listings', { params: { page, category, university } }),
+  getListings: (params: {
+    q?: string;
+    category?: string;
+    university?: string;
+    condition?: string;
+    min_price?: number;
+    max_price?: number;
+    limit?: number;
+    cursor?: string;
+  } = {}) => api.get('/marketplace/listings', { params }),
   createListing: (data: any) => api.post('/marketplace/listings', data),
   getListing: (id: number) => api.get(`/marketplace/listings/${id}`),
+  getOrders: (role: 'buyer' | 'seller' = 'buyer', cursor?: string) =>
+    api.get('/marketplace/orders', { params: { role, cursor } }),
   createOrder: (listingId: number) => api.post('/marketplace/orders', { listing_id: listingId }),
 };
 
 export const loansAPI = {
   getLoans: () => api.get('/loans'),
-  getAvailableUsers: () => api.get('/loans/available-users'),
   createLoanRequest: (data: any) => api.post('/loans', data),
   approveLoan: (loanId: number) => api.post(`/loans/${loanId}/approve`),
   declineLoan: (loanId: number) => api.post(`/loans/${loanId}/decline`),
   repayLoan: (loanId: number, amount: number) => api.post(`/loans/${loanId}/repay`, { amount }),
   cancelLoan: (loanId: number) => api.post(`/loans/${loanId}/cancel`),
+  getInstalments: (loanId: number) => api.get(`/loans/${loanId}/instalments`),
+  getSettlementPlan: () => api.get('/loans/settlement'),
+  settleLoans: () => api.post('/loans/settle'),
+};
+
+export const notificationsAPI = {
+  getNotifications: (unread?: boolean) => api.get('/notifications', { params: { unread } }),
+  markRead: (id: number) => api.post(`/notifications/${id}/read`),
 };
 
 export const subscriptionsAPI = {
@@ -158,3 +185,7 @@ export const expectedPaymentsAPI = {
   generateRecurring: (paymentId: number, months: number = 3) => 
     api.post('/expected-payments/generate-recurring', { payment_id: paymentId, months }),
 };
+
+export const forecastAPI = {
+  getForecast: (months: number = 3) => api.get('/forecast', { params: { months } }),
+};
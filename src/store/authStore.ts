@@ -43,7 +43,7 @@ export const useAuthStore = create<AuthState>()(
       },
       logout: async () => {
         try {
-          await authAPI.logout();
+          await authAPI.logout(localStorage.getItem('refresh_token'));
         } catch (error) {
           console.error('Logout error:', error);
         } finally {